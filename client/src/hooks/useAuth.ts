@@ -1,5 +1,6 @@
 import { useQuery, useMutation, useQueryClient } from "@tanstack/react-query";
 import { useToast } from "@/hooks/use-toast";
+import { fetchWithAuth } from "@/lib/queryClient";
 // Define User type to match backend UserResponse
 type User = {
   id: string;
@@ -27,21 +28,19 @@ export function useAuth() {
     queryKey: ["/api/auth/user"],
     queryFn: async () => {
       try {
-        const token = localStorage.getItem('access_token');
-        if (!token) {
+        if (!localStorage.getItem('access_token') && !localStorage.getItem('refresh_token')) {
           return null; // No token stored
         }
         
-        const res = await fetch("/api/auth/user", {
-          headers: {
-            'Authorization': `Bearer ${token}`,
-            'Content-Type': 'application/json'
-          }
+        // An expired access token is renewed with the refresh token
+        const res = await fetchWithAuth("/api/auth/user", {
+          headers: { 'Content-Type': 'application/json' }
         });
         
         if (res.status === 401) {
-          // Token expired or invalid, clear it
+          // Refresh token expired or revoked, clear both
           localStorage.removeItem('access_token');
+          localStorage.removeItem('refresh_token');
           return null;
         }
         
@@ -85,8 +84,9 @@ export function useAuth() {
       return await res.json();
     },
     onSuccess: (data) => {
-      // Store JWT token in localStorage
+      // Store JWT and refresh token in localStorage
       localStorage.setItem('access_token', data.access_token);
+      localStorage.setItem('refresh_token', data.refresh_token);
       queryClient.setQueryData(["/api/auth/user"], data.user);
       toast({
         title: "Success!",
@@ -223,6 +223,7 @@ export function useAuth() {
     },
     onSuccess: (data) => {
       localStorage.setItem('access_token', data.access_token);
+      localStorage.setItem('refresh_token', data.refresh_token);
       queryClient.setQueryData(["/api/auth/user"], data.user);
       toast({
         title: "Welcome to BrainBridge!",
@@ -241,9 +242,13 @@ export function useAuth() {
 
   const logoutMutation = useMutation({
     mutationFn: async () => {
+      // Revoke the refresh token server-side so it can't be replayed
+      const refreshToken = localStorage.getItem('refresh_token');
       const res = await fetch("/api/auth/logout", {
         method: "POST",
+        headers: refreshToken ? { "Content-Type": "application/json" } : undefined,
         credentials: "include",
+        body: refreshToken ? JSON.stringify({ refresh_token: refreshToken }) : undefined,
       });
 
       if (!res.ok) {
@@ -251,8 +256,9 @@ export function useAuth() {
       }
     },
     onSuccess: () => {
-      // Clear JWT token
+      // Clear JWT and refresh token
       localStorage.removeItem('access_token');
+      localStorage.removeItem('refresh_token');
       queryClient.setQueryData(["/api/auth/user"], null);
       queryClient.clear(); // Clear all cached data
       toast({
@@ -7,23 +7,75 @@ async function throwIfResNotOk(res: Response) {
   }
 }
 
+// Exchange the stored refresh token for a new access token. Concurrent 401s
+// share one request: the server rotates the token, so a second refresh with
+// the same token would be treated as reuse and revoke the session.
+let refreshInFlight: Promise<boolean> | null = null;
+
+export function refreshAccessToken(): Promise<boolean> {
+  if (!refreshInFlight) {
+    refreshInFlight = (async () => {
+      const refreshToken = localStorage.getItem('refresh_token');
+      if (!refreshToken) {
+        return false;
+      }
+      try {
+        const res = await fetch("/api/auth/refresh", {
+          method: "POST",
+          headers: { 'Content-Type': 'application/json' },
+          body: JSON.stringify({ refresh_token: refreshToken }),
+        });
+        if (!res.ok) {
+          localStorage.removeItem('access_token');
+          localStorage.removeItem('refresh_token');
+          return false;
+        }
+        const data = await res.json();
+        localStorage.setItem('access_token', data.access_token);
+        localStorage.setItem('refresh_token', data.refresh_token);
+        return true;
+      } catch {
+        return false;
+      }
+    })().finally(() => {
+      refreshInFlight = null;
+    });
+  }
+  return refreshInFlight;
+}
+
+function authHeaders(headers: Record<string, string> = {}): Record<string, string> {
+  const token = localStorage.getItem('access_token');
+  if (token) {
+    headers['Authorization'] = `Bearer ${token}`;
+  }
+  return headers;
+}
+
+// fetch with the stored access token, refreshing it once on a 401
+export async function fetchWithAuth(
+  url: string,
+  init: RequestInit & { headers?: Record<string, string> } = {},
+): Promise<Response> {
+  const res = await fetch(url, { ...init, headers: authHeaders({ ...init.headers }) });
+  if (res.status !== 401 || !(await refreshAccessToken())) {
+    return res;
+  }
+  return fetch(url, { ...init, headers: authHeaders({ ...init.headers }) });
+}
+
 export async function apiRequest(
   method: string,
   url: string,
   data?: unknown | undefined,
 ): Promise<Response> {
-  const token = localStorage.getItem('access_token');
   const headers: Record<string, string> = {};
   
   if (data) {
     headers['Content-Type'] = 'application/json';
   }
   
-  if (token) {
-    headers['Authorization'] = `Bearer ${token}`;
-  }
-  
-  const res = await fetch(url, {
+  const res = await fetchWithAuth(url, {
     method,
     headers,
     body: data ? JSON.stringify(data) : undefined,
@@ -33,22 +85,31 @@ export async function apiRequest(
   return res;
 }
 
+// Poll a queued server task (202 responses carry a task_id) until it finishes
+export async function waitForTask<T = any>(
+  taskId: string,
+  intervalMs = 1000,
+): Promise<T> {
+  for (;;) {
+    const res = await apiRequest("GET", `/api/tasks/${taskId}`);
+    const task = await res.json();
+    if (task.status === "succeeded") {
+      return task.result as T;
+    }
+    if (task.status === "failed") {
+      throw new Error(task.error || "Task failed");
+    }
+    await new Promise((resolve) => setTimeout(resolve, intervalMs));
+  }
+}
+
 type UnauthorizedBehavior = "returnNull" | "throw";
 export const getQueryFn: <T>(options: {
   on401: UnauthorizedBehavior;
 }) => QueryFunction<T> =
   ({ on401: unauthorizedBehavior }) =>
   async ({ queryKey }) => {
-    const token = localStorage.getItem('access_token');
-    const headers: Record<string, string> = {};
-    
-    if (token) {
-      headers['Authorization'] = `Bearer ${token}`;
-    }
-    
-    const res = await fetch(queryKey.join("/") as string, {
-      headers,
-    });
+    const res = await fetchWithAuth(queryKey.join("/") as string);
 
     if (unauthorizedBehavior === "returnNull" && res.status === 401) {
       return null;
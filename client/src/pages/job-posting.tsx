@@ -3,7 +3,7 @@ import { useMutation } from "@tanstack/react-query";
 import { useAuth } from "@/hooks/useAuth";
 import { useToast } from "@/hooks/use-toast";
 import { isUnauthorizedError } from "@/lib/authUtils";
-import { apiRequest, queryClient } from "@/lib/queryClient";
+import { apiRequest, queryClient, waitForTask } from "@/lib/queryClient";
 import Header from "@/components/navigation/header";
 
 import JobPostingForm from "@/components/forms/job-posting-form";
@@ -67,7 +67,8 @@ export default function JobPosting() {
   const analyzeJobMutation = useMutation({
     mutationFn: async (data: any) => {
       const response = await apiRequest("POST", "/api/jobs/normalize", data);
-      return await response.json();
+      const { task_id } = await response.json();
+      return await waitForTask(task_id);
     },
     onSuccess: (result) => {
       setNormalizedJob(result.data);
@@ -0,0 +1,287 @@
+"""baseline schema
+
+The schema as init_db()/create_all() built it before migrations were added.
+Existing databases adopt it with `alembic stamp 0001_baseline`.
+
+Revision ID: 0001_baseline
+Revises: 
+Create Date: 2026-10-17 04:50:49.653534
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '0001_baseline'
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _create_background_tasks() -> None:
+    op.create_table('background_tasks',
+    sa.Column('task_id', sa.String(), nullable=False),
+    sa.Column('kind', sa.String(), nullable=False),
+    sa.Column('status', sa.String(), nullable=False),
+    sa.Column('user_id', sa.String(), nullable=True),
+    sa.Column('payload', sa.JSON(), nullable=True),
+    sa.Column('result', sa.JSON(), nullable=True),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('started_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('task_id')
+    )
+    with op.batch_alter_table('background_tasks', schema=None) as batch_op:
+        batch_op.create_index('ix_background_tasks_status_created', ['status', 'created_at'], unique=False)
+
+
+def _create_job_features() -> None:
+    op.create_table('job_features',
+    sa.Column('job_id', sa.String(), nullable=False),
+    sa.Column('tokens', sa.JSON(), nullable=True),
+    sa.Column('cdc_hits', sa.JSON(), nullable=True),
+    sa.Column('sensory_risks', sa.JSON(), nullable=True),
+    sa.Column('is_remote', sa.Boolean(), nullable=True),
+    sa.Column('is_onsite', sa.Boolean(), nullable=True),
+    sa.Column('feature_version', sa.Integer(), nullable=False),
+    sa.Column('computed_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.ForeignKeyConstraint(['job_id'], ['job_postings.job_id'], ),
+    sa.PrimaryKeyConstraint('job_id')
+    )
+
+
+# Tables init_db() only started creating shortly before this revision. A
+# database adopted by `server.schema.migrate()` may predate them, so they are
+# created (if missing) before it is stamped at this revision.
+ADOPTION_TABLES = {
+    "background_tasks": _create_background_tasks,
+    "job_features": _create_job_features,
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('strengths',
+    sa.Column('strength_id', sa.String(), nullable=False),
+    sa.Column('strength_name', sa.String(), nullable=False),
+    sa.Column('strength_description', sa.Text(), nullable=True),
+    sa.PrimaryKeyConstraint('strength_id'),
+    sa.UniqueConstraint('strength_name')
+    )
+    op.create_table('traits',
+    sa.Column('trait_id', sa.String(), nullable=False),
+    sa.Column('trait_name', sa.String(), nullable=False),
+    sa.Column('trait_description', sa.Text(), nullable=True),
+    sa.PrimaryKeyConstraint('trait_id'),
+    sa.UniqueConstraint('trait_name')
+    )
+    op.create_table('users',
+    sa.Column('id', sa.String(), nullable=False),
+    sa.Column('email', sa.String(), nullable=True),
+    sa.Column('first_name', sa.String(), nullable=True),
+    sa.Column('last_name', sa.String(), nullable=True),
+    sa.Column('profile_image_url', sa.String(), nullable=True),
+    sa.Column('password', sa.Text(), nullable=True),
+    sa.Column('user_role', sa.String(length=50), nullable=False),
+    sa.Column('phone', sa.String(), nullable=True),
+    sa.Column('company_name', sa.String(), nullable=True),
+    sa.Column('job_title', sa.String(), nullable=True),
+    sa.Column('company_size', sa.String(), nullable=True),
+    sa.Column('industry', sa.String(), nullable=True),
+    sa.Column('date_of_birth', sa.Date(), nullable=True),
+    sa.Column('guardian_email', sa.String(), nullable=True),
+    sa.Column('accommodation_needs', sa.Text(), nullable=True),
+    sa.Column('relationship', sa.String(), nullable=True),
+    sa.Column('nd_adult_email', sa.String(), nullable=True),
+    sa.Column('identity_verification_doc', sa.String(), nullable=True),
+    sa.Column('has_neuro_condition_recognized', sa.Boolean(), nullable=True),
+    sa.Column('recognized_neuro_condition', sa.String(), nullable=True),
+    sa.Column('nd_condition_proof_docs', sa.JSON(), nullable=True),
+    sa.Column('medical_conditions', sa.Text(), nullable=True),
+    sa.Column('location', sa.String(), nullable=True),
+    sa.Column('preferred_work_environment', sa.Text(), nullable=True),
+    sa.Column('preferred_work_setup', sa.String(), nullable=True),
+    sa.Column('availability_status', sa.String(), nullable=True),
+    sa.Column('notes', sa.Text(), nullable=True),
+    sa.Column('public_profile_consent', sa.Boolean(), nullable=True),
+    sa.Column('privacy_agreed', sa.Boolean(), nullable=True),
+    sa.Column('company_website', sa.String(), nullable=True),
+    sa.Column('contact_person', sa.String(), nullable=True),
+    sa.Column('contact_person_designation', sa.String(), nullable=True),
+    sa.Column('company_email', sa.String(), nullable=True),
+    sa.Column('company_verification_docs', sa.JSON(), nullable=True),
+    sa.Column('is_dei_compliant', sa.Boolean(), nullable=True),
+    sa.Column('dei_compliance_provider', sa.String(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_users_email'), ['email'], unique=True)
+
+    op.create_table('assessments',
+    sa.Column('assessment_id', sa.String(), nullable=False),
+    sa.Column('user_id', sa.String(), nullable=False),
+    sa.Column('assessment_type', sa.String(), nullable=False),
+    sa.Column('title', sa.String(), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('questions', sa.JSON(), nullable=True),
+    sa.Column('scoring_config', sa.JSON(), nullable=True),
+    sa.Column('cdc_mapping', sa.JSON(), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('assessment_id')
+    )
+    op.create_table('audit_logs',
+    sa.Column('audit_id', sa.String(), nullable=False),
+    sa.Column('user_id', sa.String(), nullable=True),
+    sa.Column('table_name', sa.String(), nullable=False),
+    sa.Column('operation', sa.String(), nullable=False),
+    sa.Column('old_values', sa.JSON(), nullable=True),
+    sa.Column('new_values', sa.JSON(), nullable=True),
+    sa.Column('timestamp', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('audit_id')
+    )
+    _create_background_tasks()
+    op.create_table('cognitive_profiles',
+    sa.Column('profile_id', sa.String(), nullable=False),
+    sa.Column('user_id', sa.String(), nullable=False),
+    sa.Column('focus_sustained_attention', sa.Float(), nullable=True),
+    sa.Column('pattern_recognition', sa.Float(), nullable=True),
+    sa.Column('verbal_communication', sa.Float(), nullable=True),
+    sa.Column('spatial_reasoning', sa.Float(), nullable=True),
+    sa.Column('creative_ideation', sa.Float(), nullable=True),
+    sa.Column('multitasking_context_switching', sa.Float(), nullable=True),
+    sa.Column('processing_speed', sa.Float(), nullable=True),
+    sa.Column('executive_function', sa.Float(), nullable=True),
+    sa.Column('fine_motor_input', sa.Float(), nullable=True),
+    sa.Column('sensory_processing', sa.Float(), nullable=True),
+    sa.Column('communication_interpretation', sa.Float(), nullable=True),
+    sa.Column('attention_filtering', sa.Float(), nullable=True),
+    sa.Column('sensitivities', sa.JSON(), nullable=True),
+    sa.Column('preferences', sa.JSON(), nullable=True),
+    sa.Column('embedding_vector', sa.String(), nullable=True),
+    sa.Column('evidence_sources', sa.JSON(), nullable=True),
+    sa.Column('confidence_score', sa.Float(), nullable=True),
+    sa.Column('last_updated', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('profile_id'),
+    sa.UniqueConstraint('user_id')
+    )
+    op.create_table('individual_strengths',
+    sa.Column('individual_strength_id', sa.String(), nullable=False),
+    sa.Column('nd_adult_id', sa.String(), nullable=False),
+    sa.Column('strength_id', sa.String(), nullable=False),
+    sa.Column('notes', sa.Text(), nullable=True),
+    sa.ForeignKeyConstraint(['nd_adult_id'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['strength_id'], ['strengths.strength_id'], ),
+    sa.PrimaryKeyConstraint('individual_strength_id')
+    )
+    op.create_table('individual_traits',
+    sa.Column('individual_trait_id', sa.String(), nullable=False),
+    sa.Column('nd_adult_id', sa.String(), nullable=False),
+    sa.Column('trait_id', sa.String(), nullable=False),
+    sa.Column('notes', sa.Text(), nullable=True),
+    sa.ForeignKeyConstraint(['nd_adult_id'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['trait_id'], ['traits.trait_id'], ),
+    sa.PrimaryKeyConstraint('individual_trait_id')
+    )
+    op.create_table('job_postings',
+    sa.Column('job_id', sa.String(), nullable=False),
+    sa.Column('employer_id', sa.String(), nullable=False),
+    sa.Column('job_title', sa.String(), nullable=False),
+    sa.Column('job_description', sa.Text(), nullable=True),
+    sa.Column('employment_type', sa.Enum('FULL_TIME', 'PART_TIME', 'CONTRACT', 'INTERNSHIP', name='employmenttype'), nullable=True),
+    sa.Column('location', sa.String(), nullable=True),
+    sa.Column('work_setup', sa.Enum('ON_SITE', 'HYBRID', 'REMOTE', name='worksetup'), nullable=True),
+    sa.Column('salary_range_min', sa.Integer(), nullable=True),
+    sa.Column('salary_range_max', sa.Integer(), nullable=True),
+    sa.Column('requirements', sa.Text(), nullable=True),
+    sa.Column('benefits', sa.Text(), nullable=True),
+    sa.Column('posted_date', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('application_deadline', sa.Date(), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.ForeignKeyConstraint(['employer_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('job_id')
+    )
+    op.create_table('support_relationships',
+    sa.Column('relationship_id', sa.String(), nullable=False),
+    sa.Column('nd_adult_id', sa.String(), nullable=False),
+    sa.Column('mentor_id', sa.String(), nullable=True),
+    sa.Column('guardian_id', sa.String(), nullable=True),
+    sa.Column('relationship_type', sa.String(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.ForeignKeyConstraint(['guardian_id'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['mentor_id'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['nd_adult_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('relationship_id')
+    )
+    op.create_table('assessment_responses',
+    sa.Column('response_id', sa.String(), nullable=False),
+    sa.Column('assessment_id', sa.String(), nullable=False),
+    sa.Column('user_id', sa.String(), nullable=False),
+    sa.Column('responses', sa.JSON(), nullable=False),
+    sa.Column('completion_time_seconds', sa.Integer(), nullable=True),
+    sa.Column('completed_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.ForeignKeyConstraint(['assessment_id'], ['assessments.assessment_id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('response_id')
+    )
+    _create_job_features()
+    op.create_table('job_matches',
+    sa.Column('match_id', sa.String(), nullable=False),
+    sa.Column('nd_adult_id', sa.String(), nullable=False),
+    sa.Column('job_id', sa.String(), nullable=False),
+    sa.Column('match_score', sa.Integer(), nullable=True),
+    sa.Column('match_reasoning', sa.Text(), nullable=True),
+    sa.Column('match_date', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('is_recommended_to_adult', sa.Boolean(), nullable=True),
+    sa.Column('is_viewed_by_adult', sa.Boolean(), nullable=True),
+    sa.Column('is_liked_by_adult', sa.Boolean(), nullable=True),
+    sa.Column('is_liked_by_employer', sa.Boolean(), nullable=True),
+    sa.ForeignKeyConstraint(['job_id'], ['job_postings.job_id'], ),
+    sa.ForeignKeyConstraint(['nd_adult_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('match_id')
+    )
+    with op.batch_alter_table('job_matches', schema=None) as batch_op:
+        batch_op.create_index('ix_job_matches_nd_adult_score', ['nd_adult_id', 'match_score'], unique=False)
+        batch_op.create_index('ux_job_matches_nd_adult_job', ['nd_adult_id', 'job_id'], unique=True)
+
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('job_matches', schema=None) as batch_op:
+        batch_op.drop_index('ux_job_matches_nd_adult_job')
+        batch_op.drop_index('ix_job_matches_nd_adult_score')
+
+    op.drop_table('job_matches')
+    op.drop_table('job_features')
+    op.drop_table('assessment_responses')
+    op.drop_table('support_relationships')
+    op.drop_table('job_postings')
+    op.drop_table('individual_traits')
+    op.drop_table('individual_strengths')
+    op.drop_table('cognitive_profiles')
+    with op.batch_alter_table('background_tasks', schema=None) as batch_op:
+        batch_op.drop_index('ix_background_tasks_status_created')
+
+    op.drop_table('background_tasks')
+    op.drop_table('audit_logs')
+    op.drop_table('assessments')
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_users_email'))
+
+    op.drop_table('users')
+    op.drop_table('traits')
+    op.drop_table('strengths')
@@ -0,0 +1,48 @@
+"""hot query indexes
+
+Composite/partial indexes for the request-path queries: latest assessment
+response per (user, assessment), the active job catalog by posted_date, an
+employer's active jobs, and job_matches by job_id. `if_not_exists` because
+databases created by init_db()/create_all() may already have them.
+
+Revision ID: 0002_hot_query_indexes
+Revises: 0001_baseline
+Create Date: 2026-10-17 04:51:16.734266
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '0002_hot_query_indexes'
+down_revision: Union[str, Sequence[str], None] = '0001_baseline'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('assessment_responses', schema=None) as batch_op:
+        batch_op.create_index('ix_assessment_responses_user_assessment_completed', ['user_id', 'assessment_id', 'completed_at'], unique=False, if_not_exists=True)
+
+    with op.batch_alter_table('job_matches', schema=None) as batch_op:
+        batch_op.create_index('ix_job_matches_job_id', ['job_id'], unique=False, if_not_exists=True)
+
+    with op.batch_alter_table('job_postings', schema=None) as batch_op:
+        batch_op.create_index('ix_job_postings_active_posted', ['posted_date'], unique=False, if_not_exists=True, postgresql_where=sa.text('is_active'), sqlite_where=sa.text('is_active IS 1'))
+        batch_op.create_index('ix_job_postings_employer_active_posted', ['employer_id', 'is_active', 'posted_date'], unique=False, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('job_postings', schema=None) as batch_op:
+        batch_op.drop_index('ix_job_postings_employer_active_posted')
+        batch_op.drop_index('ix_job_postings_active_posted', postgresql_where=sa.text('is_active'), sqlite_where=sa.text('is_active IS 1'))
+
+    with op.batch_alter_table('job_matches', schema=None) as batch_op:
+        batch_op.drop_index('ix_job_matches_job_id')
+
+    with op.batch_alter_table('assessment_responses', schema=None) as batch_op:
+        batch_op.drop_index('ix_assessment_responses_user_assessment_completed')
@@ -0,0 +1,49 @@
+"""refresh tokens
+
+Server-side records of issued refresh tokens (sha256 of the opaque token),
+grouped into rotation families per login, for POST /api/auth/refresh and
+logout revocation.
+
+Revision ID: 0003_refresh_tokens
+Revises: 0002_hot_query_indexes
+Create Date: 2026-10-17 05:05:00.321139
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003_refresh_tokens'
+down_revision: Union[str, Sequence[str], None] = '0002_hot_query_indexes'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('refresh_tokens',
+    sa.Column('token_hash', sa.String(length=64), nullable=False),
+    sa.Column('user_id', sa.String(), nullable=False),
+    sa.Column('family_id', sa.String(), nullable=False),
+    sa.Column('issued_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('revoked_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('replaced_by', sa.String(length=64), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('token_hash')
+    )
+    with op.batch_alter_table('refresh_tokens', schema=None) as batch_op:
+        batch_op.create_index('ix_refresh_tokens_family_id', ['family_id'], unique=False)
+        batch_op.create_index('ix_refresh_tokens_user_id', ['user_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('refresh_tokens', schema=None) as batch_op:
+        batch_op.drop_index('ix_refresh_tokens_user_id')
+        batch_op.drop_index('ix_refresh_tokens_family_id')
+
+    op.drop_table('refresh_tokens')
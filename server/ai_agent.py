@@ -6,12 +6,15 @@ import os
 import json
 import numpy as np
 from typing import Dict, List, Optional, Any
-from langchain_openai import ChatOpenAI
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import JsonOutputParser
 from pydantic import BaseModel, Field
 import logging
 
+from server import llm_gateway
+from server.llm_cache import cache_key, chain_cache_key
+from server.llm_scheduler import BACKGROUND, estimate_tokens, priority
+
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -178,11 +181,9 @@ Return as valid JSON only.""")
             return False
             
         try:
-            self.llm = ChatOpenAI(
-                model="gpt-5",
-                temperature=0.3,
-                base_url="https://api.aimlapi.com/v1",
-                api_key=self.api_key,
+            self.llm = llm_gateway.chat_model(
+                "gpt-5",
+                0.3,
                 max_retries=3,
                 request_timeout=30
             )
@@ -314,15 +315,18 @@ Return as valid JSON only.""")
             behavior_data = behavior_data or {}
             past_data = past_data or {}
             
-            # Run the LangChain analysis
-            result = await self.assessment_chain.ainvoke({
+            # Run the LangChain analysis (identical inputs are served from the LLM cache)
+            inputs = {
                 "quiz_results": json.dumps(quiz_results, indent=2),
                 "behavior_data": json.dumps(behavior_data, indent=2), 
                 "past_data": json.dumps(past_data, indent=2)
-            })
-            
-            # Generate vector embedding for similarity matching
-            embedding_vector = self._generate_embedding(result["strengths"])
+            }
+            result = await llm_gateway.call(
+                chain_cache_key(self.llm, self.assessment_prompt, inputs),
+                lambda: self.assessment_chain.ainvoke(inputs),
+                tokens=estimate_tokens(inputs),
+                client="SelfDiscoveryAgent",
+            )
             
             # Format the final response
             profile = {
@@ -358,10 +362,18 @@ Return as valid JSON only.""")
             prompt = self._create_analysis_prompt(responses)
             
             # Get analysis from LLM
-            analysis = await self.llm.ainvoke(prompt)
+            async def call():
+                return (await self.llm.ainvoke(prompt)).content
+
+            content = await llm_gateway.call(
+                cache_key(self.llm.model_name, prompt, {"temperature": self.llm.temperature}),
+                call,
+                tokens=estimate_tokens(prompt),
+                client="SelfDiscoveryAgent",
+            )
             
             # Parse and return results
-            return self._parse_analysis(analysis.content)
+            return self._parse_analysis(content)
             
         except Exception as e:
             logger.error(f"Error in analyze_responses: {str(e)}")
@@ -418,11 +430,14 @@ Return as valid JSON only.""")
             logger.info(f"Generating {activity_type} with theme: {title_theme}")
             
             # Generate the quiz using ChatGPT with explicit JSON formatting
-            result = await self.quiz_generation_chain.ainvoke({
-                "activity_type": activity_type,
-                "target_cdcs": ", ".join(target_cdcs),
-                "title_theme": title_theme
-            })
+            # Not cached: each generated quiz should be fresh. Background priority
+            # so quiz generation never delays interactive analysis.
+            with priority(BACKGROUND):
+                result = await llm_gateway.call(None, lambda: self.quiz_generation_chain.ainvoke({
+                    "activity_type": activity_type,
+                    "target_cdcs": ", ".join(target_cdcs),
+                    "title_theme": title_theme
+                }), client="SelfDiscoveryAgent")
             
             # Ensure we have the required fields
             if not isinstance(result, dict):
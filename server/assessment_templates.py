@@ -1,7 +1,15 @@
 """
 Comprehensive Assessment Templates for Cognitive Demand Categories (CDC)
 Each assessment section contains 10+ questions for proper profiling
+
+The templates are static: `TEMPLATE_REGISTRY` builds them once at import into
+a read-only index by quiz_id plus the serialized `/quiz-templates` payload and
+its ETag. Use `get_template()` for a mutable copy.
 """
+import hashlib
+import json
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Optional
 
 def get_comprehensive_assessments():
     return [
@@ -895,4 +903,53 @@ def get_comprehensive_assessments():
                 }
             ]
         }
-    ]
\ No newline at end of file
+    ]
+
+
+def _freeze(value: Any) -> Any:
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+class TemplateRegistry:
+    """Templates indexed by quiz_id, with the pre-serialized list response."""
+
+    def __init__(self, templates):
+        # Same encoding as FastAPI's JSONResponse
+        self._encoded = {
+            t["quiz_id"]: json.dumps(t, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+            for t in templates
+        }
+        self.templates: Mapping[str, Mapping[str, Any]] = MappingProxyType(
+            {t["quiz_id"]: _freeze(t) for t in templates}
+        )
+        self.payload: bytes = b'{"available_quizzes":[' + b",".join(self._encoded.values()) + b"]}"
+        self.etag: str = '"' + hashlib.sha256(self.payload).hexdigest()[:32] + '"'
+
+    def __contains__(self, quiz_id: str) -> bool:
+        return quiz_id in self.templates
+
+    def get(self, quiz_id: str) -> Optional[Mapping[str, Any]]:
+        return self.templates.get(quiz_id)
+
+    def copy(self, quiz_id: str) -> Optional[Dict[str, Any]]:
+        """Fresh mutable dict for one template (e.g. to store on an Assessment row)."""
+        encoded = self._encoded.get(quiz_id)
+        return json.loads(encoded) if encoded is not None else None
+
+    def etag_matches(self, if_none_match: Optional[str]) -> bool:
+        """True if an If-None-Match header value covers the current ETag."""
+        if not if_none_match:
+            return False
+        tags = [tag.strip() for tag in if_none_match.split(",")]
+        return "*" in tags or any(tag.removeprefix("W/") == self.etag for tag in tags)
+
+
+TEMPLATE_REGISTRY = TemplateRegistry(get_comprehensive_assessments())
+
+
+def get_template(quiz_id: str) -> Optional[Dict[str, Any]]:
+    return TEMPLATE_REGISTRY.copy(quiz_id)
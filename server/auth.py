@@ -2,17 +2,28 @@
 Authentication utilities for JWT token handling
 """
 
-from datetime import datetime, timedelta
-from typing import Optional
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional, Tuple
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy import delete, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, make_transient_to_detached
+import copy
+import hashlib
 import os
+import secrets
+import threading
+import time
+import uuid
 
-from server.database import get_db
-from server.models import User
+from server.config import USER_CACHE_TTL_SECONDS, USER_CACHE_MAX_ENTRIES, REFRESH_TOKEN_EXPIRE_DAYS
+from server.database import get_db, get_async_db
+from server.metrics import CACHE_HITS, CACHE_MISSES
+from server.models import User, RefreshToken
 from server.schemas import TokenData
 
 # Security configuration
@@ -42,6 +53,102 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
+def create_user_access_token(user: User, expires_delta: Optional[timedelta] = None):
+    """Access token for ``user``: subject (email) plus user id and role claims"""
+    return create_access_token(
+        data={"sub": user.email, "uid": str(user.id), "role": user.user_role},
+        expires_delta=expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES),
+    )
+
+def _refresh_token_hash(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+def _utc(value: datetime) -> datetime:
+    # SQLite hands back naive datetimes; everything is stored in UTC
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+_refresh_exception = HTTPException(
+    status_code=status.HTTP_401_UNAUTHORIZED,
+    detail="Invalid or expired refresh token",
+    headers={"WWW-Authenticate": "Bearer"},
+)
+
+async def issue_refresh_token(db: AsyncSession, user_id: str, family_id: Optional[str] = None) -> str:
+    """Create a refresh token for ``user_id`` (a new family unless rotating); the caller commits.
+
+    Only the sha256 of the opaque token is stored.
+    """
+    token = secrets.token_urlsafe(32)
+    db.add(RefreshToken(
+        token_hash=_refresh_token_hash(token),
+        user_id=str(user_id),
+        family_id=family_id or str(uuid.uuid4()),
+        expires_at=datetime.now(timezone.utc) + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS),
+    ))
+    return token
+
+async def _revoke_family(db: AsyncSession, family_id: str, now: datetime) -> None:
+    await db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.family_id == family_id, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=now)
+    )
+
+async def rotate_refresh_token(db: AsyncSession, token: str) -> Tuple[User, str]:
+    """Exchange a refresh token for its successor; returns (user, new token).
+
+    The presented token is revoked in the same conditional UPDATE that checks
+    it is still live, so it can be used once. Presenting a token that was
+    already rotated or revoked means it leaked (or the client replayed it):
+    the whole family is revoked and the session has to log in again.
+    """
+    token_hash = _refresh_token_hash(token)
+    row = await db.get(RefreshToken, token_hash)
+    now = datetime.now(timezone.utc)
+    if row is None:
+        raise _refresh_exception
+    if row.revoked_at is not None:
+        await _revoke_family(db, row.family_id, now)
+        await db.commit()
+        raise _refresh_exception
+    if _utc(row.expires_at) <= now:
+        raise _refresh_exception
+    # Plain values: `row` is expired by the rollback below
+    user_id, family_id = row.user_id, row.family_id
+
+    user = await db.get(User, user_id)
+    if user is None or not user.is_active:
+        raise _refresh_exception
+
+    new_token = await issue_refresh_token(db, user_id, family_id)
+    claimed = await db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.token_hash == token_hash, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=now, replaced_by=_refresh_token_hash(new_token))
+        .execution_options(synchronize_session=False)
+    )
+    if claimed.rowcount != 1:
+        # A concurrent refresh used this token first: treat as reuse
+        await db.rollback()
+        await _revoke_family(db, family_id, now)
+        await db.commit()
+        raise _refresh_exception
+    # Housekeeping: this user's expired tokens are no longer needed for reuse detection
+    await db.execute(
+        delete(RefreshToken)
+        .where(RefreshToken.user_id == user_id, RefreshToken.expires_at < now)
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    return user, new_token
+
+async def revoke_refresh_token(db: AsyncSession, token: str) -> None:
+    """Logout: revoke the token's whole family (unknown tokens are ignored)"""
+    row = await db.get(RefreshToken, _refresh_token_hash(token))
+    if row is not None:
+        await _revoke_family(db, row.family_id, datetime.now(timezone.utc))
+        await db.commit()
+
 def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)):
     """Verify JWT token"""
     credentials_exception = HTTPException(
@@ -54,18 +161,133 @@ def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)):
         email = payload.get("sub")
         if email is None:
             raise credentials_exception
-        token_data = TokenData(email=email)
+        token_data = TokenData(email=email, user_id=payload.get("uid"), role=payload.get("role"))
     except JWTError:
         raise credentials_exception
     return token_data
 
-def get_current_user(token_data: TokenData = Depends(verify_token), db: Session = Depends(get_db)):
-    """Get current user from token"""
-    user = db.query(User).filter(User.email == token_data.email).first()
-    print(f"Current user: {user.user_role if user else 'None'}")
+class UserCache:
+    """Bounded TTL cache of resolved users keyed by token subject.
+
+    Stores column values, not ORM instances: every request gets its own
+    detached `User` built from them, so routes can modify and commit it on
+    their session without touching other requests' copies.
+    """
+
+    _COLUMNS = tuple(attr.key for attr in User.__mapper__.column_attrs)
+
+    def __init__(self, ttl_seconds: float, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0 and self.max_entries > 0
+
+    def get(self, subject: str) -> Optional[User]:
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._entries.get(subject)
+            if entry is not None and entry[0] <= time.monotonic():
+                del self._entries[subject]
+                entry = None
+            if entry is None:
+                CACHE_MISSES.labels("current_user").inc()
+                return None
+            self._entries.move_to_end(subject)
+            values = copy.deepcopy(entry[1])
+        CACHE_HITS.labels("current_user").inc()
+        user = User(**values)
+        make_transient_to_detached(user)
+        return user
+
+    def set(self, subject: str, user: User) -> None:
+        if not self.enabled:
+            return
+        values = copy.deepcopy({key: getattr(user, key) for key in self._COLUMNS})
+        with self._lock:
+            self._entries[subject] = (time.monotonic() + self.ttl_seconds, values)
+            self._entries.move_to_end(subject)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: Any) -> None:
+        """Drop every entry for this user (call after changing the users row)"""
+        user_id = str(user_id)
+        with self._lock:
+            for subject in [s for s, (_, values) in self._entries.items() if str(values.get("id")) == user_id]:
+                del self._entries[subject]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+user_cache = UserCache(USER_CACHE_TTL_SECONDS, USER_CACHE_MAX_ENTRIES)
+
+def _user_not_found() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="User not found"
+    )
+
+async def get_current_user(token_data: TokenData = Depends(verify_token), db: AsyncSession = Depends(get_async_db)):
+    """Get current user from token
+    
+    Served from `user_cache` when possible (no query); otherwise loaded by the
+    token's user id claim (by email for older tokens). The returned user is
+    attached to the request's async session. Routes on a sync `get_db` session
+    use `get_current_user_sync` instead. Routes that change the users row must
+    call `user_cache.invalidate(user.id)`.
+    """
+    user = user_cache.get(token_data.email)
+    if user is not None:
+        db.add(user)
+        return user
+    if token_data.user_id:
+        user = await db.get(User, token_data.user_id)
+        if user is not None and user.email != token_data.email:
+            user = None
+    else:
+        user = (await db.execute(select(User).where(User.email == token_data.email))).scalars().first()
     if user is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found"
-        )
-    return user
\ No newline at end of file
+        raise _user_not_found()
+    user_cache.set(token_data.email, user)
+    return user
+
+def get_current_user_sync(token_data: TokenData = Depends(verify_token), db: Session = Depends(get_db)):
+    """`get_current_user` for routes on a sync `get_db` session.
+
+    Same cache and lookup, but the user is loaded on (and attached to) the
+    route's own session, so the request holds a single connection.
+    """
+    user = user_cache.get(token_data.email)
+    if user is not None:
+        db.add(user)
+        return user
+    if token_data.user_id:
+        user = db.get(User, token_data.user_id)
+        if user is not None and user.email != token_data.email:
+            user = None
+    else:
+        user = db.query(User).filter(User.email == token_data.email).first()
+    if user is None:
+        raise _user_not_found()
+    user_cache.set(token_data.email, user)
+    return user
+
+async def get_token_user(token_data: TokenData = Depends(verify_token), db: Session = Depends(get_db)) -> TokenData:
+    """Caller's id and role straight from the token claims, without loading the user.
+
+    For routes that only authorize by id/role. Claims are fixed when the token
+    is issued, so a role change applies from the next token. Tokens issued
+    before the claims existed fall back to `get_current_user_sync` on the
+    route's `get_db` session.
+    """
+    if token_data.user_id and token_data.role:
+        return token_data
+    user = get_current_user_sync(token_data, db)
+    return TokenData(email=user.email, user_id=str(user.id), role=user.user_role)
\ No newline at end of file
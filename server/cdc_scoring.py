@@ -0,0 +1,595 @@
+"""
+Deterministic CDC scoring for the built-in assessment templates.
+
+Turns saved responses (``{quiz_id: {question_id: answer}}``) into the 12 CDC
+strengths, sensitivities and preferences with no LLM call, using each
+question's ``cdc_targets`` from `server/assessment_templates.py` plus the
+per-template rules below:
+
+- likert: sensitivity sliders lower the targeted strength and set a
+  sensitivity level; tolerance sliders raise it
+- checkbox: recorded as preferences / sensitivities
+- drag_drop_buckets: each item's bucket (Must / Nice-to-have / Avoid) maps to
+  strength evidence, sensitivities and preferences
+- multiple_choice: option overrides per question, else a small lexicon
+  (difficulty / strategy / fluency wording); preference-only questions only
+  fill ``preferences``
+- open_text: answer length as weak evidence
+
+Every answer becomes weighted evidence for its target CDCs; strengths are the
+weighted mean per CDC and per-CDC confidence grows with the evidence weight.
+CDCs without evidence are left as None. Evidence is stored per quiz in
+``evidence_sources`` so a new submission (`apply_quiz`) only recomputes the
+CDCs that quiz targets. The LLM analysis in
+`SelfDiscoveryAgent.analyze_cognitive_profile` is optional enrichment on top
+(`merge_enrichment`).
+"""
+from __future__ import annotations
+
+import copy
+import json
+import math
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from server.assessment_templates import TEMPLATE_REGISTRY
+from server.matching import CDC_FIELDS
+
+_CDC_INDEX = {c: i for i, c in enumerate(CDC_FIELDS)}
+
+# Evidence weight per question type (open text is only a length heuristic)
+TYPE_WEIGHTS = {
+    "likert": 1.0,
+    "multiple_choice": 1.0,
+    "drag_drop_buckets": 1.0,
+    "checkbox": 0.5,
+    "open_text": 0.5,
+}
+
+# Evidence weight at which a CDC reaches ~63% confidence (1 - e^-1)
+CONFIDENCE_SCALE = 3.0
+
+LEVELS = {"low": 0, "medium": 1, "high": 2}
+
+# Specific sensitivities roll up into the CDC keys the matcher penalizes
+SENSITIVITY_CDC = {
+    "noise": "sensory_processing",
+    "light": "sensory_processing",
+    "texture": "sensory_processing",
+    "interruptions": "attention_filtering",
+    "context_switching": "multitasking_context_switching",
+}
+
+# Multiple-choice lexicon: first matching group wins, otherwise NEUTRAL
+NEUTRAL = 0.6
+_LEXICON: List[Tuple[float, Tuple[str, ...]]] = [
+    (0.35, (
+        "struggle", "challenging", "overwhelming", "exhausting", "frustrated",
+        "lose my train", "distracted", "sensitive to", "need longer breaks",
+        "decreases", "prefer alternative",
+    )),
+    (0.9, (
+        "smoothly", "easily", "quickly", "effectively", "confidently",
+        "straight through", "deep focus", "tuning out", "simultaneously",
+        "in parallel", "comfortable with various", "improves", "power through",
+        "pressure doesn't affect", "enjoy the precision", "push through",
+    )),
+    (0.75, (
+        "batch", "scheduled", "plan", "tools", "organize", "prioritize",
+        "systematic", "structured", "break it down", "break the problem",
+        "step-by-step", "write down", "notes", "milestones", "pros and cons",
+    )),
+]
+
+# Multiple-choice answers that also reveal a sensitivity
+_SENSITIVITY_MARKERS: Dict[str, Tuple[str, str]] = {
+    "complete silence": ("noise", "high"),
+    "sensitive to certain textures": ("texture", "high"),
+    "minimal lighting": ("light", "high"),
+    "soft, warm lighting": ("light", "medium"),
+    "overstimulating": ("noise", "high"),
+    "find it overwhelming": ("interruptions", "high"),
+    "feel frustrated and need time": ("interruptions", "high"),
+    "lose my train of thought": ("interruptions", "high"),
+    "switching mentally exhausting": ("context_switching", "high"),
+    "task switching quite challenging": ("context_switching", "high"),
+    "minimal sensory input": ("noise", "medium"),
+}
+
+# Work Environment Matchmaker items. "support" items are accommodations (Must =
+# needs it); "demand" items are job conditions (Must/Nice = copes with it).
+# preference = (key, value when wanted, value when avoided or None)
+_WEM_ITEMS: Dict[str, Dict[str, Any]] = {
+    "Quiet space": {"cdc": "sensory_processing", "kind": "support", "sensitivity": "noise", "preference": ("environment", "quiet", None)},
+    "Noise-cancelling headphones": {"cdc": "sensory_processing", "kind": "support", "sensitivity": "noise", "preference": ("headphones", "preferred", "avoided")},
+    "Natural lighting": {"cdc": "sensory_processing", "kind": "support", "sensitivity": "light", "preference": ("lighting", "natural", None)},
+    "Visual instructions": {"cdc": "communication_interpretation", "kind": "support", "preference": ("instructions", "visual", None)},
+    "Async communication": {"cdc": "verbal_communication", "kind": "support", "preference": ("communication", "async/written", "synchronous")},
+    "Clear written agendas": {"cdc": "executive_function", "kind": "support", "preference": ("structure", "written agendas", None)},
+    "Flexible hours": {"cdc": "executive_function", "kind": "support", "preference": ("schedule", "flexible", "fixed")},
+    "Open office chatter": {"cdc": "attention_filtering", "kind": "demand", "sensitivity": "noise"},
+    "Frequent context switching": {"cdc": "multitasking_context_switching", "kind": "demand", "sensitivity": "context_switching"},
+    "Pair programming": {"cdc": "verbal_communication", "kind": "demand", "preference": ("collaboration", "pairing", "solo")},
+}
+# bucket -> strength evidence / sensitivity level, by item kind
+_WEM_STRENGTH = {
+    "support": {"Must": 0.45, "Nice-to-have": 0.6, "Avoid": 0.75},
+    "demand": {"Must": 0.85, "Nice-to-have": 0.7, "Avoid": 0.35},
+}
+_WEM_SENSITIVITY = {
+    "support": {"Must": "high", "Nice-to-have": "medium", "Avoid": "low"},
+    "demand": {"Must": "low", "Nice-to-have": "low", "Avoid": "high"},
+}
+
+# Per-template rules: preference-only questions, option overrides, likert direction
+TEMPLATE_RULES: Dict[str, Dict[str, Any]] = {
+    "sensory_profile_tolerance": {
+        # slider -> (sensitivity key, True if a high value means high sensitivity)
+        "likert": {
+            "light": ("light", True),
+            "noise": ("noise", True),
+            "interruptions": ("interruptions", True),
+            "texture": ("texture", True),
+            "context_switching": ("context_switching", False),
+        },
+        "checkbox": {
+            "headphones_ok": {"preference": ("headphones", "acceptable")},
+            "prefers_dim_light": {"preference": ("lighting", "dim"), "sensitivity": ("light", "medium")},
+            "needs_breaks_when_overwhelmed": {"preference": ("breaks", "short breaks when overwhelmed")},
+        },
+    },
+    "focus_attention_assessment": {
+        "preferences": {
+            "focus_env_1": "focus_environment",
+            "focus_time_1": "peak_focus_time",
+            "attention_energy_1": "focus_conditions",
+        },
+        "options": {
+            "distraction_mgmt_1": {"Immediately check and respond": 0.4},
+            "focus_duration_1": {
+                "25-30 minutes (Pomodoro style)": 0.5,
+                "45-60 minutes with short breaks": 0.7,
+                "1.5-2 hours deep focus blocks": 0.9,
+                "It varies depending on my energy": 0.6,
+            },
+            "attention_task_1": {
+                "Take short 5-minute breaks every 30 minutes": 0.65,
+                "Switch between 2-3 related tasks": 0.6,
+            },
+            "focus_interruption_1": {"I need a moment to remember what I was doing": 0.55},
+        },
+    },
+    "pattern_spatial_assessment": {
+        "preferences": {
+            "pattern_complex_1": "pattern_domain",
+            "spatial_org_1": "workspace_organization",
+        },
+        "options": {
+            "spatial_visualization_1": {
+                "I prefer to use physical models or drawings": 0.6,
+                "I need multiple views or angles to understand": 0.5,
+                "I work better with 2D representations": 0.5,
+            },
+            "spatial_memory_1": {
+                "Visualize the exact location in my mind": 0.85,
+                "Create mental maps of important item locations": 0.85,
+            },
+            "data_pattern_1": {
+                "Spotting inconsistencies and errors": 0.8,
+                "Seeing trends and patterns over time": 0.85,
+                "Finding connections between different pieces": 0.8,
+            },
+        },
+    },
+    "communication_assessment": {
+        "preferences": {
+            "written_comm_1": "communication_channel",
+            "feedback_style_1": "feedback_style",
+            "virtual_comm_1": "virtual_communication",
+        },
+        "options": {
+            "presentation_style_1": {"Speaking spontaneously with minimal notes": 0.85},
+            "group_dynamics_1": {"Take a leadership role and guide the conversation": 0.85},
+            "nonverbal_reading_1": {
+                "What people say directly and explicitly": 0.5,
+                "Tone of voice and emotional undertones": 0.8,
+                "Body language and facial expressions": 0.8,
+                "The context and implied meanings": 0.85,
+            },
+        },
+    },
+    "creative_executive_assessment": {
+        "preferences": {
+            "creative_environment_1": "creative_environment",
+            "motivation_style_1": "motivation",
+            "inspiration_source_1": "inspiration_source",
+        },
+        "options": {
+            "creative_process_1": {"Brainstorm many ideas quickly, then refine the best ones": 0.85},
+            "innovation_1": {
+                "Challenging assumptions about how things work": 0.85,
+                "Imagining ideal solutions without current constraints": 0.85,
+            },
+            "task_management_1": {"Work on whatever feels most engaging at the moment": 0.45},
+        },
+    },
+    "processing_motor_assessment": {
+        "preferences": {
+            "input_method_1": "input_method",
+        },
+        "options": {
+            "processing_pace_1": {
+                "Fast-paced with lots of information quickly": 0.9,
+                "Moderate pace with time to ask questions": 0.65,
+                "Slower pace with time to fully process each concept": 0.4,
+                "Variable pace depending on the complexity": 0.6,
+            },
+            "response_time_1": {
+                "Quick responses with immediate thoughts": 0.85,
+                "Preferring to respond after the meeting via email": 0.45,
+            },
+            "typing_preference_1": {
+                "Fast typing with occasional corrections": 0.85,
+                "Steady, accurate typing without rushing": 0.75,
+                "Handwriting when possible for better thinking": 0.55,
+            },
+            "coordination_comfort_1": {
+                "I prefer simpler tools when possible": 0.5,
+                "I often find alternative approaches": 0.45,
+            },
+        },
+    },
+    "multitasking_sensory_assessment": {
+        "preferences": {
+            "sensory_environment_1": "lighting",
+            "mental_energy_1": "recharge",
+        },
+        "options": {
+            "multitask_approach_1": {
+                "Switch between tasks throughout the day as needed": 0.8,
+                "Focus on one task completely before starting another": 0.45,
+            },
+            "auditory_processing_1": {
+                "I can work with moderate ambient noise around me": 0.8,
+                "I work better with complete silence": 0.4,
+            },
+            "sensory_overload_1": {
+                "Take a break in a quiet, calm space": 0.55,
+                "Remove myself from the overstimulating situation": 0.45,
+            },
+        },
+    },
+}
+
+
+def _index_templates() -> Dict[str, Dict[str, Dict[str, Any]]]:
+    return {
+        t["quiz_id"]: {q["question_id"]: q for q in t.get("questions", [])}
+        for t in TEMPLATE_REGISTRY.templates.values()
+    }
+
+
+# quiz_id -> question_id -> question (templates are static)
+TEMPLATE_QUESTIONS = _index_templates()
+
+
+def _lexicon_value(option: str) -> float:
+    text = option.lower()
+    for value, markers in _LEXICON:
+        if any(m in text for m in markers):
+            return value
+    return NEUTRAL
+
+
+def _as_bool(answer: Any) -> bool:
+    if isinstance(answer, str):
+        return answer.strip().lower() in ("true", "yes", "1", "on", "checked")
+    return bool(answer)
+
+
+class _Evidence:
+    """Collects (cdc, value, weight) observations plus sensitivities and preferences."""
+
+    def __init__(self):
+        self.cdc: List[int] = []
+        self.values: List[float] = []
+        self.weights: List[float] = []
+        self.sensitivities: Dict[str, str] = {}
+        self.preferences: Dict[str, Any] = {}
+
+    def add(self, cdc: str, value: float, weight: float, quiz_id: str) -> None:
+        if cdc not in _CDC_INDEX or weight <= 0:
+            return
+        self.cdc.append(_CDC_INDEX[cdc])
+        self.values.append(min(1.0, max(0.0, float(value))))
+        self.weights.append(weight)
+
+    def sensitivity(self, key: str, level: str) -> None:
+        # Keep the strongest level reported for a key
+        if LEVELS.get(level, -1) > LEVELS.get(self.sensitivities.get(key, ""), -1):
+            self.sensitivities[key] = level
+
+
+def _score_likert(ev: _Evidence, quiz_id: str, rules: Dict[str, Any], question: Dict[str, Any], answer: Any) -> None:
+    try:
+        raw = float(answer)
+    except (TypeError, ValueError):
+        return
+    lo, hi = float(question.get("min", 1)), float(question.get("max", 7))
+    level = (min(hi, max(lo, raw)) - lo) / (hi - lo) if hi > lo else 0.5
+    key, sensitive_when_high = rules.get("likert", {}).get(question["question_id"], (None, True))
+    sensitivity = level if sensitive_when_high else 1.0 - level
+    strength = 1.0 - 0.6 * sensitivity
+    for cdc in question.get("cdc_targets", []):
+        ev.add(cdc, strength, TYPE_WEIGHTS["likert"], quiz_id)
+    if key:
+        ev.sensitivity(key, "high" if sensitivity >= 0.8 else "medium" if sensitivity >= 0.5 else "low")
+
+
+def _score_checkbox(ev: _Evidence, rules: Dict[str, Any], question: Dict[str, Any], answer: Any) -> None:
+    if not _as_bool(answer):
+        return
+    rule = rules.get("checkbox", {}).get(question["question_id"], {})
+    if "preference" in rule:
+        key, value = rule["preference"]
+        ev.preferences[key] = value
+    if "sensitivity" in rule:
+        ev.sensitivity(*rule["sensitivity"])
+
+
+def _score_buckets(ev: _Evidence, quiz_id: str, question: Dict[str, Any], answer: Any) -> None:
+    try:
+        buckets = json.loads(answer) if isinstance(answer, str) else (answer or {})
+    except ValueError:
+        return
+    if not isinstance(buckets, dict):
+        return
+    for item, bucket in buckets.items():
+        spec = _WEM_ITEMS.get(item)
+        if spec is None or bucket not in _WEM_STRENGTH["support"]:
+            continue
+        kind = spec["kind"]
+        # One bucketed item is half the weight of a full question
+        ev.add(spec["cdc"], _WEM_STRENGTH[kind][bucket], TYPE_WEIGHTS["drag_drop_buckets"] / 2, quiz_id)
+        if "sensitivity" in spec:
+            ev.sensitivity(spec["sensitivity"], _WEM_SENSITIVITY[kind][bucket])
+        if "preference" in spec:
+            key, wanted, avoided = spec["preference"]
+            value = avoided if bucket == "Avoid" else wanted
+            if value is not None:
+                ev.preferences[key] = value
+
+
+def _score_choice(ev: _Evidence, quiz_id: str, rules: Dict[str, Any], question: Dict[str, Any], answer: Any) -> None:
+    if not isinstance(answer, str) or not answer.strip():
+        return
+    qid = question["question_id"]
+    text = answer.strip()
+    for marker, (key, level) in _SENSITIVITY_MARKERS.items():
+        if marker in text.lower():
+            ev.sensitivity(key, level)
+    pref_key = rules.get("preferences", {}).get(qid)
+    if pref_key:
+        ev.preferences[pref_key] = text
+        return
+    value = rules.get("options", {}).get(qid, {}).get(text)
+    if value is None:
+        value = _lexicon_value(text)
+    for cdc in question.get("cdc_targets", []):
+        ev.add(cdc, value, TYPE_WEIGHTS["multiple_choice"], quiz_id)
+
+
+def _score_open_text(ev: _Evidence, quiz_id: str, question: Dict[str, Any], answer: Any) -> None:
+    words = len(str(answer or "").split())
+    if not words:
+        return
+    # Same shape as the heuristic grader: longer, more detailed answers score higher
+    value = 0.4 + min(0.5, words / 80.0)
+    for cdc in question.get("cdc_targets", []):
+        ev.add(cdc, value, TYPE_WEIGHTS["open_text"], quiz_id)
+
+
+def collect_evidence(responses_by_quiz: Dict[str, Dict[str, Any]]) -> _Evidence:
+    """Run the per-template rules over ``{quiz_id: {question_id: answer}}``; unknown quizzes are skipped."""
+    ev = _Evidence()
+    for quiz_id, answers in responses_by_quiz.items():
+        questions = TEMPLATE_QUESTIONS.get(quiz_id)
+        if not questions or not isinstance(answers, dict):
+            continue
+        rules = TEMPLATE_RULES.get(quiz_id, {})
+        for qid, answer in answers.items():
+            question = questions.get(qid)
+            if question is None:
+                continue
+            qtype = question.get("question_type")
+            if qtype == "likert":
+                _score_likert(ev, quiz_id, rules, question, answer)
+            elif qtype == "checkbox":
+                _score_checkbox(ev, rules, question, answer)
+            elif qtype == "drag_drop_buckets":
+                _score_buckets(ev, quiz_id, question, answer)
+            elif qtype == "multiple_choice":
+                _score_choice(ev, quiz_id, rules, question, answer)
+            elif qtype == "open_text":
+                _score_open_text(ev, quiz_id, question, answer)
+    return ev
+
+
+def quiz_evidence(quiz_id: str, answers: Dict[str, Any]) -> Dict[str, Any]:
+    """Evidence one quiz submission contributes.
+
+    Returns ``{"cdc": {cdc: [mean, weight]}, "sensitivities", "preferences"}``;
+    only CDCs the answers actually touched appear under ``cdc``.
+    """
+    ev = collect_evidence({quiz_id: answers})
+    n = len(CDC_FIELDS)
+    idx = np.asarray(ev.cdc, dtype=np.int64)
+    weights = np.asarray(ev.weights, dtype=np.float64)
+    values = np.asarray(ev.values, dtype=np.float64)
+    weight_sum = np.bincount(idx, weights=weights, minlength=n)
+    value_sum = np.bincount(idx, weights=weights * values, minlength=n)
+    return {
+        "cdc": {
+            cdc: [round(float(value_sum[i] / weight_sum[i]), 4), round(float(weight_sum[i]), 4)]
+            for i, cdc in enumerate(CDC_FIELDS)
+            if weight_sum[i] > 0
+        },
+        "sensitivities": ev.sensitivities,
+        "preferences": ev.preferences,
+    }
+
+
+def _rollup_sensitivities(by_quiz: Dict[str, Dict[str, str]]) -> Dict[str, str]:
+    """Strongest level per key across quizzes, also rolled up to the CDC keys."""
+    levels: Dict[str, str] = {}
+    for sensitivities in by_quiz.values():
+        for key, level in sensitivities.items():
+            for target in (key, SENSITIVITY_CDC.get(key)):
+                if target and LEVELS[level] > LEVELS.get(levels.get(target, ""), -1):
+                    levels[target] = level
+    return levels
+
+
+def _confidence(weight: float) -> float:
+    return round(1.0 - math.exp(-weight / CONFIDENCE_SCALE), 3)
+
+
+def apply_quiz(profile: Dict[str, Any], quiz_id: str, answers: Dict[str, Any]) -> Dict[str, Any]:
+    """Fold one quiz submission into a profile, replacing that quiz's earlier evidence.
+
+    ``profile`` holds ``strengths``, ``sensitivities``, ``preferences`` and
+    ``evidence`` (the `evidence_sources` JSON). Per-CDC evidence is kept per
+    quiz as ``[mean, weight]``, so only the CDCs this quiz targets (now or
+    before) are recomputed, as the weight-averaged mean over their quizzes;
+    other strengths, e.g. ones filled by LLM enrichment, are left alone.
+    Returns the new profile plus ``confidence_score`` and ``updated`` (the
+    recomputed CDCs). The input is not modified.
+    """
+    contribution = quiz_evidence(quiz_id, answers)
+    evidence = copy.deepcopy(profile.get("evidence") or {})
+    per_cdc: Dict[str, Dict[str, List[float]]] = evidence.setdefault("cdc_evidence", {})
+    confidence: Dict[str, float] = evidence.setdefault("cdc_confidence", {})
+    strengths = dict(profile.get("strengths") or {})
+
+    touched = set(contribution["cdc"]) | {cdc for cdc, quizzes in per_cdc.items() if quiz_id in quizzes}
+    for cdc in touched:
+        quizzes = per_cdc.setdefault(cdc, {})
+        if cdc in contribution["cdc"]:
+            quizzes[quiz_id] = contribution["cdc"][cdc]
+        else:
+            quizzes.pop(quiz_id, None)
+        weight = sum(w for _, w in quizzes.values())
+        strengths[cdc] = round(sum(v * w for v, w in quizzes.values()) / weight, 3) if weight > 0 else None
+        confidence[cdc] = _confidence(weight)
+        if not quizzes:
+            del per_cdc[cdc]
+    for cdc in CDC_FIELDS:
+        confidence.setdefault(cdc, 0.0)
+        strengths.setdefault(cdc, None)
+
+    by_quiz: Dict[str, Dict[str, str]] = evidence.setdefault("quiz_sensitivities", {})
+    previous = _rollup_sensitivities(by_quiz)
+    by_quiz[quiz_id] = contribution["sensitivities"]
+    derived = _rollup_sensitivities(by_quiz)
+    # Keys not derived from quizzes (e.g. from LLM enrichment) are kept
+    sensitivities = {k: v for k, v in (profile.get("sensitivities") or {}).items() if k not in previous}
+    sensitivities.update(derived)
+
+    evidence["cdc_sources"] = {cdc: sorted(quizzes) for cdc, quizzes in per_cdc.items()}
+    evidence["quiz_ids"] = sorted(set(evidence.get("quiz_ids") or []) | {quiz_id})
+    evidence.setdefault("scoring", "local")
+    return {
+        "strengths": strengths,
+        "sensitivities": sensitivities,
+        "preferences": {**(profile.get("preferences") or {}), **contribution["preferences"]},
+        "evidence": evidence,
+        "confidence_score": round(sum(confidence[c] for c in CDC_FIELDS) / len(CDC_FIELDS), 3),
+        "updated": sorted(touched),
+    }
+
+
+def _label(cdc: str) -> str:
+    return cdc.replace("_", " ")
+
+
+def local_profile(user_id: str, responses_by_quiz: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """Cognitive profile from template responses alone, shaped like the agent's profile result.
+
+    Built by folding each quiz through `apply_quiz`, so it matches a profile
+    kept current one submission at a time.
+    """
+    state: Dict[str, Any] = {"strengths": {}, "sensitivities": {}, "preferences": {}, "evidence": {}}
+    for quiz_id in sorted(responses_by_quiz):
+        answers = responses_by_quiz[quiz_id]
+        if quiz_id in TEMPLATE_QUESTIONS and isinstance(answers, dict):
+            state = apply_quiz(state, quiz_id, answers)
+    if "confidence_score" not in state:
+        state = {**state, "strengths": {c: None for c in CDC_FIELDS}, "confidence_score": 0.0}
+    analysis, recommendations = describe(state["strengths"], state["sensitivities"])
+    return {
+        "user_id": user_id,
+        "strengths": state["strengths"],
+        "sensitivities": state["sensitivities"],
+        "preferences": state["preferences"],
+        "embedding": f"vector://ndsp/{user_id}",
+        "evidence": state["evidence"],
+        "confidence_score": state["confidence_score"],
+        "analysis": analysis,
+        "recommendations": recommendations,
+    }
+
+
+def describe(strengths: Dict[str, Optional[float]], sensitivities: Dict[str, str]) -> Tuple[str, List[str]]:
+    """Short deterministic summary and recommendations for a scored profile."""
+    known = {c: v for c, v in strengths.items() if v is not None}
+    top = sorted(known, key=known.get, reverse=True)[:3]
+    high = sorted(k for k, v in sensitivities.items() if v == "high" and k not in _CDC_INDEX)
+
+    if top:
+        analysis = "Strongest areas from your assessments: " + ", ".join(_label(c) for c in top) + "."
+        if high:
+            analysis += " High sensitivity to " + ", ".join(_label(k) for k in high) + "."
+    else:
+        analysis = "Complete an assessment to build your cognitive profile."
+
+    recommendations: List[str] = []
+    if sensitivities.get("noise") == "high":
+        recommendations.append("Look for quiet workspaces or roles that allow noise-cancelling headphones")
+    if sensitivities.get("light") in ("high", "medium"):
+        recommendations.append("Ask for adjustable or indirect lighting")
+    if sensitivities.get("interruptions") == "high":
+        recommendations.append("Protect focus blocks and batch notifications")
+    if sensitivities.get("context_switching") == "high":
+        recommendations.append("Prefer roles with fewer, longer tasks over frequent context switching")
+    for cdc in top[:2]:
+        recommendations.append(f"Highlight your {_label(cdc)} in applications and interviews")
+    return analysis, recommendations
+
+
+def merge_enrichment(local: Dict[str, Any], enriched: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Layer an LLM profile over a local one.
+
+    Local strengths stay authoritative where they have evidence; the LLM only
+    fills CDCs the templates did not cover, adds sensitivities/preferences the
+    rules did not set, and replaces the narrative (analysis, recommendations).
+    """
+    if not enriched:
+        return local
+    merged = dict(local)
+    merged["strengths"] = {
+        cdc: value if value is not None else (enriched.get("strengths") or {}).get(cdc)
+        for cdc, value in local["strengths"].items()
+    }
+    merged["sensitivities"] = {**(enriched.get("sensitivities") or {}), **local["sensitivities"]}
+    merged["preferences"] = {**(enriched.get("preferences") or {}), **local["preferences"]}
+    merged["evidence"] = {**local["evidence"], "scoring": "local+llm"}
+    if enriched.get("analysis"):
+        merged["analysis"] = enriched["analysis"]
+    if enriched.get("recommendations"):
+        merged["recommendations"] = enriched["recommendations"]
+    try:
+        merged["confidence_score"] = round(max(float(local["confidence_score"]), float(enriched.get("confidence_score") or 0.0)), 3)
+    except (TypeError, ValueError):
+        pass
+    return merged
@@ -9,3 +9,99 @@ load_dotenv()
 # Job Match threshold: when set to 0, show all ND profiles as matches
 # Default to 0 for preview mode when not provided
 JM_THRESHOLD = int(os.getenv("JM_THRESHOLD", "0") or "0")
+
+# Background job-match materializer (only runs when JM_THRESHOLD > 0)
+JM_MATERIALIZER_ENABLED = (os.getenv("JM_MATERIALIZER_ENABLED", "true") or "true").lower() in ("1", "true", "yes")
+# Seconds to let change marks accumulate before rescoring the dirty users/jobs
+JM_COALESCE_SECONDS = float(os.getenv("JM_COALESCE_SECONDS", "2") or "2")
+# Optional safety-net full pass interval in seconds; 0 = startup pass only
+JM_REFRESH_SECONDS = int(os.getenv("JM_REFRESH_SECONDS", "0") or "0")
+
+# Candidates kept per job in the employer top-matches shortlists
+JM_TOP_K = int(os.getenv("JM_TOP_K", "10") or "10")
+
+# Match cascade: how many heuristic top jobs get an LLM refinement per request,
+# and the wall-clock budget for those calls (0 disables the LLM stage)
+JM_AI_TOP_N = int(os.getenv("JM_AI_TOP_N", "10") or "10")
+JM_AI_BUDGET_SECONDS = float(os.getenv("JM_AI_BUDGET_SECONDS", "3") or "3")
+
+# LLM response cache (server/llm_cache.py): memory LRU + SQLite disk tier
+LLM_CACHE_ENABLED = (os.getenv("LLM_CACHE_ENABLED", "true") or "true").lower() in ("1", "true", "yes")
+LLM_CACHE_TTL_SECONDS = float(os.getenv("LLM_CACHE_TTL_SECONDS", "86400") or "86400")
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "1024") or "1024")
+LLM_CACHE_DISK_MAX_ENTRIES = int(os.getenv("LLM_CACHE_DISK_MAX_ENTRIES", "20000") or "20000")
+# Empty string disables the disk tier
+LLM_CACHE_PATH = os.getenv(
+    "LLM_CACHE_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache", "llm_cache.sqlite3"),
+)
+
+# LLM gateway (server/llm_gateway.py): one pooled connection set per process
+AIML_BASE_URL = os.getenv("AIML_BASE_URL", "https://api.aimlapi.com/v1")
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "20") or "20")
+LLM_MAX_KEEPALIVE = int(os.getenv("LLM_MAX_KEEPALIVE", "10") or "10")
+LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", "60") or "60")
+
+# LLM circuit breaker: open after N consecutive failures or N consecutive calls
+# slower than the latency SLO; retry one probe call after the cooldown
+LLM_BREAKER_FAILURES = int(os.getenv("LLM_BREAKER_FAILURES", "5") or "5")
+LLM_BREAKER_SLOW_CALLS = int(os.getenv("LLM_BREAKER_SLOW_CALLS", "5") or "5")
+LLM_LATENCY_SLO_SECONDS = float(os.getenv("LLM_LATENCY_SLO_SECONDS", "20") or "20")
+LLM_BREAKER_COOLDOWN_SECONDS = float(os.getenv("LLM_BREAKER_COOLDOWN_SECONDS", "30") or "30")
+# Overall budget for every LLM call made while serving one HTTP request
+LLM_REQUEST_DEADLINE_SECONDS = float(os.getenv("LLM_REQUEST_DEADLINE_SECONDS", "25") or "25")
+
+# LLM scheduler (server/llm_scheduler.py): concurrency cap and per-minute budgets
+# (0 = unlimited). Interactive calls are served before background ones.
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8") or "8")
+LLM_RPM_LIMIT = int(os.getenv("LLM_RPM_LIMIT", "0") or "0")
+LLM_TPM_LIMIT = int(os.getenv("LLM_TPM_LIMIT", "0") or "0")
+# Token estimate charged when a caller gives none
+LLM_DEFAULT_CALL_TOKENS = int(os.getenv("LLM_DEFAULT_CALL_TOKENS", "1500") or "1500")
+
+# Background task queue (server/task_queue.py)
+TASK_WORKERS = int(os.getenv("TASK_WORKERS", "4") or "4")
+# How often idle workers re-check the table (new tasks from this process wake them at once)
+TASK_POLL_SECONDS = float(os.getenv("TASK_POLL_SECONDS", "1") or "1")
+# Running tasks older than this are assumed orphaned and re-queued
+TASK_STALE_SECONDS = int(os.getenv("TASK_STALE_SECONDS", "600") or "600")
+# How often workers look for orphaned running tasks
+TASK_SWEEP_SECONDS = float(os.getenv("TASK_SWEEP_SECONDS", "60") or "60")
+# Orphaned tasks that already started this many times are failed instead of re-queued
+TASK_MAX_ATTEMPTS = int(os.getenv("TASK_MAX_ATTEMPTS", "3") or "3")
+
+# Cognitive profiles are scored locally from template responses (server/cdc_scoring.py);
+# when true, POST /api/assessment/analyze-profile also queues an LLM enrichment task
+PROFILE_LLM_ENRICHMENT = (os.getenv("PROFILE_LLM_ENRICHMENT", "true") or "true").lower() in ("1", "true", "yes")
+
+# Schema migrations run once per deploy (`python init_db.py`); at startup the app only
+# compares the database revision with the code. True = migrate at startup when behind
+# (single-instance/dev setups)
+DB_MIGRATE_ON_STARTUP = (os.getenv("DB_MIGRATE_ON_STARTUP", "false") or "false").lower() in ("1", "true", "yes")
+
+# Per-request SQL accounting (server/database.py): X-DB-* response headers are on
+# in development (NODE_ENV=development) unless set; per-route totals are always
+# kept for GET /api/admin/db-queries
+DB_QUERY_HEADERS = (
+    os.getenv("DB_QUERY_HEADERS", "true" if os.getenv("NODE_ENV") == "development" else "false") or "false"
+).lower() in ("1", "true", "yes")
+# One statement shape repeated this many times in a request is logged as a likely N+1
+DB_N_PLUS_ONE_THRESHOLD = int(os.getenv("DB_N_PLUS_ONE_THRESHOLD", "5") or "5")
+
+# Prometheus metrics (server/metrics.py, GET /api/metrics). With several worker
+# processes, point METRICS_MULTIPROC_DIR at a directory shared by the workers
+# (emptied at each deploy) so any worker can serve the merged view
+METRICS_MULTIPROC_DIR = os.getenv("METRICS_MULTIPROC_DIR", "")
+METRICS_FLUSH_SECONDS = float(os.getenv("METRICS_FLUSH_SECONDS", "5") or "5")
+# When set, scrapes must send `Authorization: Bearer <METRICS_TOKEN>`
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+
+# get_current_user cache (server/auth.py): resolved users kept per token subject for
+# this many seconds (0 disables). Profile updates invalidate their own process's entry;
+# with several workers the TTL bounds how stale another worker's copy can be
+USER_CACHE_TTL_SECONDS = float(os.getenv("USER_CACHE_TTL_SECONDS", "60") or "60")
+USER_CACHE_MAX_ENTRIES = int(os.getenv("USER_CACHE_MAX_ENTRIES", "10000") or "10000")
+
+# Refresh tokens (POST /api/auth/refresh): lifetime of each rotated token; an
+# active session is extended without re-entering (and re-hashing) the password
+REFRESH_TOKEN_EXPIRE_DAYS = float(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "14") or "14")
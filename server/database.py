@@ -3,11 +3,23 @@ Database configuration and session management
 """
 
 import os
-from sqlalchemy import create_engine, text
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from dotenv import load_dotenv
 
+from server.metrics import REGISTRY, DB_POOL_CHECKOUT, family
+
 load_dotenv()
 
 # Database URL from environment
@@ -21,6 +33,27 @@ if DATABASE_URL.startswith("postgres://"):
 
 print(f"Using database URL: {DATABASE_URL.split('@')[-1] if '@' in DATABASE_URL else DATABASE_URL}")
 
+
+class _TimedCheckout:
+    """Pool mixin: observe how long each checkout waits for a connection"""
+    metrics_label = "sync"
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_CHECKOUT.labels(self.metrics_label).observe(time.perf_counter() - started)
+
+
+class TimedQueuePool(_TimedCheckout, QueuePool):
+    metrics_label = "sync"
+
+
+class TimedAsyncQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    metrics_label = "async"
+
+
 # Create engine with improved connection handling
 if DATABASE_URL.startswith("sqlite"):
     engine = create_engine(
@@ -31,6 +64,7 @@ if DATABASE_URL.startswith("sqlite"):
 else:
     engine = create_engine(
         DATABASE_URL,
+        poolclass=TimedQueuePool,
         pool_pre_ping=True,
         pool_recycle=300,
         pool_size=5,
@@ -40,49 +74,179 @@ else:
 # Create SessionLocal class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+def _async_url(url: str):
+    """Same database through its async driver (aiosqlite / asyncpg), plus connect_args"""
+    parsed = make_url(url)
+    connect_args = {}
+    if parsed.get_backend_name() == "sqlite":
+        return parsed.set(drivername="sqlite+aiosqlite"), {"check_same_thread": False}
+    # asyncpg takes `ssl` instead of libpq's `sslmode`
+    sslmode = parsed.query.get("sslmode")
+    if sslmode:
+        parsed = parsed.difference_update_query(["sslmode"])
+        if sslmode != "disable":
+            connect_args["ssl"] = sslmode
+    return parsed.set(drivername="postgresql+asyncpg"), connect_args
+
+# Async engine/sessions for the request path (routes that take get_async_db)
+ASYNC_DATABASE_URL, _async_connect_args = _async_url(DATABASE_URL)
+if DATABASE_URL.startswith("sqlite"):
+    async_engine = create_async_engine(ASYNC_DATABASE_URL, connect_args=_async_connect_args)
+else:
+    async_engine = create_async_engine(
+        ASYNC_DATABASE_URL,
+        connect_args=_async_connect_args,
+        poolclass=TimedAsyncQueuePool,
+        pool_pre_ping=True,
+        pool_recycle=300,
+        pool_size=10,
+        max_overflow=20
+    )
+
+# expire_on_commit=False: returned ORM objects stay readable after commit
+# without an implicit (sync) refresh
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
 # Create Base class
 Base = declarative_base()
 
-def init_db():
-    """Initialize database tables"""
+
+def _pool_metrics():
+    """Connections in use / idle per engine, read from the pools at scrape time"""
+    in_use, idle = {}, {}
+    for label, pool in (("sync", engine.pool), ("async", async_engine.sync_engine.pool)):
+        if isinstance(pool, QueuePool):
+            in_use[(label,)] = pool.checkedout()
+            idle[(label,)] = pool.checkedin()
+    yield family("db_pool_connections_in_use", "gauge", "Pooled DB connections checked out", ("engine",), in_use)
+    yield family("db_pool_connections_idle", "gauge", "Pooled DB connections idle in the pool", ("engine",), idle)
+
+
+REGISTRY.register_collector(_pool_metrics)
+
+# ---------------------------------------------------------------------------
+# Query accounting: statements, DB time and repeated statement shapes per
+# request (see the db_query_accounting middleware in server/main.py)
+# ---------------------------------------------------------------------------
+
+# Bound parameter lists such as IN (?, ?, ?) or VALUES ($1, $2) collapse to
+# "(...)" so the same query with different list lengths has one shape
+_PARAM_LIST = re.compile(r"\(\s*(?:\?|\$\d+|%\(\w+\)s|%s|:\w+)(?:\s*,\s*(?:\?|\$\d+|%\(\w+\)s|%s|:\w+))*\s*\)")
+
+
+def statement_shape(statement: str) -> str:
+    return _PARAM_LIST.sub("(...)", " ".join(statement.split()))
+
+
+class QueryStats:
+    """Statements executed in one scope (a request, or a `query_budget` block)"""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.shapes: Counter = Counter()
+
+    def record(self, statement: str, seconds: float) -> None:
+        self.count += 1
+        self.seconds += seconds
+        self.shapes[statement_shape(statement)] += 1
+
+    def repeated(self, min_repeats: int) -> List[Tuple[str, int]]:
+        """Statement shapes run at least ``min_repeats`` times, most frequent first"""
+        return [(shape, n) for shape, n in self.shapes.most_common() if n >= min_repeats]
+
+
+_request_queries: ContextVar[Optional[QueryStats]] = ContextVar("db_request_queries", default=None)
+# query_budget() scopes; process-wide so they also see TestClient's server thread
+_budget_scopes: List[QueryStats] = []
+
+
+@event.listens_for(engine, "before_cursor_execute")
+@event.listens_for(async_engine.sync_engine, "before_cursor_execute")
+def _query_started(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+@event.listens_for(engine, "after_cursor_execute")
+@event.listens_for(async_engine.sync_engine, "after_cursor_execute")
+def _query_finished(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.get("query_started")
+    elapsed = time.perf_counter() - started.pop() if started else 0.0
+    stats = _request_queries.get()
+    if stats is not None:
+        stats.record(statement, elapsed)
+    for scope in list(_budget_scopes):
+        scope.record(statement, elapsed)
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    """Count the statements run in this context (and tasks/threads started from it)"""
+    stats = QueryStats()
+    token = _request_queries.set(stats)
     try:
-        # Test connection first
-        print("Testing database connection...")
-        with engine.connect() as conn:
-            result = conn.execute(text("SELECT 1"))
-            print("✓ Database connection test successful")
-        
-        # Import all models to ensure they are registered
-        from server import models
-        print("Creating database tables...")
-        Base.metadata.create_all(bind=engine)
-        print("✓ Database tables created successfully")
-        
-        # Verify tables were created
-        with engine.connect() as conn:
-            result = conn.execute(text("""
-                SELECT table_name 
-                FROM information_schema.tables 
-                WHERE table_schema = 'public'
-            """))
-            tables = [row[0] for row in result]
-            print(f"✓ Found {len(tables)} tables: {', '.join(tables)}")
-        
-        # Non-destructive migration: ensure new columns exist on existing DBs
-        try:
-            with engine.begin() as conn:
-                # users table: add location and availability_status if missing
-                conn.execute(text("ALTER TABLE IF EXISTS users ADD COLUMN IF NOT EXISTS location VARCHAR"))
-                conn.execute(text("ALTER TABLE IF EXISTS users ADD COLUMN IF NOT EXISTS availability_status VARCHAR"))
-                print("✓ Database migration completed")
-        except Exception as e:
-            # Log but don't crash app startup
-            print(f"Warning: init_db migration step failed: {e}")
-            
-    except Exception as e:
-        print(f"Error initializing database: {e}")
-        print(f"Error type: {type(e).__name__}")
-        raise
+        yield stats
+    finally:
+        _request_queries.reset(token)
+
+
+@contextmanager
+def query_budget(max_queries: int, max_repeats: Optional[int] = None) -> Iterator[QueryStats]:
+    """Test helper: fail if the block runs more than ``max_queries`` statements.
+
+    ``max_repeats`` also fails it when one statement shape runs more than that
+    many times (a query per row). Counts every statement in the process, so use
+    it around a single request::
+
+        with query_budget(3):
+            client.get("/api/jobs/matches/my")
+    """
+    stats = QueryStats()
+    _budget_scopes.append(stats)
+    try:
+        yield stats
+    finally:
+        _budget_scopes.remove(stats)
+    if stats.count > max_queries:
+        raise AssertionError(f"{stats.count} queries, budget is {max_queries}:\n" + "\n".join(
+            f"  {n}x {shape}" for shape, n in stats.shapes.most_common()
+        ))
+    if max_repeats is not None and stats.repeated(max_repeats + 1):
+        shape, n = stats.repeated(max_repeats + 1)[0]
+        raise AssertionError(f"Statement repeated {n} times (limit {max_repeats}): {shape}")
+
+
+class QueryMetrics:
+    """Per-route totals of the per-request query stats, for production monitoring"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._routes: Dict[str, Dict[str, Any]] = {}
+
+    def record(self, route: str, stats: QueryStats, n_plus_one: bool) -> None:
+        with self._lock:
+            row = self._routes.setdefault(route, {
+                "requests": 0, "queries": 0, "db_seconds": 0.0, "max_queries": 0, "n_plus_one_requests": 0,
+            })
+            row["requests"] += 1
+            row["queries"] += stats.count
+            row["db_seconds"] += stats.seconds
+            row["max_queries"] = max(row["max_queries"], stats.count)
+            row["n_plus_one_requests"] += int(n_plus_one)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                route: {
+                    **row,
+                    "db_seconds": round(row["db_seconds"], 4),
+                    "avg_queries": round(row["queries"] / row["requests"], 2),
+                }
+                for route, row in sorted(self._routes.items())
+            }
+
+
+query_metrics = QueryMetrics()
 
 def get_db():
     """Get database session"""
@@ -90,4 +254,9 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+async def get_async_db():
+    """Get async database session"""
+    async with AsyncSessionLocal() as db:
+        yield db
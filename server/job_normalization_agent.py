@@ -8,12 +8,16 @@ import json
 import uuid
 import numpy as np
 from typing import Dict, List, Optional, Any, Tuple
-from langchain_openai import ChatOpenAI
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import JsonOutputParser
 from pydantic import BaseModel, Field
 import logging
 
+from server.skill_taxonomy import get_taxonomy
+from server import llm_gateway
+from server.llm_cache import chain_cache_key
+from server.llm_scheduler import BACKGROUND, estimate_tokens, priority
+
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -64,11 +68,9 @@ class JobNormalizationAgent:
             return False
             
         try:
-            self.llm = ChatOpenAI(
-                model="gpt-3.5-turbo",  # Using GPT-3.5-turbo which doesn't require verification
-                temperature=0.2,  # Low temperature for consistent analysis
-                base_url="https://api.aimlapi.com/v1",
-                api_key=self.api_key,
+            self.llm = llm_gateway.chat_model(
+                "gpt-3.5-turbo",  # Using GPT-3.5-turbo which doesn't require verification
+                0.2,  # Low temperature for consistent analysis
                 max_retries=3,
                 request_timeout=60
             )
@@ -221,13 +223,20 @@ Create 5-8 specific accommodation rules covering different scenarios and needs."
             # Generate unique job ID
             job_id = str(uuid.uuid4())
             
-            # Run the normalization analysis
-            result = await self.normalization_chain.ainvoke({
+            # Run the normalization analysis (identical inputs are served from the LLM cache)
+            inputs = {
                 "job_title": job_title,
                 "job_description": job_description,
                 "company_name": company_name or "Not specified",
                 "additional_context": additional_context or "None provided"
-            })
+            }
+            with priority(BACKGROUND):
+                result = await llm_gateway.call(
+                    chain_cache_key(self.llm, self.normalization_prompt, inputs),
+                    lambda: self.normalization_chain.ainvoke(inputs),
+                    tokens=estimate_tokens(inputs),
+                    client="JobNormalizationAgent",
+                )
             
             # Ensure job_id is set
             result["job_id"] = job_id
@@ -345,38 +354,30 @@ Create 5-8 specific accommodation rules covering different scenarios and needs."
         # Analyze job title and description for keywords to generate realistic CDC scores
         text = f"{job_title} {job_description}".lower()
         
-        # Calculate CDC scores based on keyword analysis
+        # Calculate CDC scores based on keyword analysis (single taxonomy pass over the text)
+        found = get_taxonomy().scan(text)["keywords"]
+        def hits(group: str) -> int:
+            return len(found.get(group, []))
+        
         cdc_scores = {}
         
         # Focus requirements
-        focus_keywords = ['detail', 'accuracy', 'precision', 'quality', 'review', 'analysis', 'data', 'research']
-        focus_score = min(8.0, 4.0 + sum(2.0 for keyword in focus_keywords if keyword in text))
-        cdc_scores['focus'] = focus_score
+        cdc_scores['focus'] = min(8.0, 4.0 + 2.0 * hits('focus'))
         
         # Pattern recognition
-        pattern_keywords = ['data', 'analysis', 'trends', 'patterns', 'insights', 'algorithm', 'machine learning', 'analytics']
-        pattern_score = min(9.0, 3.0 + sum(1.5 for keyword in pattern_keywords if keyword in text))
-        cdc_scores['pattern_recognition'] = pattern_score
+        cdc_scores['pattern_recognition'] = min(9.0, 3.0 + 1.5 * hits('pattern_recognition'))
         
         # Verbal communication
-        comm_keywords = ['presentation', 'meeting', 'client', 'stakeholder', 'communication', 'collaborate', 'team', 'leadership']
-        comm_score = min(8.0, 2.0 + sum(1.0 for keyword in comm_keywords if keyword in text))
-        cdc_scores['verbal_communication'] = comm_score
+        cdc_scores['verbal_communication'] = min(8.0, 2.0 + 1.0 * hits('verbal_communication'))
         
         # Spatial reasoning
-        spatial_keywords = ['design', 'architecture', 'visualization', 'modeling', '3d', 'spatial', 'layout', 'engineering']
-        spatial_score = min(7.0, 1.0 + sum(1.5 for keyword in spatial_keywords if keyword in text))
-        cdc_scores['spatial_reasoning'] = spatial_score
+        cdc_scores['spatial_reasoning'] = min(7.0, 1.0 + 1.5 * hits('spatial_reasoning'))
         
         # Creative ideation
-        creative_keywords = ['creative', 'innovation', 'design', 'brainstorm', 'solution', 'problem-solving', 'strategy']
-        creative_score = min(8.0, 2.0 + sum(1.2 for keyword in creative_keywords if keyword in text))
-        cdc_scores['creative_ideation'] = creative_score
+        cdc_scores['creative_ideation'] = min(8.0, 2.0 + 1.2 * hits('creative_ideation'))
         
         # Multitasking
-        multi_keywords = ['multiple', 'various', 'diverse', 'manage', 'coordinate', 'juggle', 'priorities', 'concurrent']
-        multi_score = min(9.0, 3.0 + sum(1.0 for keyword in multi_keywords if keyword in text))
-        cdc_scores['multitasking'] = multi_score
+        cdc_scores['multitasking'] = min(9.0, 3.0 + 1.0 * hits('multitasking'))
         
         # Generate accommodation rules based on scores
         accommodation_rules = []
@@ -0,0 +1,254 @@
+"""
+Content-addressed cache for LLM responses.
+
+Entries are keyed by a SHA-256 of (model, prompt, params), so identical calls
+from any agent share one answer. Two tiers:
+- memory: size-bounded LRU (`LLM_CACHE_MAX_ENTRIES`)
+- disk: SQLite file (`LLM_CACHE_PATH`) that survives restarts, bounded by
+  `LLM_CACHE_DISK_MAX_ENTRIES` with least-recently-used eviction (trimmed
+  every `trim_every` writes, so it may briefly hold that many extra rows)
+
+Both tiers honor `LLM_CACHE_TTL_SECONDS`. Values must be JSON-serializable.
+Async code uses `aget`/`aset`, which run disk reads and writes in a worker
+thread. Hit/miss counters are available from `llm_cache.stats()`.
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from server.config import (
+    LLM_CACHE_ENABLED,
+    LLM_CACHE_TTL_SECONDS,
+    LLM_CACHE_MAX_ENTRIES,
+    LLM_CACHE_DISK_MAX_ENTRIES,
+    LLM_CACHE_PATH,
+)
+from server.metrics import REGISTRY, family
+
+logger = logging.getLogger(__name__)
+
+
+def cache_key(model: str, prompt: Any, params: Optional[Dict[str, Any]] = None) -> str:
+    """Stable hash of a model call; ``prompt`` may be a string or message list."""
+    payload = json.dumps(
+        {"model": model, "prompt": prompt, "params": params or {}},
+        sort_keys=True,
+        default=str,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def chain_cache_key(llm: Any, template: Any, inputs: Dict[str, Any]) -> str:
+    """Key for a ``prompt | llm | parser`` chain: model, template source and inputs."""
+    return cache_key(
+        getattr(llm, "model_name", None) or str(llm),
+        {"template": str(template), "inputs": inputs},
+        {"temperature": getattr(llm, "temperature", None)},
+    )
+
+
+class LLMCache:
+    """Two-tier (memory LRU + SQLite) TTL cache for LLM results."""
+
+    def __init__(
+        self,
+        max_entries: int = LLM_CACHE_MAX_ENTRIES,
+        ttl_seconds: float = LLM_CACHE_TTL_SECONDS,
+        path: Optional[str] = LLM_CACHE_PATH,
+        disk_max_entries: int = LLM_CACHE_DISK_MAX_ENTRIES,
+        enabled: bool = LLM_CACHE_ENABLED,
+        trim_every: int = 100,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.disk_max_entries = disk_max_entries
+        self.enabled = enabled
+        self.trim_every = max(1, trim_every)
+        # values are kept serialized so callers can mutate what they get back
+        self._memory: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Separate lock so memory lookups never wait behind disk I/O
+        self._disk_lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._disk_writes = 0
+        self.hits = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        if enabled and path:
+            self._open_disk(path)
+
+    def _open_disk(self, path: str) -> None:
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "expires_at REAL NOT NULL, last_access REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_llm_cache_last_access ON llm_cache (last_access)")
+            self._conn = conn
+        except Exception as e:
+            logger.warning(f"LLM disk cache unavailable ({path}): {str(e)}")
+            self._conn = None
+
+    def _disk(self, fn: Callable[[sqlite3.Connection], Any]) -> Any:
+        # Disk problems never break an LLM call; drop to memory-only instead
+        if self._conn is None:
+            return None
+        try:
+            return fn(self._conn)
+        except Exception as e:
+            logger.warning(f"LLM disk cache error, disabling disk tier: {str(e)}")
+            self._conn = None
+            return None
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value or None (counted as a miss)."""
+        if not self.enabled:
+            return None
+        hit, value = self._memory_get(key)
+        return value if hit else self._disk_get(key)
+
+    async def aget(self, key: str) -> Optional[Any]:
+        """`get` for async callers: memory hits inline, the disk lookup in a worker thread."""
+        if not self.enabled:
+            return None
+        hit, value = self._memory_get(key)
+        if hit:
+            return value
+        if self._conn is None:
+            return self._disk_get(key)
+        return await asyncio.to_thread(self._disk_get, key)
+
+    def _memory_get(self, key: str) -> Tuple[bool, Optional[Any]]:
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                return False, None
+            expires_at, raw = entry
+            if expires_at <= now:
+                del self._memory[key]
+                return False, None
+            self._memory.move_to_end(key)
+            self.hits += 1
+            self.memory_hits += 1
+        return True, json.loads(raw)
+
+    def _disk_get(self, key: str) -> Optional[Any]:
+        now = time.time()
+        with self._disk_lock:
+            row = self._disk(lambda c: c.execute(
+                "SELECT value, expires_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone())
+            if row is not None and row[1] > now:
+                self._disk(lambda c: c.execute(
+                    "UPDATE llm_cache SET last_access = ? WHERE key = ?", (now, key)
+                ))
+            elif row is not None:
+                self._disk(lambda c: c.execute("DELETE FROM llm_cache WHERE key = ?", (key,)))
+                row = None
+        with self._lock:
+            if row is None:
+                self.misses += 1
+                return None
+            raw, expires_at = row
+            self._remember(key, expires_at, raw)
+            self.hits += 1
+            self.disk_hits += 1
+        return json.loads(raw)
+
+    def set(self, key: str, value: Any) -> None:
+        """Store a JSON-serializable value in both tiers. None is never cached."""
+        entry = self._memory_set(key, value)
+        if entry is not None:
+            self._disk_set(key, *entry)
+
+    async def aset(self, key: str, value: Any) -> None:
+        """`set` for async callers: the disk write runs in a worker thread."""
+        entry = self._memory_set(key, value)
+        if entry is not None and self._conn is not None:
+            await asyncio.to_thread(self._disk_set, key, *entry)
+
+    def _memory_set(self, key: str, value: Any) -> Optional[Tuple[str, float, float]]:
+        """Store in memory; returns (serialized value, expires_at, now) for the disk tier."""
+        if not self.enabled or value is None:
+            return None
+        now = time.time()
+        expires_at = now + self.ttl_seconds
+        try:
+            raw = json.dumps(value, default=str)
+        except (TypeError, ValueError):
+            return None
+        with self._lock:
+            self._remember(key, expires_at, raw)
+        return raw, expires_at, now
+
+    def _disk_set(self, key: str, raw: str, expires_at: float, now: float) -> None:
+        with self._disk_lock:
+            self._disk(lambda c: c.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, expires_at, last_access) VALUES (?, ?, ?, ?)",
+                (key, raw, expires_at, now),
+            ))
+            self._disk_writes += 1
+            if self._disk_writes % self.trim_every == 0:
+                self._disk(lambda c: c.execute(
+                    "DELETE FROM llm_cache WHERE expires_at <= ? OR key IN ("
+                    "SELECT key FROM llm_cache ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+                    (now, self.disk_max_entries),
+                ))
+
+    def _remember(self, key: str, expires_at: float, raw: str) -> None:
+        self._memory[key] = (expires_at, raw)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+        with self._disk_lock:
+            self._disk(lambda c: c.execute("DELETE FROM llm_cache"))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._disk_lock:
+            disk_row = self._disk(lambda c: c.execute("SELECT COUNT(*) FROM llm_cache").fetchone())
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "hits": self.hits,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "memory_entries": len(self._memory),
+                "disk_entries": disk_row[0] if disk_row else None,
+                "ttl_seconds": self.ttl_seconds,
+            }
+
+
+# Global cache shared by all agents
+llm_cache = LLMCache()
+
+
+def _cache_metrics():
+    """LLM cache counters as Prometheus samples (memory and disk tiers together)"""
+    yield family("cache_hits_total", "counter", "Cache hits", ("cache",), {("llm",): llm_cache.hits})
+    yield family("cache_misses_total", "counter", "Cache misses", ("cache",), {("llm",): llm_cache.misses})
+
+
+REGISTRY.register_collector(_cache_metrics)
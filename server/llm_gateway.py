@@ -0,0 +1,467 @@
+"""
+Async gateway for every call to the AIML (OpenAI-compatible) API.
+
+All LLM traffic goes through this module:
+- `chat_json` runs a JSON chat completion on a shared `AsyncOpenAI` client;
+  `chat_json_stream` is the streaming variant, yielding content deltas
+- `chat_model` builds LangChain `ChatOpenAI` models that reuse the same pooled
+  httpx clients, for the prompt | llm | parser chains in the agents
+- `call` is the single choke point that wraps an awaitable LLM call with the
+  response cache, in-flight deduplication, the shared circuit breaker and the
+  per-request deadline; agents route their chain/model invocations through it
+  and name themselves as ``client`` for the per-client metrics in
+  `server.metrics` (calls by outcome, provider latency, tokens)
+
+One httpx connection pool (keep-alive, `LLM_MAX_CONNECTIONS`) is shared per
+process, and nothing here blocks the event loop while a completion is in
+flight.
+"""
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+import httpx
+from openai import AsyncOpenAI
+from langchain_openai import ChatOpenAI
+
+from server.config import (
+    AIML_BASE_URL,
+    LLM_MAX_CONNECTIONS,
+    LLM_MAX_KEEPALIVE,
+    LLM_TIMEOUT_SECONDS,
+    LLM_BREAKER_FAILURES,
+    LLM_BREAKER_SLOW_CALLS,
+    LLM_BREAKER_COOLDOWN_SECONDS,
+    LLM_LATENCY_SLO_SECONDS,
+    LLM_DEFAULT_CALL_TOKENS,
+)
+from server.llm_cache import llm_cache, cache_key
+from server.llm_scheduler import scheduler, current_priority, estimate_tokens
+from server.metrics import LLM_CALLS, LLM_LATENCY, LLM_ESTIMATED_TOKENS, LLM_TOKENS
+
+logger = logging.getLogger(__name__)
+
+_async_http: Optional[httpx.AsyncClient] = None
+_sync_http: Optional[httpx.Client] = None
+_async_openai: Optional[AsyncOpenAI] = None
+
+
+
+class LLMUnavailable(Exception):
+    """Raised instead of calling the provider: breaker open or request deadline spent.
+
+    Callers treat it like any other LLM failure and use their fallback.
+    """
+
+
+class CircuitBreaker:
+    """Consecutive-failure / latency-SLO breaker shared by all LLM callers.
+
+    closed -> open after ``failure_threshold`` consecutive errors/timeouts or
+    ``slow_threshold`` consecutive calls slower than ``latency_slo``. After
+    ``cooldown`` seconds one probe call is let through (half-open); success
+    closes the breaker, failure re-opens it. A probe that ends without an
+    outcome (cancelled, or timed out before reaching the provider) calls
+    `release_probe` so the next call can probe instead.
+    """
+
+    def __init__(self, failure_threshold: int, slow_threshold: int, latency_slo: float, cooldown: float):
+        self.failure_threshold = failure_threshold
+        self.slow_threshold = slow_threshold
+        self.latency_slo = latency_slo
+        self.cooldown = cooldown
+        self.state = "closed"
+        self.failures = 0
+        self.slow_calls = 0
+        self.opened_at = 0.0
+        self.times_opened = 0
+        self.rejected = 0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open" and time.monotonic() - self.opened_at >= self.cooldown:
+                self.state = "half_open"
+                self._probe_in_flight = False
+            if self.state == "half_open" and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            self.rejected += 1
+            return False
+
+    def record_success(self, latency: float) -> None:
+        with self._lock:
+            self.failures = 0
+            self.slow_calls = self.slow_calls + 1 if latency > self.latency_slo else 0
+            if self.slow_calls >= self.slow_threshold:
+                self._open("latency SLO breached")
+            elif self.state != "closed":
+                self.state = "closed"
+                self._probe_in_flight = False
+                logger.info("LLM circuit breaker closed")
+
+    def release_probe(self) -> None:
+        with self._lock:
+            if self.state == "half_open":
+                self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                self._open("consecutive failures")
+
+    def _open(self, reason: str) -> None:
+        if self.state != "open":
+            self.times_opened += 1
+            logger.warning(f"LLM circuit breaker opened ({reason})")
+        self.state = "open"
+        self.opened_at = time.monotonic()
+        self._probe_in_flight = False
+        self.failures = 0
+        self.slow_calls = 0
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "state": self.state,
+                "consecutive_failures": self.failures,
+                "consecutive_slow_calls": self.slow_calls,
+                "times_opened": self.times_opened,
+                "rejected": self.rejected,
+            }
+
+
+breaker = CircuitBreaker(
+    LLM_BREAKER_FAILURES, LLM_BREAKER_SLOW_CALLS, LLM_LATENCY_SLO_SECONDS, LLM_BREAKER_COOLDOWN_SECONDS
+)
+
+# Monotonic deadline for all LLM calls made by the current request (None = no deadline)
+_deadline: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar("llm_deadline", default=None)
+
+
+def set_deadline(seconds: float) -> contextvars.Token:
+    """Start a deadline for the current context; pass the token to `reset_deadline`."""
+    return _deadline.set(time.monotonic() + seconds)
+
+
+def reset_deadline(token: contextvars.Token) -> None:
+    _deadline.reset(token)
+
+
+def time_left() -> float:
+    """Seconds a call may take: remaining request deadline, capped by `LLM_TIMEOUT_SECONDS`."""
+    deadline = _deadline.get()
+    if deadline is None:
+        return LLM_TIMEOUT_SECONDS
+    return min(LLM_TIMEOUT_SECONDS, deadline - time.monotonic())
+
+
+# key -> task for calls currently in flight (single-flight dedup)
+_inflight: Dict[str, "asyncio.Future[Any]"] = {}
+_stats: Dict[str, int] = {"started": 0, "joined": 0}
+
+
+def api_key() -> Optional[str]:
+    key = os.getenv("AIML_API_KEY")
+    if not key or key == "your-openai-api-key-here":
+        return None
+    return key
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(max_connections=LLM_MAX_CONNECTIONS, max_keepalive_connections=LLM_MAX_KEEPALIVE)
+
+
+def async_http_client() -> httpx.AsyncClient:
+    """Process-wide pooled async httpx client."""
+    global _async_http
+    if _async_http is None or _async_http.is_closed:
+        _async_http = httpx.AsyncClient(limits=_limits(), timeout=LLM_TIMEOUT_SECONDS)
+    return _async_http
+
+
+def sync_http_client() -> httpx.Client:
+    """Pooled sync client, only for legacy `.invoke` callers."""
+    global _sync_http
+    if _sync_http is None or _sync_http.is_closed:
+        _sync_http = httpx.Client(limits=_limits(), timeout=LLM_TIMEOUT_SECONDS)
+    return _sync_http
+
+
+def async_openai() -> AsyncOpenAI:
+    """Shared `AsyncOpenAI` client pointed at the AIML API."""
+    global _async_openai
+    if _async_openai is None:
+        _async_openai = AsyncOpenAI(
+            base_url=AIML_BASE_URL,
+            api_key=api_key() or "missing",
+            http_client=async_http_client(),
+            timeout=LLM_TIMEOUT_SECONDS,
+        )
+    return _async_openai
+
+
+def chat_model(model: str, temperature: float, **kwargs: Any) -> ChatOpenAI:
+    """LangChain chat model on the shared connection pool."""
+    return ChatOpenAI(
+        model=model,
+        temperature=temperature,
+        base_url=AIML_BASE_URL,
+        api_key=api_key(),
+        http_client=sync_http_client(),
+        http_async_client=async_http_client(),
+        **kwargs,
+    )
+
+
+async def call(
+    key: Optional[str],
+    fn: Callable[[], Awaitable[Any]],
+    tokens: Optional[int] = None,
+    client: str = "unknown",
+) -> Any:
+    """Run one LLM call, served from the response cache when ``key`` is given.
+
+    Concurrent callers with the same key share a single in-flight request
+    (single-flight): the first caller starts it, the rest await the same
+    future. A waiter being cancelled does not cancel the shared call.
+
+    Raises `LLMUnavailable` without touching the provider when the circuit
+    breaker is open or the request deadline is spent; the call itself
+    (queueing and retries included) is cut off at the remaining deadline.
+
+    Provider calls wait for a `server.llm_scheduler` slot under the caller's
+    priority class; ``tokens`` is the estimate charged to the TPM budget.
+    ``client`` labels the call in the metrics (the agent class name).
+    """
+    if key is not None:
+        cached = await llm_cache.aget(key)
+        if cached is not None:
+            LLM_CALLS.labels(client, "cache_hit").inc()
+            return cached
+
+    timeout = time_left()
+    if timeout <= 0:
+        LLM_CALLS.labels(client, "unavailable").inc()
+        raise LLMUnavailable("request deadline exceeded")
+
+    if key is None:
+        if not breaker.allow():
+            LLM_CALLS.labels(client, "unavailable").inc()
+            raise LLMUnavailable("circuit breaker open")
+        return await _guarded(fn, timeout, current_priority(), tokens, client)
+
+    loop = asyncio.get_running_loop()
+    future = _inflight.get(key)
+    if future is not None and future.get_loop() is loop and not future.done():
+        _stats["joined"] += 1
+        LLM_CALLS.labels(client, "joined").inc()
+    else:
+        if not breaker.allow():
+            LLM_CALLS.labels(client, "unavailable").inc()
+            raise LLMUnavailable("circuit breaker open")
+        _stats["started"] += 1
+        future = loop.create_task(_run_and_store(key, fn, timeout, current_priority(), tokens, client))
+        _inflight[key] = future
+        future.add_done_callback(lambda f, key=key: _forget(key, f))
+    try:
+        return await asyncio.wait_for(asyncio.shield(future), timeout)
+    except asyncio.TimeoutError:
+        raise LLMUnavailable("request deadline exceeded")
+
+
+def _record_provider_call(client: str, outcome: str, started: float, tokens: Optional[int]) -> None:
+    LLM_CALLS.labels(client, outcome).inc()
+    LLM_LATENCY.labels(client).observe(time.monotonic() - started)
+    LLM_ESTIMATED_TOKENS.labels(client).inc(tokens or LLM_DEFAULT_CALL_TOKENS)
+
+
+def record_usage(client: str, usage: Any) -> None:
+    """Count provider-reported token usage (an OpenAI ``usage`` object), if present."""
+    if usage is None:
+        return
+    for kind, attr in (("prompt", "prompt_tokens"), ("completion", "completion_tokens")):
+        count = getattr(usage, attr, None)
+        if count:
+            LLM_TOKENS.labels(client, kind).inc(count)
+
+
+async def _guarded(
+    fn: Callable[[], Awaitable[Any]], timeout: float, priority: str, tokens: Optional[int], client: str
+) -> Any:
+    """Take a scheduler slot, await ``fn`` under ``timeout`` and feed the outcome to the breaker.
+
+    Time spent queued counts against ``timeout`` but not against the breaker.
+    """
+    started: Optional[float] = None
+
+    async def run() -> Any:
+        nonlocal started
+        async with scheduler.slot(tokens or LLM_DEFAULT_CALL_TOKENS, priority):
+            started = time.monotonic()
+            return await fn()
+
+    try:
+        value = await asyncio.wait_for(run(), timeout)
+    except asyncio.CancelledError:
+        breaker.release_probe()
+        raise
+    except asyncio.TimeoutError:
+        if started is None:
+            breaker.release_probe()
+            LLM_CALLS.labels(client, "unavailable").inc()
+            raise LLMUnavailable("request deadline exceeded while queued")
+        breaker.record_failure()
+        _record_provider_call(client, "error", started, tokens)
+        raise
+    except Exception:
+        breaker.record_failure()
+        if started is not None:
+            _record_provider_call(client, "error", started, tokens)
+        raise
+    breaker.record_success(time.monotonic() - started)
+    _record_provider_call(client, "ok", started, tokens)
+    return value
+
+
+async def _run_and_store(
+    key: str, fn: Callable[[], Awaitable[Any]], timeout: float, priority: str, tokens: Optional[int], client: str
+) -> Any:
+    value = await _guarded(fn, timeout, priority, tokens, client)
+    await llm_cache.aset(key, value)
+    return value
+
+
+def _forget(key: str, future: "asyncio.Future[Any]") -> None:
+    if _inflight.get(key) is future:
+        del _inflight[key]
+    # Mark the result retrieved even if every waiter was cancelled
+    if not future.cancelled():
+        future.exception()
+
+
+def stats() -> Dict[str, Any]:
+    """Gateway counters: calls started vs joined onto an in-flight twin, breaker and scheduler state."""
+    return {
+        **_stats,
+        "in_flight": len(_inflight),
+        "breaker": breaker.snapshot(),
+        "scheduler": scheduler.stats(),
+    }
+
+
+async def chat_json(
+    model: str, messages: List[Dict[str, Any]], client: str = "unknown", **params: Any
+) -> Dict[str, Any]:
+    """JSON chat completion; identical (model, messages, params) hit the cache."""
+    async def complete() -> Dict[str, Any]:
+        response = await async_openai().chat.completions.create(model=model, messages=messages, **params)
+        record_usage(client, getattr(response, "usage", None))
+        return json.loads(response.choices[0].message.content)
+
+    return await call(
+        cache_key(model, messages, params),
+        complete,
+        tokens=estimate_tokens(messages, params.get("max_tokens")),
+        client=client,
+    )
+
+
+async def chat_json_stream(
+    model: str, messages: List[Dict[str, Any]], client: str = "unknown", **params: Any
+) -> AsyncIterator[str]:
+    """Streaming `chat_json`: yields content deltas as the model produces them.
+
+    Shares the cache key with `chat_json`; a cached answer is yielded as one
+    chunk. The concatenated text is stored in the cache once it parses as JSON.
+    The breaker, scheduler slot and request deadline apply as in `call`; the
+    deadline covers the whole stream.
+    """
+    key = cache_key(model, messages, params)
+    cached = await llm_cache.aget(key)
+    if cached is not None:
+        LLM_CALLS.labels(client, "cache_hit").inc()
+        yield json.dumps(cached)
+        return
+
+    timeout = time_left()
+    if timeout <= 0:
+        LLM_CALLS.labels(client, "unavailable").inc()
+        raise LLMUnavailable("request deadline exceeded")
+    if not breaker.allow():
+        LLM_CALLS.labels(client, "unavailable").inc()
+        raise LLMUnavailable("circuit breaker open")
+
+    deadline = time.monotonic() + timeout
+    parts: List[str] = []
+    started: Optional[float] = None
+    tokens = estimate_tokens(messages, params.get("max_tokens"))
+    slot = scheduler.slot(tokens, current_priority())
+    try:
+        await asyncio.wait_for(slot.__aenter__(), timeout)
+    except asyncio.TimeoutError:
+        breaker.release_probe()
+        LLM_CALLS.labels(client, "unavailable").inc()
+        raise LLMUnavailable("request deadline exceeded while queued")
+    except (asyncio.CancelledError, GeneratorExit):
+        breaker.release_probe()
+        raise
+    try:
+        # Deadline is checked per chunk: the consumer runs between our yields
+        started = time.monotonic()
+        stream = await asyncio.wait_for(
+            async_openai().chat.completions.create(model=model, messages=messages, stream=True, **params),
+            deadline - time.monotonic(),
+        )
+        chunks = stream.__aiter__()
+        while True:
+            try:
+                chunk = await asyncio.wait_for(chunks.__anext__(), deadline - time.monotonic())
+            except StopAsyncIteration:
+                break
+            delta = chunk.choices[0].delta.content if chunk.choices else None
+            if delta:
+                parts.append(delta)
+                yield delta
+    except (asyncio.CancelledError, GeneratorExit):
+        # Client went away; a stream that was producing counts as healthy
+        if parts:
+            breaker.record_success(time.monotonic() - started)
+            _record_provider_call(client, "ok", started, tokens)
+        else:
+            breaker.release_probe()
+        raise
+    except Exception:
+        breaker.record_failure()
+        _record_provider_call(client, "error", started, tokens)
+        raise
+    finally:
+        await slot.__aexit__(None, None, None)
+    breaker.record_success(time.monotonic() - started)
+    _record_provider_call(client, "ok", started, tokens)
+    try:
+        await llm_cache.aset(key, json.loads("".join(parts)))
+    except ValueError:
+        pass
+
+
+async def aclose() -> None:
+    """Close pooled connections (app shutdown)."""
+    global _async_http, _sync_http, _async_openai
+    if _async_http is not None:
+        await _async_http.aclose()
+    if _sync_http is not None:
+        _sync_http.close()
+    _async_http = _sync_http = None
+    _async_openai = None
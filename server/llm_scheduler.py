@@ -0,0 +1,189 @@
+"""
+Process-wide scheduler for outgoing LLM calls.
+
+Every provider call made through `server.llm_gateway` first takes a slot here:
+- at most `LLM_MAX_CONCURRENCY` calls run at once
+- requests-per-minute (`LLM_RPM_LIMIT`) and tokens-per-minute
+  (`LLM_TPM_LIMIT`) token buckets; 0 disables a budget
+- waiting calls are served by priority class, then FIFO, so interactive work
+  (profile analysis, open-ended grading) goes ahead of background work
+  (job normalization, quiz generation, re-analysis)
+
+`stats()` reports queue depth and wait times per class.
+"""
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import heapq
+import itertools
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple
+
+from server.config import LLM_MAX_CONCURRENCY, LLM_RPM_LIMIT, LLM_TPM_LIMIT
+
+INTERACTIVE = "interactive"
+BACKGROUND = "background"
+PRIORITIES = {INTERACTIVE: 0, BACKGROUND: 1}
+
+_priority: contextvars.ContextVar[str] = contextvars.ContextVar("llm_priority", default=INTERACTIVE)
+
+
+@contextmanager
+def priority(name: str) -> Iterator[None]:
+    """Run the enclosed LLM calls under priority class ``name``."""
+    if name not in PRIORITIES:
+        raise ValueError(f"Unknown LLM priority: {name}")
+    token = _priority.set(name)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def current_priority() -> str:
+    return _priority.get()
+
+
+class _Bucket:
+    """Token bucket refilled continuously at ``per_minute / 60`` per second."""
+
+    def __init__(self, per_minute: int):
+        self.capacity = float(per_minute)
+        self.level = float(per_minute)
+        self.updated = time.monotonic()
+
+    @property
+    def unlimited(self) -> bool:
+        return self.capacity <= 0
+
+    def _refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.capacity / 60.0)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until ``amount`` is available (0 if available now)."""
+        if self.unlimited:
+            return 0.0
+        self._refill(now)
+        amount = min(amount, self.capacity)  # an oversized call still runs, on a full bucket
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) * 60.0 / self.capacity
+
+    def take(self, amount: float) -> None:
+        if not self.unlimited:
+            self.level -= min(amount, self.capacity)
+
+
+class LLMScheduler:
+    """Priority queue + concurrency cap + RPM/TPM budgets for LLM calls."""
+
+    def __init__(self, max_concurrency: int = LLM_MAX_CONCURRENCY, rpm: int = LLM_RPM_LIMIT, tpm: int = LLM_TPM_LIMIT):
+        self.max_concurrency = max(1, max_concurrency)
+        self._requests = _Bucket(rpm)
+        self._tokens = _Bucket(tpm)
+        self._active = 0
+        self._seq = itertools.count()
+        # (priority rank, seq, tokens, future, enqueued_at, class name)
+        self._queue: List[Tuple[int, int, int, "asyncio.Future[None]", float, str]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._stats: Dict[str, Dict[str, float]] = {
+            name: {"granted": 0, "waited": 0, "total_wait_ms": 0.0, "max_wait_ms": 0.0} for name in PRIORITIES
+        }
+
+    @asynccontextmanager
+    async def slot(self, tokens: int, priority_name: Optional[str] = None) -> AsyncIterator[None]:
+        """Hold one concurrency slot (and spend the rate budgets) for the enclosed call."""
+        await self._acquire(priority_name or current_priority(), tokens)
+        try:
+            yield
+        finally:
+            self._active -= 1
+            self._dispatch()
+
+    async def _acquire(self, name: str, tokens: int) -> None:
+        loop = asyncio.get_running_loop()
+        enqueued = time.monotonic()
+        future: "asyncio.Future[None]" = loop.create_future()
+        heapq.heappush(self._queue, (PRIORITIES[name], next(self._seq), tokens, future, enqueued, name))
+        self._dispatch()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Granted just as we were cancelled: hand the slot back
+                self._active -= 1
+                self._dispatch()
+            raise
+        waited_ms = (time.monotonic() - enqueued) * 1000.0
+        stats = self._stats[name]
+        stats["granted"] += 1
+        if waited_ms >= 1.0:
+            stats["waited"] += 1
+        stats["total_wait_ms"] += waited_ms
+        stats["max_wait_ms"] = max(stats["max_wait_ms"], waited_ms)
+
+    def _dispatch(self) -> None:
+        """Grant slots to the head of the queue while capacity and budgets allow."""
+        while self._queue:
+            rank, seq, tokens, future, enqueued, name = self._queue[0]
+            if future.done():  # waiter was cancelled
+                heapq.heappop(self._queue)
+                continue
+            if self._active >= self.max_concurrency:
+                return
+            now = time.monotonic()
+            delay = max(self._requests.wait_time(1, now), self._tokens.wait_time(tokens, now))
+            if delay > 0:
+                self._schedule(delay)
+                return
+            heapq.heappop(self._queue)
+            self._requests.take(1)
+            self._tokens.take(tokens)
+            self._active += 1
+            future.set_result(None)
+
+    def _schedule(self, delay: float) -> None:
+        if self._timer is not None and not self._timer.cancelled():
+            return
+        loop = asyncio.get_running_loop()
+
+        def fire() -> None:
+            self._timer = None
+            self._dispatch()
+
+        self._timer = loop.call_later(delay, fire)
+
+    def stats(self) -> Dict[str, Any]:
+        depth = {name: 0 for name in PRIORITIES}
+        for _rank, _seq, _tokens, future, _enqueued, name in self._queue:
+            if not future.done():
+                depth[name] += 1
+        by_class = {}
+        for name, s in self._stats.items():
+            by_class[name] = {
+                "queued": depth[name],
+                "granted": int(s["granted"]),
+                "waited": int(s["waited"]),
+                "avg_wait_ms": round(s["total_wait_ms"] / s["granted"], 2) if s["granted"] else 0.0,
+                "max_wait_ms": round(s["max_wait_ms"], 2),
+            }
+        return {
+            "active": self._active,
+            "max_concurrency": self.max_concurrency,
+            "queue_depth": sum(depth.values()),
+            "rpm_limit": int(self._requests.capacity),
+            "tpm_limit": int(self._tokens.capacity),
+            "classes": by_class,
+        }
+
+
+def estimate_tokens(payload: Any, max_tokens: Optional[int] = None) -> int:
+    """Rough token count for budgeting: ~4 characters per token plus the completion cap."""
+    return len(str(payload)) // 4 + (max_tokens or 500)
+
+
+# Global scheduler shared by all LLM callers
+scheduler = LLMScheduler()
@@ -5,18 +5,35 @@ FastAPI backend for BrainBridge - Job matching platform for neurodivergent profe
 
 from fastapi import FastAPI, HTTPException, Depends, status, Request
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi.responses import FileResponse, JSONResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.exceptions import RequestValidationError
 from contextlib import asynccontextmanager
+import asyncio
+import logging
+import time
 import uvicorn
 import os
 
-from server.database import init_db, get_db
+from server.database import get_async_db, async_engine, track_queries, query_metrics
+from server.schema import check_schema, SchemaOutOfDate
+from server.match_materializer import materializer
+from server import llm_gateway
+from server import metrics
+from server.task_queue import task_queue
+from server.config import (
+    LLM_REQUEST_DEADLINE_SECONDS,
+    DB_MIGRATE_ON_STARTUP,
+    DB_QUERY_HEADERS,
+    DB_N_PLUS_ONE_THRESHOLD,
+    METRICS_TOKEN,
+)
 from server.models import User
-from server.auth import get_current_user
+from server.auth import get_current_user, user_cache
 from server.routers import auth, users, jobs, admin
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+
+logger = logging.getLogger(__name__)
 
 # Initialize database on startup
 @asynccontextmanager
@@ -24,16 +41,28 @@ async def lifespan(app: FastAPI):
     # Startup
     try:
         print("Starting BrainBridge API...")
-        # Initialize database synchronously to ensure tables exist
-        print("Initializing database...")
-        init_db()
-        print("Database initialized successfully")
+        # Migrations run once per deploy (python init_db.py); only compare revisions here
+        current, head = await asyncio.to_thread(check_schema, DB_MIGRATE_ON_STARTUP)
+        print(f"Database schema at revision {current}")
+    except SchemaOutOfDate as e:
+        print(f"Warning: {e}")
     except Exception as e:
-        print(f"Warning: Database initialization failed: {e}")
-        # Don't crash the app if DB init fails
+        print(f"Warning: Database schema check failed: {e}")
+        # Don't crash the app if the DB is unreachable at boot
+    # Keep job_matches populated in the background (no-op in preview mode)
+    materializer.start()
+    # Workers for queued AI tasks (analyze-profile, analyze-assessment, normalize)
+    await task_queue.start()
+    # Multi-worker metrics: periodic snapshot for the merged /api/metrics view
+    metrics.REGISTRY.start()
     yield
     # Shutdown
     print("Shutting down BrainBridge API...")
+    await task_queue.stop()
+    materializer.stop()
+    await llm_gateway.aclose()
+    await async_engine.dispose()
+    metrics.REGISTRY.stop()
 
 app = FastAPI(
     title="BrainBridge API", 
@@ -57,6 +86,54 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
         content={"detail": f"Validation error: {', '.join(errors)}"}
     )
 
+# Cap the total time LLM calls may take while serving one request
+@app.middleware("http")
+async def llm_request_deadline(request: Request, call_next):
+    token = llm_gateway.set_deadline(LLM_REQUEST_DEADLINE_SECONDS)
+    try:
+        return await call_next(request)
+    finally:
+        llm_gateway.reset_deadline(token)
+
+# Count SQL statements, DB time and repeated statement shapes per request
+@app.middleware("http")
+async def db_query_accounting(request: Request, call_next):
+    with track_queries() as stats:
+        response = await call_next(request)
+    repeated = stats.repeated(DB_N_PLUS_ONE_THRESHOLD)
+    route = request.scope.get("route")
+    if route is not None:
+        path = getattr(route, "path", request.url.path)
+        name = f"{request.method} {path}"
+        query_metrics.record(name, stats, bool(repeated))
+        metrics.DB_REQUEST_QUERIES.labels(name).observe(stats.count)
+        metrics.DB_REQUEST_SECONDS.labels(name).inc(stats.seconds)
+        if repeated:
+            metrics.DB_N_PLUS_ONE.labels(name).inc()
+            shape, n = repeated[0]
+            logger.warning("possible N+1 in %s: %dx %s", name, n, shape[:200])
+    if DB_QUERY_HEADERS:
+        response.headers["X-DB-Query-Count"] = str(stats.count)
+        response.headers["X-DB-Time-Ms"] = f"{stats.seconds * 1000:.1f}"
+        response.headers["X-DB-Max-Repeats"] = str(max(stats.shapes.values(), default=0))
+    return response
+
+# Latency histogram and status counts per route template
+@app.middleware("http")
+async def request_metrics(request: Request, call_next):
+    started = time.perf_counter()
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        # Unmatched paths share one label so scanners cannot blow up the series count
+        path = getattr(route, "path", None) or "unmatched"
+        metrics.HTTP_LATENCY.labels(request.method, path).observe(time.perf_counter() - started)
+        metrics.HTTP_REQUESTS.labels(request.method, path, str(status_code)).inc()
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -73,21 +150,23 @@ app.include_router(users.router, prefix="/api/users", tags=["users"])
 app.include_router(jobs.router, prefix="/api/jobs", tags=["jobs"])
 app.include_router(admin.router, prefix="/api/admin", tags=["admin"])
 # Assessment and Self-Discovery routes
-from server.routers import assessment, ai_analysis, job_normalization
+from server.routers import assessment, ai_analysis, job_normalization, tasks
 app.include_router(assessment.router, prefix="/api/assessment", tags=["assessment"])
 app.include_router(ai_analysis.router, prefix="/api/ai", tags=["ai-analysis"])
 app.include_router(job_normalization.router, prefix="/api/jobs", tags=["job-normalization"])
+# Status/results for queued AI tasks
+app.include_router(tasks.router, prefix="/api/tasks", tags=["tasks"])
 # Removed employer_profiles router - all data now in users table
 
 # Additional route aliases for frontend compatibility
 @app.get("/api/matches")
-async def get_job_matches_alias(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+async def get_job_matches_alias(current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_async_db)):
     """Get job matches for current user - alias for /api/jobs/matches/my"""
     from server.routers.jobs import get_my_job_matches
     return await get_my_job_matches(current_user, db)
 
 @app.get("/api/profile")
-async def get_user_profile(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+async def get_user_profile(current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_async_db)):
     """Get current user profile with all requested fields"""
     
     return {
@@ -139,12 +218,12 @@ async def get_user_profile(current_user: User = Depends(get_current_user), db: S
     }
 
 @app.get("/api/user/profile")  
-async def get_user_profile_alt(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+async def get_user_profile_alt(current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_async_db)):
     """Get current user profile - alternative route using users table directly"""
     return await get_user_profile(current_user, db)
 
 @app.put("/api/user/profile")
-async def update_user_profile(profile_data: dict, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+async def update_user_profile(profile_data: dict, current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_async_db)):
     """Update current user profile with all requested fields"""
     try:
         print(f"Updating profile for user {current_user.id} with data: {profile_data}")
@@ -246,14 +325,17 @@ async def update_user_profile(profile_data: dict, current_user: User = Depends(g
                     print(f"Warning: Could not update {db_field}: {str(field_error)}")
                     # Continue with other fields instead of failing completely
         
-        db.commit()
-        db.refresh(current_user)
+        await db.commit()
+        await db.refresh(current_user)
+        user_cache.invalidate(current_user.id)
+        # preferred_work_setup feeds the no-profile match score
+        materializer.mark_user_dirty(current_user.id)
         print("Profile update successful")
         
         return {"message": "Profile updated successfully", "success": True}
         
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         error_msg = f"Failed to update profile: {str(e)}"
         print(f"Profile update error: {error_msg}")
         raise HTTPException(status_code=500, detail=error_msg)
@@ -271,6 +353,15 @@ async def health_check():
         "message": "Server is running"
     }
 
+# Prometheus scrape endpoint
+@app.get("/api/metrics", include_in_schema=False)
+async def prometheus_metrics(request: Request):
+    """Prometheus text format: route latency, DB pool, LLM clients, caches"""
+    if METRICS_TOKEN and request.headers.get("authorization") != f"Bearer {METRICS_TOKEN}":
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid metrics token")
+    body = await asyncio.to_thread(metrics.REGISTRY.render)
+    return Response(content=body, media_type=metrics.CONTENT_TYPE)
+
 # Root API endpoint (only for direct API access)
 @app.get("/api/")
 async def root():
@@ -0,0 +1,307 @@
+"""
+Background materializer for the job_matches table.
+
+Scores ND users against active jobs with the batch scorer and upserts
+`match_score` / `match_reasoning` into `job_matches`, so
+`GET /api/jobs/matches/my` can read precomputed rows instead of scoring on
+every request. Only pairs scoring at or above `JM_THRESHOLD` are kept; in
+preview mode (`JM_THRESHOLD=0`) the read path scores live and the
+materializer stays idle.
+
+Write paths call `materializer.mark_user_dirty` / `mark_job_dirty` after
+committing; the thread coalesces those marks and rescores only the affected
+pairs.
+"""
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session, selectinload
+
+from server.config import JM_THRESHOLD, JM_COALESCE_SECONDS, JM_REFRESH_SECONDS, JM_MATERIALIZER_ENABLED
+from server.database import SessionLocal
+from server.matching import (
+    CDC_FIELDS,
+    build_job_matrix,
+    job_features,
+    score_profile,
+    score_without_profile,
+    _cdc_strength,
+    _preference_flags,
+    _sensitivity_level,
+)
+from server.models import AssessmentResponse, CognitiveProfile, JobMatch, JobPosting, User
+
+logger = logging.getLogger(__name__)
+
+# ND users scored (and committed) per batch during a full pass
+BATCH_SIZE = 200
+
+
+def _label(cdc: str) -> str:
+    return cdc.replace("_", " ")
+
+
+def match_reasoning(profile: Optional[CognitiveProfile], features: Dict[str, Any]) -> str:
+    """Short human-readable explanation for a stored match."""
+    parts: List[str] = []
+    hits: Dict[str, int] = features.get("cdc_hits") or {}
+    if profile is not None:
+        ranked = sorted(
+            (c for c in hits if c in CDC_FIELDS and _cdc_strength(profile, c) >= 0.6),
+            key=lambda c: _cdc_strength(profile, c) * hits[c],
+            reverse=True,
+        )
+        if ranked:
+            parts.append("Draws on your strengths in " + " and ".join(_label(c) for c in ranked[:2]))
+        if _preference_flags(profile)["prefers_remote"] and features.get("is_remote"):
+            parts.append("offers the remote setup you prefer")
+        flagged = sorted({
+            key for key in (features.get("sensory_risks") or {}).values()
+            if _sensitivity_level(profile, key) == "high"
+        })
+        if flagged:
+            parts.append("may be demanding on " + ", ".join(_label(k) for k in flagged))
+    elif hits:
+        parts.append("Matches your assessment progress and uses " + ", ".join(_label(c) for c in sorted(hits)[:2]))
+    if not parts:
+        return "Recommended based on your profile"
+    text = "; ".join(parts)
+    return text[0].upper() + text[1:] + "."
+
+
+def _active_jobs(db: Session, job_ids: Optional[Sequence[str]] = None) -> List[JobPosting]:
+    q = db.query(JobPosting).options(selectinload(JobPosting.features)).filter(JobPosting.is_active.is_(True))
+    if job_ids is not None:
+        q = q.filter(JobPosting.job_id.in_(list(job_ids)))
+    return q.all()
+
+
+def materialize_for_users(
+    db: Session,
+    user_ids: Sequence[str],
+    jobs: Optional[Sequence[JobPosting]] = None,
+    prune: Optional[bool] = None,
+) -> int:
+    """Recompute stored matches for the given ND users against active jobs.
+
+    When ``jobs`` is given only those jobs are rescored; otherwise every active
+    job is scored. With ``prune`` (the default when ``jobs`` is omitted) rows for
+    jobs outside the scored set are removed. Returns the number of rows written
+    or deleted. Commits.
+    """
+    # Only ND users get matches; hooks may mark any user
+    setups = dict(
+        db.query(User.id, User.preferred_work_setup)
+        .filter(User.id.in_(list(user_ids)), User.user_role == "ND_ADULT")
+        .all()
+    )
+    user_ids = [uid for uid in user_ids if uid in setups]
+    if not user_ids:
+        return 0
+    full = jobs is None if prune is None else prune
+    jobs = list(_active_jobs(db) if jobs is None else jobs)
+    job_matrix = build_job_matrix(jobs) if jobs else None
+    features = {str(j.job_id): job_features(j) for j in jobs}
+
+    profiles = {
+        p.user_id: p
+        for p in db.query(CognitiveProfile).filter(CognitiveProfile.user_id.in_(list(user_ids))).all()
+    }
+    counts = dict(
+        db.query(AssessmentResponse.user_id, func.count(func.distinct(AssessmentResponse.assessment_id)))
+        .filter(AssessmentResponse.user_id.in_(list(user_ids)))
+        .group_by(AssessmentResponse.user_id)
+        .all()
+    )
+
+    stored: Dict[str, Dict[str, JobMatch]] = {}
+    match_q = db.query(JobMatch).filter(JobMatch.nd_adult_id.in_(list(user_ids)))
+    if not full:
+        match_q = match_q.filter(JobMatch.job_id.in_(list(features)))
+    for m in match_q.all():
+        stored.setdefault(m.nd_adult_id, {})[m.job_id] = m
+
+    changed = 0
+    for user_id in user_ids:
+        existing = stored.get(user_id, {})
+        profile = profiles.get(user_id)
+        if jobs:
+            if profile is not None:
+                scores = score_profile(profile, job_matrix)
+            else:
+                scores = score_without_profile(counts.get(user_id, 0), setups.get(user_id), job_matrix)
+        else:
+            scores = []
+
+        seen = set()
+        for job, score in zip(jobs, scores):
+            job_id = str(job.job_id)
+            seen.add(job_id)
+            row = existing.get(job_id)
+            if int(score) < JM_THRESHOLD:
+                if row is not None:
+                    db.delete(row)
+                    changed += 1
+                continue
+            reasoning = match_reasoning(profile, features[job_id])
+            if row is None:
+                db.add(JobMatch(nd_adult_id=user_id, job_id=job_id, match_score=int(score), match_reasoning=reasoning))
+                changed += 1
+            elif row.match_score != int(score) or row.match_reasoning != reasoning:
+                row.match_score = int(score)
+                row.match_reasoning = reasoning
+                changed += 1
+        if full:
+            for job_id, row in existing.items():
+                if job_id not in seen:
+                    db.delete(row)
+                    changed += 1
+    db.commit()
+    return changed
+
+
+def materialize_for_jobs(db: Session, job_ids: Sequence[str]) -> int:
+    """Recompute stored matches for the given jobs against every ND user.
+
+    Rows for jobs that are inactive or no longer exist are removed. Commits.
+    """
+    if not job_ids:
+        return 0
+    jobs = _active_jobs(db, job_ids)
+    active = {str(j.job_id) for j in jobs}
+    gone = [jid for jid in job_ids if jid not in active]
+    changed = 0
+    if gone:
+        changed += (
+            db.query(JobMatch).filter(JobMatch.job_id.in_(gone)).delete(synchronize_session=False)
+        )
+        db.commit()
+    if not jobs:
+        return changed
+    user_ids = [uid for (uid,) in db.query(User.id).filter(User.user_role == "ND_ADULT").all()]
+    for i in range(0, len(user_ids), BATCH_SIZE):
+        changed += materialize_for_users(db, user_ids[i:i + BATCH_SIZE], jobs=jobs, prune=False)
+    return changed
+
+
+def materialize_all(db: Session) -> int:
+    """Full pass: every ND user against every active job."""
+    user_ids = [uid for (uid,) in db.query(User.id).filter(User.user_role == "ND_ADULT").all()]
+    jobs = _active_jobs(db)
+    changed = 0
+    for i in range(0, len(user_ids), BATCH_SIZE):
+        changed += materialize_for_users(db, user_ids[i:i + BATCH_SIZE], jobs=jobs, prune=True)
+    return changed
+
+
+class MatchMaterializer:
+    """Daemon thread that keeps job_matches populated.
+
+    Does one full pass at startup, then only rescores what change hooks mark
+    dirty: a user against all active jobs, or a job against all ND users.
+    Marks arriving within ``coalesce_seconds`` of each other are processed
+    together, so a burst of edits to one profile or job is scored once.
+    """
+
+    def __init__(self, coalesce_seconds: float = JM_COALESCE_SECONDS, interval_seconds: int = JM_REFRESH_SECONDS):
+        self.coalesce_seconds = coalesce_seconds
+        self.interval_seconds = interval_seconds
+        self._lock = threading.Lock()
+        self._dirty_users: Set[str] = set()
+        self._dirty_jobs: Set[str] = set()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def enabled(self) -> bool:
+        return JM_MATERIALIZER_ENABLED and JM_THRESHOLD > 0
+
+    def mark_user_dirty(self, user_id: str) -> None:
+        """Rescore this user against all active jobs (profile/assessment/preference change)."""
+        if not self.enabled or not user_id:
+            return
+        with self._lock:
+            self._dirty_users.add(str(user_id))
+        self._wake.set()
+
+    def mark_job_dirty(self, job_id: str) -> None:
+        """Rescore this job against all ND users (job created, edited or deactivated)."""
+        if not self.enabled or not job_id:
+            return
+        with self._lock:
+            self._dirty_jobs.add(str(job_id))
+        self._wake.set()
+
+    def start(self) -> None:
+        if not self.enabled or self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="match-materializer", daemon=True)
+        self._thread.start()
+        logger.info("Match materializer started")
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=10)
+            self._thread = None
+
+    def _with_session(self, fn: Callable[[Session], int]) -> int:
+        db = SessionLocal()
+        try:
+            return fn(db)
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Match materialization failed: {str(e)}")
+            return 0
+        finally:
+            db.close()
+
+    def run_once(self) -> int:
+        """Full pass over every ND user and active job."""
+        return self._with_session(materialize_all)
+
+    def drain(self) -> int:
+        """Process everything currently marked dirty."""
+        with self._lock:
+            users, self._dirty_users = self._dirty_users, set()
+            jobs, self._dirty_jobs = self._dirty_jobs, set()
+        changed = 0
+        if users:
+            changed += self._with_session(lambda db: materialize_for_users(db, sorted(users)))
+        if jobs:
+            changed += self._with_session(lambda db: materialize_for_jobs(db, sorted(jobs)))
+        if users or jobs:
+            logger.info(f"Rematched {len(users)} users and {len(jobs)} jobs ({changed} rows changed)")
+        return changed
+
+    def _run(self) -> None:
+        changed = self.run_once()
+        logger.info(f"Materialized job matches ({changed} rows changed)")
+        last_full = time.monotonic()
+        while not self._stop.is_set():
+            timeout = None
+            if self.interval_seconds > 0:
+                timeout = max(0.0, self.interval_seconds - (time.monotonic() - last_full))
+            woke = self._wake.wait(timeout)
+            if self._stop.is_set():
+                break
+            if woke:
+                # Let a burst of edits settle before scoring
+                self._stop.wait(self.coalesce_seconds)
+                self._wake.clear()
+                self.drain()
+            else:
+                self.run_once()
+                last_full = time.monotonic()
+
+
+# Global materializer instance
+materializer = MatchMaterializer()
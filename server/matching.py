@@ -7,57 +7,55 @@ Computes a 0-100 score combining:
 - Sensitivity risks from job description keywords
 
 Falls back to heuristic scoring if AI is unavailable.
+
+`compute_match_scores` scores one user against many jobs at once by building
+a job x CDC hit-count matrix plus sensory-risk and remote/onsite masks and
+evaluating the same heuristic as NumPy array ops.
+
+`cascade_match_scores` is the optional second stage: only the heuristic top-N
+(`JM_AI_TOP_N`) go to the LLM, concurrently, within `JM_AI_BUDGET_SECONDS`.
 """
 from __future__ import annotations
 
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+import asyncio
+import heapq
+import json
 import re
 import os
 
+import numpy as np
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from server.models import CognitiveProfile, JobPosting, AssessmentResponse, User
+from server.models import CognitiveProfile, JobPosting, JobFeatures, AssessmentResponse, User
 from server.ai_agent import agent
+from server import llm_gateway
+from server.llm_cache import cache_key
+from server.llm_scheduler import estimate_tokens
+from server.skill_taxonomy import get_taxonomy
+from server.config import JM_AI_TOP_N, JM_AI_BUDGET_SECONDS
+
+# Skill/risk phrases come from the compiled taxonomy (server/data/skill_taxonomy.json)
+_TAXONOMY = get_taxonomy()
+SKILL_TO_CDC = _TAXONOMY.skills
+SENSORY_RISK_WORDS = _TAXONOMY.sensory_risks
+REMOTE_WORDS = _TAXONOMY.remote_words
+ONSITE_WORDS = _TAXONOMY.onsite_words
 
-# Map common skills/requirements keywords to CDCs
-SKILL_TO_CDC = {
-    # analytical
-    "analysis": "pattern_recognition",
-    "data": "pattern_recognition",
-    "excel": "pattern_recognition",
-    "python": "pattern_recognition",
-    "sql": "pattern_recognition",
-    # communication
-    "communication": "verbal_communication",
-    "presentation": "verbal_communication",
-    "stakeholder": "verbal_communication",
-    # spatial/engineering
-    "cad": "spatial_reasoning",
-    "3d": "spatial_reasoning",
-    # creativity
-    "design": "creative_ideation",
-    "brainstorm": "creative_ideation",
-    "ux": "creative_ideation",
-    # multitasking/executive
-    "project": "executive_function",
-    "planning": "executive_function",
-    "organize": "executive_function",
-    "deadlines": "multitasking_context_switching",
-    # speed
-    "fast-paced": "processing_speed",
-}
-
-SENSORY_RISK_WORDS = {
-    "noise": "sensory_processing",
-    "loud": "sensory_processing",
-    "bright": "sensory_processing",
-    "crowd": "sensory_processing",
-    "open office": "attention_filtering",
-    "interruptions": "attention_filtering",
-}
-
-REMOTE_WORDS = ["remote", "work from home", "wfh", "hybrid"]
-ONSITE_WORDS = ["on-site", "onsite", "office", "factory", "warehouse"]
+# Column order for the batch scorer's matrices
+CDC_FIELDS = [
+    "focus_sustained_attention", "pattern_recognition", "verbal_communication",
+    "spatial_reasoning", "creative_ideation", "multitasking_context_switching",
+    "processing_speed", "executive_function", "fine_motor_input",
+    "sensory_processing", "communication_interpretation", "attention_filtering",
+]
+_CDC_INDEX = {c: i for i, c in enumerate(CDC_FIELDS)}
+_RISK_KEYS = sorted(set(SENSORY_RISK_WORDS.values()))
+_SENSITIVITY_PENALTY = {"high": 12.0, "medium": 6.0}
+
+# Bump when feature extraction changes so stored job_features rows are recomputed
+FEATURE_VERSION = 3
 
 
 def _extract_job_skills(job: JobPosting) -> List[str]:
@@ -88,13 +86,187 @@ def _sensitivity_level(profile: CognitiveProfile, key: str) -> str:
     return str(sens.get(key, "")).lower()
 
 
-def _ai_assist_score(job: JobPosting, profile: Optional[CognitiveProfile], user_prefs: Optional[dict] = None) -> Optional[float]:
-    """Optional lightweight AI assist to refine a score. Returns None if AI disabled."""
-    if not getattr(agent, "llm_available", False):
-        return None
+def _job_text(job: JobPosting) -> str:
+    return " ".join(filter(None, [job.location or "", job.job_description or "", job.requirements or ""])).lower()
+
+
+def extract_job_features(job: JobPosting) -> Dict[str, Any]:
+    """Parse a job's free text into the features the scorer needs."""
+    found = _TAXONOMY.scan(_job_text(job))
+    return {
+        "tokens": _extract_job_skills(job),
+        "cdc_hits": found["cdc_hits"],
+        "sensory_risks": found["sensory_risks"],
+        "is_remote": found["is_remote"] or (str(job.location or "").lower() in ["remote", "hybrid"]),
+        "is_onsite": found["is_onsite"],
+    }
+
+
+def refresh_job_features(db: Session, job: JobPosting) -> JobFeatures:
+    """Recompute and stage the stored features for a job (caller commits)."""
+    data = extract_job_features(job)
+    row = db.query(JobFeatures).filter(JobFeatures.job_id == job.job_id).first()
+    if row is None:
+        row = JobFeatures(job_id=job.job_id)
+        db.add(row)
+    for k, v in data.items():
+        setattr(row, k, v)
+    row.feature_version = FEATURE_VERSION
+    return row
+
+
+def job_features(job: JobPosting) -> Dict[str, Any]:
+    """Stored features for a job, parsing the text only if the row is missing or stale.
+
+    Load ``JobPosting.features`` eagerly when scoring many jobs.
+    """
+    row: Optional[JobFeatures] = getattr(job, "features", None)
+    if row is not None and row.feature_version == FEATURE_VERSION:
+        return {
+            "tokens": row.tokens or [],
+            "cdc_hits": row.cdc_hits or {},
+            "sensory_risks": row.sensory_risks or {},
+            "is_remote": bool(row.is_remote),
+            "is_onsite": bool(row.is_onsite),
+        }
+    return extract_job_features(job)
+
+
+def build_job_matrix(jobs: Sequence[JobPosting]) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Build (cdc_hits, risk_counts, is_remote, is_onsite) arrays with one row per job.
+
+    ``risk_counts`` counts matched sensory-risk phrases per sensitivity key.
+    """
+    n = len(jobs)
+    hits = np.zeros((n, len(CDC_FIELDS)), dtype=np.float64)
+    risks = np.zeros((n, len(_RISK_KEYS)), dtype=np.float64)
+    remote = np.zeros(n, dtype=bool)
+    onsite = np.zeros(n, dtype=bool)
+    risk_index = {k: i for i, k in enumerate(_RISK_KEYS)}
+    for row, job in enumerate(jobs):
+        f = job_features(job)
+        for c, count in f["cdc_hits"].items():
+            if c in _CDC_INDEX:
+                hits[row, _CDC_INDEX[c]] = count
+        for key in f["sensory_risks"].values():
+            if key in risk_index:
+                risks[row, risk_index[key]] += 1.0
+        remote[row] = f["is_remote"]
+        onsite[row] = f["is_onsite"]
+    return hits, risks, remote, onsite
+
+
+def _profile_vectors(profile: CognitiveProfile) -> Tuple[np.ndarray, np.ndarray, bool]:
+    """Return (strengths, per-risk-key penalty, prefers_remote) for a profile."""
+    strengths = np.array([_cdc_strength(profile, c) for c in CDC_FIELDS], dtype=np.float64)
+    penalties = np.array(
+        [_SENSITIVITY_PENALTY.get(_sensitivity_level(profile, k), 0.0) for k in _RISK_KEYS],
+        dtype=np.float64,
+    )
+    return strengths, penalties, _preference_flags(profile)["prefers_remote"]
+
+
+def _score_profiles(
+    strengths: np.ndarray,
+    penalties: np.ndarray,
+    prefers_remote: np.ndarray,
+    hits: np.ndarray,
+    risks: np.ndarray,
+    remote: np.ndarray,
+    onsite: np.ndarray,
+) -> np.ndarray:
+    """Heuristic profile scores as a (profiles x jobs) int matrix.
+
+    The AI component falls back to the skills score; `cascade_match_scores`
+    supplies it for the top jobs.
+    """
+    skills, pref, penalty = _profile_components(strengths, penalties, prefers_remote, hits, risks, remote, onsite)
+    return _combine_profile(skills, pref, penalty)
+
+
+def _profile_components(
+    strengths: np.ndarray,
+    penalties: np.ndarray,
+    prefers_remote: np.ndarray,
+    hits: np.ndarray,
+    risks: np.ndarray,
+    remote: np.ndarray,
+    onsite: np.ndarray,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(skills, preference, sensory penalty) matrices, each profiles x jobs."""
+    totals = hits.sum(axis=1)
+    weighted = strengths @ hits.T
+    skills = np.where(totals > 0, 100.0 * weighted / np.maximum(totals, 1.0), 60.0)
+
+    pr = prefers_remote[:, None]
+    pref = np.where(pr & remote[None, :], 95.0, np.where(pr & onsite[None, :], 55.0, 75.0))
+
+    penalty = penalties @ risks.T
+    return skills, pref, penalty
+
+
+def _combine_profile(skills: np.ndarray, pref: np.ndarray, penalty: np.ndarray, ai: Optional[np.ndarray] = None) -> np.ndarray:
+    """Final profile score; ``ai`` (same shape) replaces the skills fallback where given."""
+    ai_component = skills if ai is None else ai
+    base = 0.55 * skills + 0.25 * pref + 0.20 * ai_component
+    base = np.clip(base - penalty, 0, 100)
+    return np.rint(np.maximum(base, 50)).astype(int)
+
+
+def build_profile_matrix(profiles: Sequence[CognitiveProfile]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Stack `_profile_vectors` into (strengths, penalties, prefers_remote) with one row per profile."""
+    strengths = np.zeros((len(profiles), len(CDC_FIELDS)), dtype=np.float64)
+    penalties = np.zeros((len(profiles), len(_RISK_KEYS)), dtype=np.float64)
+    prefers_remote = np.zeros(len(profiles), dtype=bool)
+    for row, profile in enumerate(profiles):
+        strengths[row], penalties[row], prefers_remote[row] = _profile_vectors(profile)
+    return strengths, penalties, prefers_remote
+
+
+def top_k_per_job(
+    profile_matrix: Tuple[np.ndarray, np.ndarray, np.ndarray],
+    job_matrix: Tuple[np.ndarray, ...],
+    k: int,
+    min_score: int = 0,
+    chunk_size: int = 2048,
+) -> List[List[Tuple[int, int]]]:
+    """Best ``k`` profiles for every job as ``[(profile_row, score), ...]``, highest first.
+
+    Profiles are scored in chunks; each chunk's per-job top ``k`` (via
+    ``argpartition``) is pushed into a bounded min-heap per job, so memory stays
+    at O(chunk x jobs + jobs x k).
+    """
+    strengths, penalties, prefers_remote = profile_matrix
+    n_jobs = len(job_matrix[0])
+    heaps: List[List[Tuple[int, int]]] = [[] for _ in range(n_jobs)]
+    if k <= 0 or n_jobs == 0:
+        return heaps
+    for start in range(0, len(strengths), chunk_size):
+        stop = start + chunk_size
+        scores = _score_profiles(strengths[start:stop], penalties[start:stop], prefers_remote[start:stop], *job_matrix)
+        if k < scores.shape[0]:
+            # rows of the k best scores in each job column
+            best = np.argpartition(-scores, k - 1, axis=0)[:k]
+        else:
+            best = np.broadcast_to(np.arange(scores.shape[0])[:, None], scores.shape)
+        for j in range(n_jobs):
+            heap = heaps[j]
+            for r in best[:, j]:
+                sc = int(scores[r, j])
+                if sc < min_score:
+                    continue
+                item = (sc, -(start + int(r)))
+                if len(heap) < k:
+                    heapq.heappush(heap, item)
+                elif item > heap[0]:
+                    heapq.heapreplace(heap, item)
+    return [[(-neg_row, sc) for sc, neg_row in sorted(heap, reverse=True)] for heap in heaps]
+
+
+def _ai_assist_prompt(job: JobPosting, profile: Optional[CognitiveProfile], user_prefs: Optional[dict] = None) -> str:
     # Compact prompt to keep latency low; ask for a number 0-100
     strengths_map = {k: getattr(profile, k, None) for k in dir(profile) if profile and k in SKILL_TO_CDC.values()}
-    prompt = (
+    return (
         "Given this ND profile strengths (0-1), preferences and sensitivities, and this job text, "
         "return a single JSON object with key 'score' (0-100) reflecting suitability.\n\n"
         f"STRENGTHS: {strengths_map}\n"
@@ -104,110 +276,172 @@ def _ai_assist_score(job: JobPosting, profile: Optional[CognitiveProfile], user_
         f"requirements={job.requirements}, description={job.job_description}\n"
         "Respond strictly as JSON like {\"score\": 78}."
     )
+
+
+def _parse_ai_score(resp: Any) -> Optional[float]:
     try:
-        resp = agent.llm.invoke(prompt)  # sync small call
-        import json
         data = json.loads(resp.content.strip()) if hasattr(resp, "content") else json.loads(str(resp))
         sc = float(data.get("score", 0))
-        if 0 <= sc <= 100:
-            return sc
+    except Exception:
         return None
+    return sc if 0 <= sc <= 100 else None
+
+
+async def _ai_assist_score(job: JobPosting, profile: Optional[CognitiveProfile], user_prefs: Optional[dict] = None) -> Optional[float]:
+    """LLM suitability score (0-100) for the cascade via `llm_gateway`; None if unavailable."""
+    prompt = _ai_assist_prompt(job, profile, user_prefs)
+
+    async def call():
+        return (await agent.llm.ainvoke(prompt)).content
+
+    try:
+        content = await llm_gateway.call(
+            cache_key(agent.llm.model_name, prompt, {"temperature": agent.llm.temperature}),
+            call,
+            tokens=estimate_tokens(prompt, 50),
+            client="match_cascade",
+        )
     except Exception:
         return None
+    return _parse_ai_score(content)
+
+
+def score_profile(profile: CognitiveProfile, job_matrix: Tuple[np.ndarray, ...]) -> np.ndarray:
+    """Heuristic scores of one profile against every row of a `build_job_matrix` result."""
+    strengths, penalties, prefers_remote = _profile_vectors(profile)
+    return _score_profiles(
+        strengths[None, :], penalties[None, :], np.array([prefers_remote]), *job_matrix
+    )[0]
+
+
+def score_without_profile(assess_count: int, preferred_work_setup: Optional[str], job_matrix: Tuple[np.ndarray, ...]) -> np.ndarray:
+    """No-profile heuristic (assessment progress, skill variety, work setup) for every job row."""
+    return _combine_without_profile(_without_profile_heuristic(assess_count, preferred_work_setup, job_matrix))
+
+
+def _without_profile_heuristic(assess_count: int, preferred_work_setup: Optional[str], job_matrix: Tuple[np.ndarray, ...]) -> np.ndarray:
+    """Unclipped no-profile heuristic per job row, before `_combine_without_profile`."""
+    hits, _risks, remote, onsite = job_matrix
+    baseline = 50 if assess_count == 0 else min(60 + assess_count * 5, 80)
+    variety_boost = np.minimum((hits > 0).sum(axis=1) * 3, 12)
+    preferred = (preferred_work_setup or "").lower()
+    wants_remote = preferred.find("remote") != -1
+    wants_onsite = preferred.find("on") != -1
+    pref_boost = np.where(wants_remote & remote, 6, np.where(wants_onsite & onsite, 4, 0))
+    return baseline + variety_boost + pref_boost
+
+
+def _combine_without_profile(heuristic: np.ndarray, ai: Optional[np.ndarray] = None) -> np.ndarray:
+    """Final no-profile score; with ``ai`` it is the 50/50 blend used by `cascade_match_scores`."""
+    score = heuristic if ai is None else 0.5 * heuristic + 0.5 * ai
+    return np.clip(np.rint(score), 50, 90).astype(int)
+
 
+def user_scoring_inputs(db: Session, user_id: str) -> Tuple[Optional[CognitiveProfile], int, Optional[str]]:
+    """(profile, distinct assessments taken, preferred_work_setup) for scoring one user.
 
-def compute_match_score(db: Session, user_id: str, job: JobPosting) -> int:
-    """Compute a 0-100 match score for a user and a job."""
+    The assessment count and work setup are only loaded when there is no profile.
+    With an `AsyncSession` use ``await db.run_sync(user_scoring_inputs, user_id)``.
+    """
     profile: Optional[CognitiveProfile] = (
         db.query(CognitiveProfile).filter(CognitiveProfile.user_id == user_id).first()
     )
-    if not profile:
-        # No profile yet; vary score using job tokens and user's preferred setup
-        # 1) Assessment progress baseline
-        q = (
-            db.query(AssessmentResponse.assessment_id)
-            .filter(AssessmentResponse.user_id == user_id)
-            .distinct()
+    if profile:
+        return profile, 0, None
+    assess_count = (
+        db.query(AssessmentResponse.assessment_id)
+        .filter(AssessmentResponse.user_id == user_id)
+        .distinct()
+        .count()
+    )
+    user = db.query(User).filter(User.id == user_id).first()
+    return None, assess_count, user.preferred_work_setup if user else None
+
+
+def compute_match_scores(
+    db: Session,
+    user_id: str,
+    jobs: Sequence[JobPosting],
+    job_matrix: Optional[Tuple[np.ndarray, ...]] = None,
+) -> Dict[str, int]:
+    """Score one user against many jobs in a single vectorized pass.
+
+    Loads the profile (or the no-profile inputs) once and returns
+    ``{job_id: score}``. Pass a prebuilt ``job_matrix`` to reuse it across
+    users. The optional AI assist is not applied here; see
+    `cascade_match_scores`.
+    """
+    if not jobs:
+        return {}
+    if job_matrix is None:
+        job_matrix = build_job_matrix(jobs)
+
+    profile, assess_count, preferred = user_scoring_inputs(db, user_id)
+    if profile:
+        scores = score_profile(profile, job_matrix)
+    else:
+        scores = score_without_profile(assess_count, preferred, job_matrix)
+
+    return {str(job.job_id): int(sc) for job, sc in zip(jobs, scores)}
+
+
+async def cascade_match_scores(
+    db: Session | AsyncSession,
+    user_id: str,
+    jobs: Sequence[JobPosting],
+    scores: Dict[str, int],
+    top_n: int = JM_AI_TOP_N,
+    budget_seconds: float = JM_AI_BUDGET_SECONDS,
+) -> Dict[str, int]:
+    """Second cascade stage: refine the heuristic top ``top_n`` with the LLM.
+
+    ``scores`` are stage-one heuristic scores (`compute_match_scores` or stored
+    match rows). The best ``top_n`` jobs are sent to the LLM concurrently;
+    refinements that arrive within ``budget_seconds`` are merged in, anything
+    still pending is cancelled and keeps its heuristic score. Returns a new
+    ``{job_id: score}`` dict. ``db`` may be sync or async; ``jobs`` need
+    ``JobPosting.features`` loaded.
+    """
+    if top_n <= 0 or not jobs or not getattr(agent, "llm_available", False):
+        return dict(scores)
+    candidates = sorted(jobs, key=lambda j: scores.get(str(j.job_id), 0), reverse=True)[:top_n]
+    job_matrix = build_job_matrix(candidates)
+
+    if isinstance(db, AsyncSession):
+        profile, assess_count, preferred = await db.run_sync(user_scoring_inputs, user_id)
+    else:
+        profile, assess_count, preferred = user_scoring_inputs(db, user_id)
+    if profile:
+        strengths, penalties, prefers_remote = _profile_vectors(profile)
+        skills, pref, penalty = _profile_components(
+            strengths[None, :], penalties[None, :], np.array([prefers_remote]), *job_matrix
         )
-        assess_count = len(q.all())
-        baseline = 50 if assess_count == 0 else min(60 + assess_count * 5, 80)
-
-        # 2) Token-derived skill variety: more mapped CDC types -> higher score
-        tokens = _extract_job_skills(job)
-        types = set()
-        for t in tokens:
-            if t in SKILL_TO_CDC:
-                types.add(SKILL_TO_CDC[t])
-        variety_boost = min(len(types) * 3, 12)  # 0..12
-
-        # 3) Preference alignment from User.preferred_work_setup
-        user = db.query(User).filter(User.id == user_id).first()
-        preferred = (user.preferred_work_setup or "").lower() if user else ""
-        jt = (" ".join(filter(None, [job.location or "", job.job_description or "", job.requirements or ""]))).lower()
-        is_remote = any(w in jt for w in REMOTE_WORDS) or (str(job.location or "").lower() in ["remote", "hybrid"])
-        is_onsite = any(w in jt for w in ONSITE_WORDS)
-        pref_boost = 0
-        if preferred.find("remote") != -1 and is_remote:
-            pref_boost = 6
-        elif preferred.find("on") != -1 and is_onsite:
-            pref_boost = 4
-
-        # 4) Optional AI assist without profile using user prefs
-        ai_score = _ai_assist_score(job, None, user_prefs={"preferred_work_setup": preferred})
-        ai_component = ai_score if ai_score is not None else baseline + variety_boost + pref_boost
-
-        score = 0.5 * (baseline + variety_boost + pref_boost) + 0.5 * ai_component
-        return int(max(50, min(90, round(score))))
-
-    # 1) Skills vs strengths
-    tokens = _extract_job_skills(job)
-    cdc_hits: Dict[str, int] = {}
-    for t in tokens:
-        if t in SKILL_TO_CDC:
-            c = SKILL_TO_CDC[t]
-            cdc_hits[c] = cdc_hits.get(c, 0) + 1
-    if not cdc_hits:
-        skills_score = 60  # unknown requirements; neutral baseline
+        user_prefs = None
+
+        def merge(i: int, ai: float) -> int:
+            return int(_combine_profile(skills[0, i], pref[0, i], penalty[0, i], np.float64(ai)))
     else:
-        weighted = 0.0
-        total = 0.0
-        for c, n in cdc_hits.items():
-            s = _cdc_strength(profile, c)  # 0-1
-            weighted += s * n
-            total += n
-        skills_score = 100.0 * (weighted / max(total, 1.0))  # 0-100
-
-    # 2) Preferences alignment
-    prefs = _preference_flags(profile)
-    job_text = " ".join(filter(None, [job.location or "", job.job_description or "", job.requirements or ""]))
-    jt = job_text.lower()
-    prefers_remote = prefs["prefers_remote"]
-    is_remote = any(w in jt for w in REMOTE_WORDS) or (str(job.location or "").lower() in ["remote", "hybrid"])
-    is_onsite = any(w in jt for w in ONSITE_WORDS)
-    pref_score = 75
-    if prefers_remote and is_remote:
-        pref_score = 95
-    elif prefers_remote and is_onsite:
-        pref_score = 55
-
-    # 3) Sensitivity penalty
-    penalty = 0
-    for w, sens_key in SENSORY_RISK_WORDS.items():
-        if w in jt:
-            level = _sensitivity_level(profile, sens_key)
-            if level == "high":
-                penalty += 12
-            elif level == "medium":
-                penalty += 6
-
-    # 4) Optional AI adjustment
-    ai_score = _ai_assist_score(job, profile)
-
-    # Combine
-    base = 0.55 * skills_score + 0.25 * pref_score + 0.20 * (ai_score if ai_score is not None else skills_score)
-    base = max(0, min(100, base - penalty))
-
-    # Keep scores in a practical band
-    if base < 50:
-        base = 50
-    return int(round(base))
+        user_prefs = {"preferred_work_setup": (preferred or "").lower()}
+        heuristic = _without_profile_heuristic(assess_count, preferred, job_matrix)
+
+        def merge(i: int, ai: float) -> int:
+            return int(_combine_without_profile(heuristic[i], np.float64(ai)))
+
+    async def refine(i: int) -> Tuple[int, Optional[float]]:
+        return i, await _ai_assist_score(candidates[i], profile, user_prefs)
+
+    tasks = [asyncio.ensure_future(refine(i)) for i in range(len(candidates))]
+    refined = dict(scores)
+    try:
+        # Merge each refinement as it arrives until the budget runs out
+        for next_done in asyncio.as_completed(tasks, timeout=budget_seconds):
+            i, ai = await next_done
+            if ai is not None:
+                refined[str(candidates[i].job_id)] = merge(i, ai)
+    except asyncio.TimeoutError:
+        pass
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+    return refined
@@ -0,0 +1,346 @@
+"""
+In-process metrics registry rendered in the Prometheus text format (GET /api/metrics).
+
+Metrics are declared once at import (`counter`, `gauge`, `histogram` on
+`REGISTRY`) and updated from any thread::
+
+    REQUESTS.labels("GET", "/api/health", "200").inc()
+    LATENCY.labels("GET", "/api/health").observe(0.004)
+
+Values that already live elsewhere (pool state, cache counters) are read at
+collection time by functions passed to `REGISTRY.register_collector`.
+
+Multiple worker processes: set `METRICS_MULTIPROC_DIR` to a directory shared
+by the workers and emptied at each deploy. Every process writes its snapshot
+there (every `METRICS_FLUSH_SECONDS` and at shutdown); a scrape served by any
+worker merges all of them. Counters and histograms are summed over every
+snapshot, gauges over processes that are still alive. Without the directory
+each process reports only itself.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import math
+import os
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from server.config import METRICS_MULTIPROC_DIR, METRICS_FLUSH_SECONDS
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Request/LLM latency buckets in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+Labels = Tuple[str, ...]
+# (metric name, type, help, label names, {label values: value}); histogram
+# values are [bucket counts..., sum, count] with non-cumulative bucket counts
+Family = Tuple[str, str, str, Tuple[str, ...], Dict[Labels, Any]]
+
+
+class _Child:
+    def __init__(self, metric: "Metric", key: Labels):
+        self._metric = metric
+        self._key = key
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._metric._add(self._key, amount)
+
+    def set(self, value: float) -> None:
+        self._metric._set(self._key, value)
+
+    def observe(self, value: float) -> None:
+        self._metric._observe(self._key, value)
+
+
+class Metric:
+    def __init__(self, registry: "Registry", name: str, kind: str, doc: str,
+                 labelnames: Sequence[str], buckets: Sequence[float] = ()):
+        self.name = name
+        self.kind = kind
+        self.doc = doc
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._lock = registry._lock
+        self._values: Dict[Labels, Any] = {}
+
+    def labels(self, *values: Any, **kw: Any) -> _Child:
+        if kw:
+            values = tuple(kw[name] for name in self.labelnames)
+        if len(values) != len(self.labelnames):
+            raise ValueError(f"{self.name} takes labels {self.labelnames}")
+        return _Child(self, tuple(str(v) for v in values))
+
+    # Unlabelled shortcuts
+    def inc(self, amount: float = 1.0) -> None:
+        self._add((), amount)
+
+    def set(self, value: float) -> None:
+        self._set((), value)
+
+    def observe(self, value: float) -> None:
+        self._observe((), value)
+
+    def _add(self, key: Labels, amount: float) -> None:
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def _set(self, key: Labels, value: float) -> None:
+        with self._lock:
+            self._values[key] = float(value)
+
+    def _observe(self, key: Labels, value: float) -> None:
+        with self._lock:
+            row = self._values.get(key)
+            if row is None:
+                row = self._values[key] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    row[i] += 1
+                    break
+            else:
+                row[len(self.buckets)] += 1
+            row[-2] += value
+            row[-1] += 1
+
+    def family(self) -> Family:
+        values = {k: (list(v) if isinstance(v, list) else v) for k, v in self._values.items()}
+        return self.name, self.kind, self.doc, self.labelnames, values
+
+
+class Registry:
+    def __init__(self, multiproc_dir: Optional[str] = None, flush_seconds: float = 5.0):
+        self._lock = threading.Lock()
+        self._metrics: Dict[str, Metric] = {}
+        self._collectors: List[Callable[[], Iterable[Family]]] = []
+        self.multiproc_dir = multiproc_dir or None
+        self.flush_seconds = flush_seconds
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _declare(self, name: str, kind: str, doc: str, labelnames: Sequence[str], buckets: Sequence[float] = ()) -> Metric:
+        if name in self._metrics:
+            raise ValueError(f"Metric {name} already registered")
+        metric = self._metrics[name] = Metric(self, name, kind, doc, labelnames, buckets)
+        return metric
+
+    def counter(self, name: str, doc: str, labelnames: Sequence[str] = ()) -> Metric:
+        return self._declare(name, "counter", doc, labelnames)
+
+    def gauge(self, name: str, doc: str, labelnames: Sequence[str] = ()) -> Metric:
+        return self._declare(name, "gauge", doc, labelnames)
+
+    def histogram(self, name: str, doc: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = LATENCY_BUCKETS) -> Metric:
+        return self._declare(name, "histogram", doc, labelnames, sorted(buckets))
+
+    def register_collector(self, fn: Callable[[], Iterable[Family]]) -> None:
+        """``fn()`` yields families read at collection time (use `family`)."""
+        self._collectors.append(fn)
+
+    def families(self) -> List[Family]:
+        """This process's metrics; collected samples join a declared metric of the same name"""
+        with self._lock:
+            families = {m.name: m.family() for m in self._metrics.values()}
+        for collect in self._collectors:
+            try:
+                for name, kind, doc, labelnames, values in collect():
+                    if name in families:
+                        families[name][4].update(values)
+                    else:
+                        families[name] = (name, kind, doc, labelnames, dict(values))
+            except Exception as e:
+                logger.warning(f"Metrics collector {getattr(collect, '__name__', collect)} failed: {e}")
+        return list(families.values())
+
+    # -- multi-process ------------------------------------------------------
+
+    def _snapshot_path(self, pid: int) -> str:
+        return os.path.join(self.multiproc_dir, f"metrics-{pid}.json")
+
+    def write_snapshot(self) -> None:
+        if not self.multiproc_dir:
+            return
+        os.makedirs(self.multiproc_dir, exist_ok=True)
+        payload = {
+            "pid": os.getpid(),
+            "families": [
+                [name, kind, doc, list(labelnames), [[list(k), v] for k, v in values.items()]]
+                for name, kind, doc, labelnames, values in self.families()
+            ],
+        }
+        path = self._snapshot_path(os.getpid())
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(payload, f)
+        os.replace(tmp, path)
+
+    def _read_snapshots(self) -> List[Tuple[int, List[Family]]]:
+        snapshots = []
+        for entry in os.listdir(self.multiproc_dir):
+            if not (entry.startswith("metrics-") and entry.endswith(".json")):
+                continue
+            try:
+                with open(os.path.join(self.multiproc_dir, entry)) as f:
+                    payload = json.load(f)
+            except (OSError, ValueError):
+                continue
+            families = [
+                (name, kind, doc, tuple(labelnames), {tuple(k): v for k, v in values})
+                for name, kind, doc, labelnames, values in payload["families"]
+            ]
+            snapshots.append((int(payload["pid"]), families))
+        return snapshots
+
+    def collect(self) -> List[Family]:
+        """Families to expose: this process, or every worker's snapshot merged"""
+        if not self.multiproc_dir:
+            return self.families()
+        self.write_snapshot()
+        merged: Dict[str, Family] = {}
+        for pid, families in self._read_snapshots():
+            alive = pid == os.getpid() or _pid_alive(pid)
+            for name, kind, doc, labelnames, values in families:
+                if kind == "gauge" and not alive:
+                    continue
+                target = merged.setdefault(name, (name, kind, doc, labelnames, {}))[4]
+                for key, value in values.items():
+                    if key not in target:
+                        target[key] = list(value) if isinstance(value, list) else value
+                    elif isinstance(value, list):
+                        target[key] = [a + b for a, b in zip(target[key], value)]
+                    else:
+                        target[key] += value
+        return list(merged.values())
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for name, kind, doc, labelnames, values in sorted(self.collect(), key=lambda f: f[0]):
+            lines.append(f"# HELP {name} {_escape_help(doc)}")
+            lines.append(f"# TYPE {name} {kind}")
+            buckets = self._metrics[name].buckets if name in self._metrics else ()
+            for key, value in sorted(values.items()):
+                labels = list(zip(labelnames, key))
+                if kind != "histogram":
+                    lines.append(f"{name}{_labels(labels)} {_number(value)}")
+                    continue
+                cumulative = 0
+                for bound, count in zip(list(buckets) + [math.inf], value[:-2]):
+                    cumulative += count
+                    le = "+Inf" if bound == math.inf else _number(bound)
+                    lines.append(f"{name}_bucket{_labels(labels + [('le', le)])} {cumulative}")
+                lines.append(f"{name}_sum{_labels(labels)} {_number(value[-2])}")
+                lines.append(f"{name}_count{_labels(labels)} {value[-1]}")
+        return "\n".join(lines) + "\n"
+
+    def start(self) -> None:
+        """Flush this process's snapshot periodically (multi-process mode only)."""
+        if not self.multiproc_dir or self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="metrics-flush", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        try:
+            self.write_snapshot()
+        except OSError as e:
+            logger.warning(f"Could not write metrics snapshot: {e}")
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.flush_seconds):
+            try:
+                self.write_snapshot()
+            except OSError as e:
+                logger.warning(f"Could not write metrics snapshot: {e}")
+
+
+def family(name: str, kind: str, doc: str, labelnames: Sequence[str], values: Dict[Labels, float]) -> Family:
+    """A collected family, for `Registry.register_collector` functions"""
+    return name, kind, doc, tuple(labelnames), {tuple(str(v) for v in k): float(x) for k, x in values.items()}
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _escape_help(doc: str) -> str:
+    return doc.replace("\\", "\\\\").replace("\n", "\\n")
+
+
+def _labels(pairs: List[Tuple[str, str]]) -> str:
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape_label(v)}"' for k, v in pairs) + "}"
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _number(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+REGISTRY = Registry(METRICS_MULTIPROC_DIR, METRICS_FLUSH_SECONDS)
+
+# HTTP
+HTTP_REQUESTS = REGISTRY.counter(
+    "http_requests_total", "HTTP requests by route template and status code", ("method", "route", "status")
+)
+HTTP_LATENCY = REGISTRY.histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template", ("method", "route")
+)
+
+# Database
+DB_POOL_CHECKOUT = REGISTRY.histogram(
+    "db_pool_checkout_seconds", "Time waiting for a pooled DB connection", ("engine",),
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+DB_REQUEST_QUERIES = REGISTRY.histogram(
+    "db_queries_per_request", "SQL statements issued per HTTP request", ("route",),
+    buckets=(1, 2, 3, 5, 8, 13, 20, 50, 100),
+)
+DB_REQUEST_SECONDS = REGISTRY.counter(
+    "db_query_seconds_total", "Time spent executing SQL while serving requests", ("route",)
+)
+DB_N_PLUS_ONE = REGISTRY.counter(
+    "db_n_plus_one_requests_total", "Requests that repeated one statement shape DB_N_PLUS_ONE_THRESHOLD times", ("route",)
+)
+
+# LLM
+LLM_CALLS = REGISTRY.counter(
+    "llm_calls_total",
+    "LLM calls by client and outcome (ok, error, cache_hit, joined, unavailable)",
+    ("client", "outcome"),
+)
+LLM_LATENCY = REGISTRY.histogram(
+    "llm_call_duration_seconds", "Provider latency of LLM calls (scheduler queueing excluded)", ("client",)
+)
+LLM_ESTIMATED_TOKENS = REGISTRY.counter(
+    "llm_estimated_tokens_total", "Token estimates charged to the scheduler for provider calls", ("client",)
+)
+LLM_TOKENS = REGISTRY.counter(
+    "llm_tokens_total", "Tokens reported by the provider (calls that return usage)", ("client", "type")
+)
+
+# Caches (hit ratio = hits / (hits + misses))
+CACHE_HITS = REGISTRY.counter("cache_hits_total", "Cache hits", ("cache",))
+CACHE_MISSES = REGISTRY.counter("cache_misses_total", "Cache misses", ("cache",))
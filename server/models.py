@@ -2,9 +2,9 @@
 SQLAlchemy models for BrainBridge platform
 """
 
-from sqlalchemy import Column, String, Text, Boolean, DateTime, Date, Integer, Float, ForeignKey, Enum, JSON
+from sqlalchemy import Column, String, Text, Boolean, DateTime, Date, Integer, Float, ForeignKey, Enum, JSON, Index, text
 from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, backref
 from sqlalchemy.sql import func
 from .database import Base
 import uuid
@@ -131,7 +131,33 @@ class JobPosting(Base):
     
     # Relationships
     employer = relationship("User", backref="job_postings")
+
+    __table_args__ = (
+        # Active catalog, newest first (partial: inactive jobs are never listed)
+        Index(
+            "ix_job_postings_active_posted", "posted_date",
+            postgresql_where=text("is_active"), sqlite_where=text("is_active IS 1"),
+        ),
+        # Employer dashboard: one employer's (active) jobs, newest first
+        Index("ix_job_postings_employer_active_posted", "employer_id", "is_active", "posted_date"),
+    )
+    
+# Precomputed matching features per job (written on create/update, see server/matching.py)
+class JobFeatures(Base):
+    __tablename__ = "job_features"
+    
+    job_id = Column(String, ForeignKey("job_postings.job_id"), primary_key=True)
+    tokens = Column(JSON)          # Unique lower-cased tokens from requirements + description
+    cdc_hits = Column(JSON)        # {"pattern_recognition": 2, ...}
+    sensory_risks = Column(JSON)   # {"noise": "sensory_processing", ...}
+    is_remote = Column(Boolean, default=False)
+    is_onsite = Column(Boolean, default=False)
+    feature_version = Column(Integer, nullable=False)
+    computed_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     
+    # Relationships
+    job_posting = relationship("JobPosting", backref=backref("features", uselist=False))
+
 # Add cognitive_profile relationship to User
 User.cognitive_profile = relationship("CognitiveProfile", back_populates="user", uselist=False)
 
@@ -196,6 +222,14 @@ class JobMatch(Base):
     nd_adult = relationship("User", foreign_keys=[nd_adult_id])
     job_posting = relationship("JobPosting")
 
+    __table_args__ = (
+        # One materialized row per (user, job); read path is "my matches by score"
+        Index("ux_job_matches_nd_adult_job", "nd_adult_id", "job_id", unique=True),
+        Index("ix_job_matches_nd_adult_score", "nd_adult_id", "match_score"),
+        # Materializer drops/rescores a job's rows
+        Index("ix_job_matches_job_id", "job_id"),
+    )
+
 # Support Relationships
 class SupportRelationship(Base):
     __tablename__ = "support_relationships"
@@ -248,6 +282,11 @@ class AssessmentResponse(Base):
     assessment = relationship("Assessment", back_populates="responses")
     user = relationship("User")
 
+    __table_args__ = (
+        # Latest response per (user, assessment); the user_id prefix serves "my responses"
+        Index("ix_assessment_responses_user_assessment_completed", "user_id", "assessment_id", "completed_at"),
+    )
+
 class CognitiveProfile(Base):
     __tablename__ = "cognitive_profiles"
     
@@ -297,4 +336,48 @@ class AuditLog(Base):
     timestamp = Column(DateTime(timezone=True), server_default=func.now())
     
     # Relationships
-    user = relationship("User")
\ No newline at end of file
+    user = relationship("User")
+
+# Background tasks (server/task_queue.py)
+class BackgroundTask(Base):
+    __tablename__ = "background_tasks"
+    
+    task_id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    kind = Column(String, nullable=False)  # handler name, e.g. "analyze_profile"
+    status = Column(String, nullable=False, default="queued")  # queued, running, succeeded, failed
+    user_id = Column(String, ForeignKey("users.id"))
+    payload = Column(JSON)
+    result = Column(JSON)
+    error = Column(Text)
+    attempts = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True))
+    finished_at = Column(DateTime(timezone=True))
+
+    __table_args__ = (
+        # Workers claim the oldest queued task
+        Index("ix_background_tasks_status_created", "status", "created_at"),
+    )
+
+
+class RefreshToken(Base):
+    """Server-side record of an issued refresh token (the token itself is never stored).
+
+    Each refresh rotates the token: the presented row is revoked and points at
+    its successor (`replaced_by`). All tokens descending from one login share
+    a `family_id`; presenting an already-rotated token revokes the family.
+    """
+    __tablename__ = "refresh_tokens"
+
+    token_hash = Column(String(64), primary_key=True)  # sha256 hex of the opaque token
+    user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    family_id = Column(String, nullable=False)
+    issued_at = Column(DateTime(timezone=True), server_default=func.now())
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+    revoked_at = Column(DateTime(timezone=True))
+    replaced_by = Column(String(64))
+
+    __table_args__ = (
+        Index("ix_refresh_tokens_user_id", "user_id"),
+        Index("ix_refresh_tokens_family_id", "family_id"),
+    )
@@ -4,25 +4,111 @@ OpenAI Integration for BrainBridge Assessment Analysis
 Enhanced AI-powered assessment analysis and personalized recommendations
 """
 
-from openai import OpenAI
-import os
 import json
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, AsyncIterator, List, Tuple
 from datetime import datetime
 
-# Initialize AIML client
-client = OpenAI(
-    base_url="https://api.aimlapi.com/v1",
-    api_key=os.getenv("AIML_API_KEY"),   # just the key
-)
+from server import llm_gateway
+
+
+class JSONSectionSplitter:
+    """Incrementally splits a streamed JSON object into its top-level members.
+
+    `feed` takes the next chunk of text and returns the (key, value) pairs
+    whose values became complete with it, so callers can forward whole
+    sections ("insights", "recommendations", ...) before the object closes.
+    """
+
+    def __init__(self):
+        self.buffer = ""
+        self.pos = 0
+        self.depth = 0
+        self.in_string = False
+        self.escaped = False
+        self.member_start: Optional[int] = None
+
+    def feed(self, text: str) -> List[Tuple[str, Any]]:
+        self.buffer += text
+        sections: List[Tuple[str, Any]] = []
+        while self.pos < len(self.buffer):
+            ch = self.buffer[self.pos]
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif ch == "\\":
+                    self.escaped = True
+                elif ch == '"':
+                    self.in_string = False
+            elif ch == '"':
+                self.in_string = True
+            elif ch in "{[":
+                self.depth += 1
+                if self.depth == 1 and ch == "{":
+                    self.member_start = self.pos + 1
+            elif ch in "}]":
+                self.depth -= 1
+                if self.depth == 0:
+                    sections.extend(self._member(self.pos))
+                    self.member_start = None
+            elif ch == "," and self.depth == 1:
+                sections.extend(self._member(self.pos))
+                self.member_start = self.pos + 1
+            self.pos += 1
+        return sections
+
+    def _member(self, end: int) -> List[Tuple[str, Any]]:
+        if self.member_start is None:
+            return []
+        member = self.buffer[self.member_start:end].strip()
+        if not member:
+            return []
+        try:
+            return list(json.loads("{" + member + "}").items())
+        except ValueError:
+            return []
+
 
 class AssessmentAnalyzer:
     """AI-powered assessment analyzer using AIML GPT models for cognitive profile analysis"""
     
     def __init__(self):
         self.model = "openai/gpt-5-chat-latest"  # AIML’s latest GPT model
+
+    async def _json_completion(self, messages, **params) -> Dict[str, Any]:
+        """JSON chat completion through the async LLM gateway (cached, non-blocking)."""
+        return await llm_gateway.chat_json(self.model, messages, client="AssessmentAnalyzer", **params)
         
-    def analyze_assessment_responses(
+    # Completion params for assessment analysis (streamed and non-streamed share the cache)
+    ANALYSIS_PARAMS = {
+        "temperature": 0.7,
+        "top_p": 0.7,
+        "frequency_penalty": 1,
+        "max_tokens": 2000,
+        "response_format": {"type": "json_object"},
+    }
+
+    def _analysis_messages(
+        self,
+        responses: Dict[str, str],
+        assessment_type: str,
+        user_context: Optional[Dict] = None
+    ) -> List[Dict[str, str]]:
+        analysis_prompt = self._create_analysis_prompt(responses, assessment_type, user_context)
+        return [
+            {
+                "role": "system",
+                "content": """You are an expert neurodiversity consultant and cognitive assessment specialist. 
+                Your role is to analyze assessment responses from neurodivergent professionals and provide 
+                insightful, respectful, and actionable cognitive profile analysis. Focus on strengths, 
+                preferences, and workplace accommodations rather than deficits. Respond in JSON format."""
+            },
+            {
+                "role": "user", 
+                "content": analysis_prompt
+            }
+        ]
+        
+    async def analyze_assessment_responses(
         self, 
         responses: Dict[str, str], 
         assessment_type: str,
@@ -32,209 +118,237 @@ class AssessmentAnalyzer:
         Analyze assessment responses and generate insights
         """
         
-        analysis_prompt = self._create_analysis_prompt(responses, assessment_type, user_context)
-        
         try:
-            response = client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": """You are an expert neurodiversity consultant and cognitive assessment specialist. 
-                        Your role is to analyze assessment responses from neurodivergent professionals and provide 
-                        insightful, respectful, and actionable cognitive profile analysis. Focus on strengths, 
-                        preferences, and workplace accommodations rather than deficits. Respond in JSON format."""
-                    },
-                    {
-                        "role": "user", 
-                        "content": analysis_prompt
-                    }
-                ],
-                temperature=0.7,
-                top_p=0.7,
-                frequency_penalty=1,
-                max_tokens=2000,
-                response_format={"type": "json_object"},
+            analysis_result = await self._json_completion(
+                self._analysis_messages(responses, assessment_type, user_context),
+                **self.ANALYSIS_PARAMS,
             )
+            return self._finalize_analysis(analysis_result, responses, assessment_type)
             
-            print("RAW MODEL OUTPUT:", response.choices[0].message)
+        except Exception as e:
+            print(f"AIML analysis error: {str(e)}")
+            return self._fallback_analysis(responses, assessment_type)
 
-            analysis_result = response.choices[0].message.content  # use .content
-            analysis_result = json.loads(analysis_result)
-            
-            # Recursive sanitizer to drop empty-string keys produced by LLMs
-            def _clean_empty_keys(obj):
-                if isinstance(obj, dict):
-                    return {k: _clean_empty_keys(v) for k, v in obj.items() if k != ""}
-                if isinstance(obj, list):
-                    return [_clean_empty_keys(x) for x in obj]
-                return obj
-            analysis_result = _clean_empty_keys(analysis_result)
-            
-            # Sanitize unexpected empty keys from model output
-            if isinstance(analysis_result, dict) and "" in analysis_result:
-                analysis_result.pop("", None)
-            
-            # Ensure required sections exist
-            analysis_result.setdefault("cognitive_profile", {})
-            analysis_result.setdefault("insights", {})
-            analysis_result.setdefault("recommendations", {})
-            recs = analysis_result["recommendations"]
-            recs.setdefault("workplace_accommodations", [])
-            recs.setdefault("career_suggestions", [])
-            recs.setdefault("development_opportunities", [])
-            
-            # Map common aliases
-            if "summary" not in analysis_result and "_summary" in analysis_result:
-                analysis_result["summary"] = analysis_result.pop("_summary")
-            if "confidence_score" not in analysis_result and "_score" in analysis_result:
-                analysis_result["confidence_score"] = analysis_result.pop("_score")
-            
-            # Normalize confidence_score
+    async def stream_assessment_analysis(
+        self,
+        responses: Dict[str, str],
+        assessment_type: str,
+        user_context: Optional[Dict] = None
+    ) -> AsyncIterator[Tuple[str, Any]]:
+        """
+        Streaming variant of `analyze_assessment_responses`.
+
+        Yields ("delta", text) as tokens arrive, ("section", {"key", "value"}) as
+        each top-level section completes, and finally ("result", analysis) with
+        the same validated payload the non-streaming call returns (or the
+        fallback analysis if the model fails).
+        """
+        messages = self._analysis_messages(responses, assessment_type, user_context)
+        async for event in self._stream_json(messages, self.ANALYSIS_PARAMS):
+            if event[0] == "raw":
+                try:
+                    yield "result", self._finalize_analysis(event[1], responses, assessment_type)
+                except Exception as e:
+                    print(f"AIML analysis error: {str(e)}")
+                    yield "result", self._fallback_analysis(responses, assessment_type)
+            elif event[0] == "error":
+                yield "result", self._fallback_analysis(responses, assessment_type)
+            else:
+                yield event
+
+    async def _stream_json(self, messages, params) -> AsyncIterator[Tuple[str, Any]]:
+        """Stream a JSON completion as delta/section events, then ("raw", parsed) or ("error", message)."""
+        splitter = JSONSectionSplitter()
+        text = ""
+        try:
+            async for delta in llm_gateway.chat_json_stream(self.model, messages, client="AssessmentAnalyzer", **params):
+                text += delta
+                yield "delta", delta
+                for key, value in splitter.feed(delta):
+                    yield "section", {"key": key, "value": value}
+            parsed = json.loads(text)
+        except Exception as e:
+            print(f"AIML streaming error: {str(e)}")
+            yield "error", str(e)
+            return
+        yield "raw", parsed
+
+    def _finalize_analysis(
+        self,
+        analysis_result: Dict[str, Any],
+        responses: Dict[str, str],
+        assessment_type: str
+    ) -> Dict[str, Any]:
+        """Sanitize a raw model analysis and backfill the sections the UI needs"""
+        # Recursive sanitizer to drop empty-string keys produced by LLMs
+        def _clean_empty_keys(obj):
+            if isinstance(obj, dict):
+                return {k: _clean_empty_keys(v) for k, v in obj.items() if k != ""}
+            if isinstance(obj, list):
+                return [_clean_empty_keys(x) for x in obj]
+            return obj
+        analysis_result = _clean_empty_keys(analysis_result)
+
+        # Sanitize unexpected empty keys from model output
+        if isinstance(analysis_result, dict) and "" in analysis_result:
+            analysis_result.pop("", None)
+
+        # Ensure required sections exist
+        analysis_result.setdefault("cognitive_profile", {})
+        analysis_result.setdefault("insights", {})
+        analysis_result.setdefault("recommendations", {})
+        recs = analysis_result["recommendations"]
+        recs.setdefault("workplace_accommodations", [])
+        recs.setdefault("career_suggestions", [])
+        recs.setdefault("development_opportunities", [])
+
+        # Map common aliases
+        if "summary" not in analysis_result and "_summary" in analysis_result:
+            analysis_result["summary"] = analysis_result.pop("_summary")
+        if "confidence_score" not in analysis_result and "_score" in analysis_result:
+            analysis_result["confidence_score"] = analysis_result.pop("_score")
+
+        # Normalize confidence_score
+        try:
+            cs = float(analysis_result.get("confidence_score", 0.85))
+            # clamp to [0,1] if it's a percentage or out of bounds
+            if cs > 1.0:
+                cs = cs / 100.0 if cs <= 100 else 1.0
+            if cs < 0:
+                cs = 0.0
+            analysis_result["confidence_score"] = round(cs, 4)
+        except Exception:
+            analysis_result["confidence_score"] = 0.85
+
+        # Ensure non-empty summary
+        if not analysis_result.get("summary") or not str(analysis_result.get("summary")).strip():
+            cp = analysis_result.get("cognitive_profile", {})
+            strengths = ", ".join((cp.get("primary_strengths") or [])[:2]) or "clear strengths"
+            prefs = ", ".join((cp.get("processing_preferences") or [])[:2]) or "supportive routines"
+            wc = ", ".join((cp.get("optimal_work_conditions") or [])[:1]) or "well-structured, low-distraction settings"
+            analysis_result["summary"] = (
+                f"This professional shows {strengths} and benefits from {prefs}. "
+                f"They thrive in {wc} and perform best with practical accommodations that reduce interruptions."
+            )
+
+        # If work_env_matchmaker, derive from parsed buckets when missing/too sparse
+        if assessment_type == "work_env_matchmaker":
+            wem = {}
             try:
-                cs = float(analysis_result.get("confidence_score", 0.85))
-                # clamp to [0,1] if it's a percentage or out of bounds
-                if cs > 1.0:
-                    cs = cs / 100.0 if cs <= 100 else 1.0
-                if cs < 0:
-                    cs = 0.0
-                analysis_result["confidence_score"] = round(cs, 4)
+                raw = responses.get("wem_needs") if isinstance(responses, dict) else None
+                parsed = json.loads(raw) if isinstance(raw, str) else (raw or {})
+                wem = {
+                    "must": [k for k, v in parsed.items() if v == "Must"],
+                    "nice": [k for k, v in parsed.items() if v == "Nice-to-have"],
+                    "avoid": [k for k, v in parsed.items() if v == "Avoid"],
+                }
             except Exception:
-                analysis_result["confidence_score"] = 0.85
-            
-            # Ensure non-empty summary
-            if not analysis_result.get("summary") or not str(analysis_result.get("summary")).strip():
-                cp = analysis_result.get("cognitive_profile", {})
-                strengths = ", ".join((cp.get("primary_strengths") or [])[:2]) or "clear strengths"
-                prefs = ", ".join((cp.get("processing_preferences") or [])[:2]) or "supportive routines"
-                wc = ", ".join((cp.get("optimal_work_conditions") or [])[:1]) or "well-structured, low-distraction settings"
-                analysis_result["summary"] = (
-                    f"This professional shows {strengths} and benefits from {prefs}. "
-                    f"They thrive in {wc} and perform best with practical accommodations that reduce interruptions."
-                )
-            
-            # If work_env_matchmaker, derive from parsed buckets when missing/too sparse
-            if assessment_type == "work_env_matchmaker":
                 wem = {}
-                try:
-                    raw = responses.get("wem_needs") if isinstance(responses, dict) else None
-                    parsed = json.loads(raw) if isinstance(raw, str) else (raw or {})
-                    wem = {
-                        "must": [k for k, v in parsed.items() if v == "Must"],
-                        "nice": [k for k, v in parsed.items() if v == "Nice-to-have"],
-                        "avoid": [k for k, v in parsed.items() if v == "Avoid"],
-                    }
-                except Exception:
-                    wem = {}
-                # Backfill accommodations (ensure >=3)
-                if len(recs["workplace_accommodations"]) < 3 and wem:
-                    adds = []
-                    all_items = (wem.get("must", []) or []) + (wem.get("nice", []) or [])
-                    lowered = " ".join(all_items).lower()
-                    if "noise" in lowered or "quiet" in lowered:
-                        adds.append("Provide noise-cancelling headphones and quiet zones")
-                    if "async" in lowered or "written" in lowered:
-                        adds.append("Prefer async communication with written updates")
-                    if any("flexible hours" in s.lower() or "flexible" in s.lower() for s in all_items):
-                        adds.append("Offer flexible scheduling aligned with energy peaks")
-                    if wem.get("avoid"):
-                        adds.append("Minimize mandatory pair programming; offer solo focus blocks")
-                    for a in adds:
-                        if a not in recs["workplace_accommodations"]:
-                            recs["workplace_accommodations"].append(a)
-                    # Pad generically if still short
-                    while len(recs["workplace_accommodations"]) < 3:
-                        for cand in [
-                            "Provide clear written agendas and task breakdowns",
-                            "Offer predictable routines with protected focus time",
-                            "Reduce frequent context switching via batch planning",
-                        ]:
-                            if cand not in recs["workplace_accommodations"]:
-                                recs["workplace_accommodations"].append(cand)
-                                break
-                    recs["workplace_accommodations"] = recs["workplace_accommodations"][:5]
-                # Backfill career suggestions
-                if len(recs["career_suggestions"]) < 3 and wem:
-                    suggestions = []
-                    all_items = (wem.get("must", []) or []) + (wem.get("nice", []) or [])
-                    avoid_items = (wem.get("avoid", []) or [])
-                    if any("context switching" in s.lower() for s in avoid_items):
-                        suggestions.append("Data analyst — deep focus, low context switching")
-                        suggestions.append("Technical writer — favors structured, async communication")
-                    if any("pair programming" in s.lower() for s in avoid_items):
-                        suggestions.append("Individual-contributor software engineer — supports autonomy and focus")
-                    if any("flexible" in s.lower() for s in all_items):
-                        suggestions.append("Research engineer — flexible hours for deep work")
-                    # add rationales inline if missing
-                    cleaned = []
-                    for s in suggestions:
-                        if "—" not in s:
-                            cleaned.append(f"{s} — aligns with stated work preferences")
-                        else:
-                            cleaned.append(s)
-                    for s in cleaned:
-                        if s not in recs["career_suggestions"]:
-                            recs["career_suggestions"].append(s)
-                    # Pad generically if still short
-                    while len(recs["career_suggestions"]) < 3:
-                        for cand in [
-                            "QA engineer — structured scenarios and repeatable processes",
-                            "Information architect — clarity, organization, and documentation",
-                            "Business intelligence analyst — pattern recognition with low interruptions",
-                        ]:
-                            if cand not in recs["career_suggestions"]:
-                                recs["career_suggestions"].append(cand)
-                                break
-                    recs["career_suggestions"] = recs["career_suggestions"][:6]
-            
-            # Generic backfill to ensure UI sections are populated for all assessment types
-            # Ensure >=3 workplace accommodations
-            try:
-                if len(recs.get("workplace_accommodations", [])) < 3:
-                    generic_acc = [
+            # Backfill accommodations (ensure >=3)
+            if len(recs["workplace_accommodations"]) < 3 and wem:
+                adds = []
+                all_items = (wem.get("must", []) or []) + (wem.get("nice", []) or [])
+                lowered = " ".join(all_items).lower()
+                if "noise" in lowered or "quiet" in lowered:
+                    adds.append("Provide noise-cancelling headphones and quiet zones")
+                if "async" in lowered or "written" in lowered:
+                    adds.append("Prefer async communication with written updates")
+                if any("flexible hours" in s.lower() or "flexible" in s.lower() for s in all_items):
+                    adds.append("Offer flexible scheduling aligned with energy peaks")
+                if wem.get("avoid"):
+                    adds.append("Minimize mandatory pair programming; offer solo focus blocks")
+                for a in adds:
+                    if a not in recs["workplace_accommodations"]:
+                        recs["workplace_accommodations"].append(a)
+                # Pad generically if still short
+                while len(recs["workplace_accommodations"]) < 3:
+                    for cand in [
                         "Provide clear written agendas and task breakdowns",
                         "Offer predictable routines with protected focus time",
                         "Reduce frequent context switching via batch planning",
-                        "Permit noise-cancelling headphones and quiet zones",
-                        "Prefer async communication with written updates",
-                    ]
-                    for cand in generic_acc:
+                    ]:
                         if cand not in recs["workplace_accommodations"]:
                             recs["workplace_accommodations"].append(cand)
-                            if len(recs["workplace_accommodations"]) >= 3:
-                                break
-                    recs["workplace_accommodations"] = recs["workplace_accommodations"][:5]
-            except Exception:
-                pass
-
-            # Ensure >=3 career suggestions with short rationales
-            try:
-                if len(recs.get("career_suggestions", [])) < 3:
-                    generic_roles = [
-                        "Technical writer — values clarity and structured, low-distraction work",
-                        "QA engineer — repeatable processes and methodical attention",
-                        "Business intelligence analyst — pattern recognition with limited interruptions",
-                        "Information architect — organization and documentation strengths",
-                    ]
-                    for cand in generic_roles:
+                            break
+                recs["workplace_accommodations"] = recs["workplace_accommodations"][:5]
+            # Backfill career suggestions
+            if len(recs["career_suggestions"]) < 3 and wem:
+                suggestions = []
+                all_items = (wem.get("must", []) or []) + (wem.get("nice", []) or [])
+                avoid_items = (wem.get("avoid", []) or [])
+                if any("context switching" in s.lower() for s in avoid_items):
+                    suggestions.append("Data analyst — deep focus, low context switching")
+                    suggestions.append("Technical writer — favors structured, async communication")
+                if any("pair programming" in s.lower() for s in avoid_items):
+                    suggestions.append("Individual-contributor software engineer — supports autonomy and focus")
+                if any("flexible" in s.lower() for s in all_items):
+                    suggestions.append("Research engineer — flexible hours for deep work")
+                # add rationales inline if missing
+                cleaned = []
+                for s in suggestions:
+                    if "—" not in s:
+                        cleaned.append(f"{s} — aligns with stated work preferences")
+                    else:
+                        cleaned.append(s)
+                for s in cleaned:
+                    if s not in recs["career_suggestions"]:
+                        recs["career_suggestions"].append(s)
+                # Pad generically if still short
+                while len(recs["career_suggestions"]) < 3:
+                    for cand in [
+                        "QA engineer — structured scenarios and repeatable processes",
+                        "Information architect — clarity, organization, and documentation",
+                        "Business intelligence analyst — pattern recognition with low interruptions",
+                    ]:
                         if cand not in recs["career_suggestions"]:
                             recs["career_suggestions"].append(cand)
-                            if len(recs["career_suggestions"]) >= 3:
-                                break
-                    recs["career_suggestions"] = recs["career_suggestions"][:6]
-            except Exception:
-                pass
+                            break
+                recs["career_suggestions"] = recs["career_suggestions"][:6]
 
-            # Add metadata
-            analysis_result["analysis_timestamp"] = datetime.utcnow().isoformat()
-            analysis_result["model_used"] = self.model
-            analysis_result["assessment_type"] = assessment_type
-            
-            return analysis_result
-            
-        except Exception as e:
-            print(f"AIML analysis error: {str(e)}")
-            return self._fallback_analysis(responses, assessment_type)
+        # Generic backfill to ensure UI sections are populated for all assessment types
+        # Ensure >=3 workplace accommodations
+        try:
+            if len(recs.get("workplace_accommodations", [])) < 3:
+                generic_acc = [
+                    "Provide clear written agendas and task breakdowns",
+                    "Offer predictable routines with protected focus time",
+                    "Reduce frequent context switching via batch planning",
+                    "Permit noise-cancelling headphones and quiet zones",
+                    "Prefer async communication with written updates",
+                ]
+                for cand in generic_acc:
+                    if cand not in recs["workplace_accommodations"]:
+                        recs["workplace_accommodations"].append(cand)
+                        if len(recs["workplace_accommodations"]) >= 3:
+                            break
+                recs["workplace_accommodations"] = recs["workplace_accommodations"][:5]
+        except Exception:
+            pass
+
+        # Ensure >=3 career suggestions with short rationales
+        try:
+            if len(recs.get("career_suggestions", [])) < 3:
+                generic_roles = [
+                    "Technical writer — values clarity and structured, low-distraction work",
+                    "QA engineer — repeatable processes and methodical attention",
+                    "Business intelligence analyst — pattern recognition with limited interruptions",
+                    "Information architect — organization and documentation strengths",
+                ]
+                for cand in generic_roles:
+                    if cand not in recs["career_suggestions"]:
+                        recs["career_suggestions"].append(cand)
+                        if len(recs["career_suggestions"]) >= 3:
+                            break
+                recs["career_suggestions"] = recs["career_suggestions"][:6]
+        except Exception:
+            pass
+
+        # Add metadata
+        analysis_result["analysis_timestamp"] = datetime.utcnow().isoformat()
+        analysis_result["model_used"] = self.model
+        analysis_result["assessment_type"] = assessment_type
+
+        return analysis_result
     
     def _create_analysis_prompt(
         self, 
@@ -336,7 +450,7 @@ class AssessmentAnalyzer:
             "assessment_type": assessment_type
         }
 
-    def grade_open_ended(
+    async def grade_open_ended(
         self,
         video_url: Optional[str],
         qa: Dict[str, str],
@@ -382,9 +496,8 @@ class AssessmentAnalyzer:
         """
 
         try:
-            response = client.chat.completions.create(
-                model=self.model,
-                messages=[
+            result = await self._json_completion(
+                [
                     {"role": "system", "content": "You are a fair and concise rubric-based grader."},
                     {"role": "user", "content": prompt},
                 ],
@@ -392,8 +505,6 @@ class AssessmentAnalyzer:
                 response_format={"type": "json_object"},
                 max_tokens=800,
             )
-            content = response.choices[0].message.content
-            result = json.loads(content)
 
             # sanitize numbers and ensure bounds
             def clamp(x):
@@ -463,22 +574,17 @@ class AssessmentAnalyzer:
                 overall = {"clarity": 0, "detail": 0, "relevance": 0, "rationale": "No answers."}
             return {"per_question": perq, "overall": overall, "model_used": "heuristic"}
 
-    async def generate_job_matching_insights(
-        self, 
-        assessment_results: Dict[str, Any], 
+    # Completion params for job-match insights
+    JOB_INSIGHTS_PARAMS = {
+        "response_format": {"type": "json_object"},
+        "temperature": 0.6,
+    }
+
+    def _job_insights_messages(
+        self,
+        assessment_results: Dict[str, Any],
         job_description: str
-    ) -> Dict[str, Any]:
-        """
-        Generate job matching insights based on assessment results and job description
-        
-        Args:
-            assessment_results: Results from cognitive assessment analysis
-            job_description: Job posting description to match against
-            
-        Returns:
-            Matching insights and recommendations
-        """
-        
+    ) -> List[Dict[str, str]]:
         matching_prompt = f"""
         Based on the following cognitive assessment results, analyze how well this individual 
         would fit the given job description and provide matching insights.
@@ -501,36 +607,104 @@ class AssessmentAnalyzer:
         }}
         """
         
+        return [
+            {
+                "role": "system",
+                "content": "You are an expert job matching consultant specializing in neurodivergent professionals. Provide insightful job fit analysis."
+            },
+            {
+                "role": "user",
+                "content": matching_prompt
+            }
+        ]
+
+    async def generate_job_matching_insights(
+        self, 
+        assessment_results: Dict[str, Any], 
+        job_description: str
+    ) -> Dict[str, Any]:
+        """
+        Generate job matching insights based on assessment results and job description
+        
+        Args:
+            assessment_results: Results from cognitive assessment analysis
+            job_description: Job posting description to match against
+            
+        Returns:
+            Matching insights and recommendations
+        """
+        
         try:
-            response = await client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are an expert job matching consultant specializing in neurodivergent professionals. Provide insightful job fit analysis."
-                    },
-                    {
-                        "role": "user",
-                        "content": matching_prompt
-                    }
-                ],
-                response_format={"type": "json_object"},
-                temperature=0.6
+            insights = await self._json_completion(
+                self._job_insights_messages(assessment_results, job_description),
+                **self.JOB_INSIGHTS_PARAMS,
             )
-            
-            return json.loads(response.choices[0].message.content)
+            return self._finalize_job_insights(insights)
             
         except Exception as e:
             print(f"Job matching analysis error: {str(e)}")
-            return {
-                "match_score": 0.5,
-                "alignment_strengths": ["Analysis pending"],
-                "potential_challenges": ["Assessment in progress"],
-                "recommended_accommodations": ["Custom recommendations being generated"],
-                "interview_talking_points": ["Personalized talking points being prepared"],
-                "questions_to_ask_employer": ["Relevant questions being curated"],
-                "overall_recommendation": "Detailed job matching analysis will be available shortly."
-            }
+            return self._fallback_job_insights()
+
+    async def stream_job_matching_insights(
+        self,
+        assessment_results: Dict[str, Any],
+        job_description: str
+    ) -> AsyncIterator[Tuple[str, Any]]:
+        """
+        Streaming variant of `generate_job_matching_insights`; yields the same
+        delta/section/result events as `stream_assessment_analysis`.
+        """
+        messages = self._job_insights_messages(assessment_results, job_description)
+        async for event in self._stream_json(messages, self.JOB_INSIGHTS_PARAMS):
+            if event[0] == "raw":
+                try:
+                    yield "result", self._finalize_job_insights(event[1])
+                except Exception as e:
+                    print(f"Job matching analysis error: {str(e)}")
+                    yield "result", self._fallback_job_insights()
+            elif event[0] == "error":
+                yield "result", self._fallback_job_insights()
+            else:
+                yield event
+
+    def _finalize_job_insights(self, insights: Dict[str, Any]) -> Dict[str, Any]:
+        """Check the insights shape: list sections present, match_score clamped to [0, 1]"""
+        if not isinstance(insights, dict):
+            raise ValueError("job matching insights must be a JSON object")
+        fallback = self._fallback_job_insights()
+        for key in (
+            "alignment_strengths",
+            "potential_challenges",
+            "recommended_accommodations",
+            "interview_talking_points",
+            "questions_to_ask_employer",
+        ):
+            value = insights.get(key)
+            if isinstance(value, str):
+                value = [value]
+            insights[key] = [str(v) for v in value] if isinstance(value, list) else []
+        try:
+            score = float(insights.get("match_score", fallback["match_score"]))
+            if score > 1.0:
+                score = score / 100.0 if score <= 100 else 1.0
+            insights["match_score"] = round(max(0.0, score), 4)
+        except (TypeError, ValueError):
+            insights["match_score"] = fallback["match_score"]
+        if not str(insights.get("overall_recommendation") or "").strip():
+            insights["overall_recommendation"] = fallback["overall_recommendation"]
+        return insights
+
+    def _fallback_job_insights(self) -> Dict[str, Any]:
+        """Placeholder insights if AIML API is unavailable"""
+        return {
+            "match_score": 0.5,
+            "alignment_strengths": ["Analysis pending"],
+            "potential_challenges": ["Assessment in progress"],
+            "recommended_accommodations": ["Custom recommendations being generated"],
+            "interview_talking_points": ["Personalized talking points being prepared"],
+            "questions_to_ask_employer": ["Relevant questions being curated"],
+            "overall_recommendation": "Detailed job matching analysis will be available shortly."
+        }
 
 # Global analyzer instance
 assessment_analyzer = AssessmentAnalyzer()
\ No newline at end of file
@@ -6,14 +6,16 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from typing import List
 
-from server.database import get_db
+from server.database import get_db, query_metrics
 from server.models import User, JobPosting, JobMatch
 from server.schemas import UserResponse, JobPostingResponse, JobMatchResponse
-from server.auth import get_current_user
+from server.auth import get_current_user_sync
+from server.llm_cache import llm_cache
+from server import llm_gateway
 
 router = APIRouter()
 
-def require_admin(current_user: User = Depends(get_current_user)):
+def require_admin(current_user: User = Depends(get_current_user_sync)):
     """Require admin or manager role"""
     if current_user.user_role.value not in ["Admin", "Manager"]:
         raise HTTPException(
@@ -69,4 +71,19 @@ async def get_system_stats(
         "total_jobs": total_jobs,
         "active_jobs": active_jobs,
         "total_matches": total_matches
-    }
\ No newline at end of file
+    }
+
+@router.get("/llm-cache")
+async def get_llm_cache_stats(admin_user: User = Depends(require_admin)):
+    """LLM response cache hit/miss counters (admin only)"""
+    return llm_cache.stats()
+
+@router.get("/llm-gateway")
+async def get_llm_gateway_stats(admin_user: User = Depends(require_admin)):
+    """LLM gateway counters (admin only)"""
+    return llm_gateway.stats()
+
+@router.get("/db-queries")
+async def get_db_query_stats(admin_user: User = Depends(require_admin)):
+    """Per-route SQL statement counts and DB time (admin only)"""
+    return query_metrics.stats()
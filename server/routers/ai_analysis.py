@@ -11,8 +11,11 @@ import json
 
 from server.database import get_db
 from server.models import User, AssessmentResponse
-from server.auth import get_current_user
+from server.auth import get_current_user, get_current_user_sync
 from server.openai_integration import assessment_analyzer
+from server.llm_scheduler import BACKGROUND, priority
+from server.task_queue import task_queue, task_handler, accepted
+from server.sse import sse_event, sse_response
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -42,7 +45,7 @@ async def demo_analyze_assessment(
         })
         
         # Get AI analysis using 
-        ai_analysis = assessment_analyzer.analyze_assessment_responses(
+        ai_analysis = await assessment_analyzer.analyze_assessment_responses(
             responses=response_data,
             assessment_type=assessment_id,
             user_context=user_context
@@ -127,7 +130,7 @@ async def grade_open_ended_endpoint(request_data: Dict[str, Any]):
         if not isinstance(answers, dict) or not answers:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="answers must be a non-empty object")
         user_context = request_data.get("user_context") or {"demo_mode": True}
-        result = assessment_analyzer.grade_open_ended(video_url=video_url, qa=answers, user_context=user_context)
+        result = await assessment_analyzer.grade_open_ended(video_url=video_url, qa=answers, user_context=user_context)
         return {"success": True, "grading": result}
     except HTTPException:
         raise
@@ -135,61 +138,92 @@ async def grade_open_ended_endpoint(request_data: Dict[str, Any]):
         logger.error(f"grade_open_ended error: {str(e)}")
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="grading_failed")
 
-@router.post("/analyze-assessment/{assessment_id}")
+def _collect_responses(db: Session, current_user: User, assessment_id: str, request_data: Dict[str, Any]):
+    """Responses to analyze (request body in demo mode, else saved answers) and the user context"""
+    # Get responses from request body (for demo) or database
+    if "responses" in request_data:
+        # Demo mode - use provided responses
+        response_data = request_data["responses"]
+    else:
+        # Production mode - get from database
+        responses = db.query(AssessmentResponse).filter(
+            AssessmentResponse.user_id == current_user.id,
+            AssessmentResponse.assessment_id == assessment_id
+        ).all()
+        
+        if not responses:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="No assessment responses found"
+            )
+        
+        # Convert responses to format for AI analysis
+        response_data = {}
+        for response in responses:
+            response_data[response.question_id] = response.selected_answer
+    
+    # User context for personalization
+    user_context = {
+        "user_id": current_user.id,
+        "user_role": current_user.user_role,
+        "assessment_id": assessment_id,
+        "response_count": len(response_data)
+    }
+    return response_data, user_context
+
+async def _stream_events(events):
+    """Turn analyzer (name, data) events into SSE frames; the final `result` frame carries the validated JSON"""
+    async for name, data in events:
+        if name == "delta":
+            yield sse_event("delta", {"text": data})
+        else:
+            yield sse_event(name, data)
+    yield sse_event("done", {})
+
+@task_handler("analyze_assessment")
+async def run_assessment_analysis(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Task queue handler for POST /analyze-assessment/{assessment_id}"""
+    assessment_id = payload["assessment_id"]
+    
+    # Get AI analysis using GPT-5
+    ai_analysis = await assessment_analyzer.analyze_assessment_responses(
+        responses=payload["responses"],
+        assessment_type=assessment_id,
+        user_context=payload["user_context"]
+    )
+    
+    return {
+        "success": True,
+        "assessment_id": assessment_id,
+        "analysis": ai_analysis,
+        "message": "Assessment analysis completed successfully"
+    }
+
+@router.post("/analyze-assessment/{assessment_id}", status_code=status.HTTP_202_ACCEPTED)
 async def analyze_assessment_with_ai(
     assessment_id: str,
     request_data: Dict[str, Any],
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(get_current_user_sync),
     db: Session = Depends(get_db)
 ):
     """
-    Analyze assessment responses using GPT-5 for personalized insights
+    Queue GPT-5 analysis of assessment responses for personalized insights
+    
+    Returns 202 with a task id; the analysis is in the task result.
     """
     try:
-        # Get responses from request body (for demo) or database
-        if "responses" in request_data:
-            # Demo mode - use provided responses
-            response_data = request_data["responses"]
-        else:
-            # Production mode - get from database
-            responses = db.query(AssessmentResponse).filter(
-                AssessmentResponse.user_id == current_user.id,
-                AssessmentResponse.assessment_id == assessment_id
-            ).all()
-            
-            if not responses:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail="No assessment responses found"
-                )
-            
-            # Convert responses to format for AI analysis
-            response_data = {}
-            for response in responses:
-                response_data[response.question_id] = response.selected_answer
-        
-        # User context for personalization
-        user_context = {
-            "user_id": current_user.id,
-            "user_role": current_user.user_role,
-            "assessment_id": assessment_id,
-            "response_count": len(response_data)
-        }
+        response_data, user_context = _collect_responses(db, current_user, assessment_id, request_data)
         
-        # Get AI analysis using GPT-5
-        ai_analysis = assessment_analyzer.analyze_assessment_responses(
-            responses=response_data,
-            assessment_type=assessment_id,
-            user_context=user_context
+        task = task_queue.enqueue(
+            db,
+            "analyze_assessment",
+            {"assessment_id": assessment_id, "responses": response_data, "user_context": user_context},
+            user_id=current_user.id
         )
+        return accepted(task)
         
-        return {
-            "success": True,
-            "assessment_id": assessment_id,
-            "analysis": ai_analysis,
-            "message": "Assessment analysis completed successfully"
-        }
-        
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"AI analysis error: {str(e)}")
         raise HTTPException(
@@ -197,10 +231,30 @@ async def analyze_assessment_with_ai(
             detail=f"Analysis failed: {str(e)}"
         )
 
+@router.post("/analyze-assessment/{assessment_id}/stream")
+async def stream_assessment_analysis(
+    assessment_id: str,
+    request_data: Dict[str, Any],
+    current_user: User = Depends(get_current_user_sync),
+    db: Session = Depends(get_db)
+):
+    """
+    Streaming analysis (Server-Sent Events): `delta` events with model tokens,
+    `section` events as each top-level section completes, then one `result`
+    event with the validated analysis and a closing `done` event
+    """
+    response_data, user_context = _collect_responses(db, current_user, assessment_id, request_data)
+    events = assessment_analyzer.stream_assessment_analysis(
+        responses=response_data,
+        assessment_type=assessment_id,
+        user_context=user_context
+    )
+    return sse_response(_stream_events(events))
+
 @router.post("/job-match-analysis")
 async def analyze_job_match(
     request_data: Dict[str, Any],
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(get_current_user_sync),
     db: Session = Depends(get_db)
 ):
     """
@@ -235,10 +289,34 @@ async def analyze_job_match(
             detail=f"Job matching analysis failed: {str(e)}"
         )
 
+@router.post("/job-match-analysis/stream")
+async def stream_job_match_analysis(
+    request_data: Dict[str, Any],
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Streaming job compatibility analysis (Server-Sent Events), same events as
+    /analyze-assessment/{assessment_id}/stream
+    """
+    assessment_results = request_data.get("assessment_results")
+    job_description = request_data.get("job_description")
+    
+    if not assessment_results or not job_description:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Both assessment_results and job_description are required"
+        )
+    
+    events = assessment_analyzer.stream_job_matching_insights(
+        assessment_results=assessment_results,
+        job_description=job_description
+    )
+    return sse_response(_stream_events(events))
+
 @router.get("/cognitive-profile/{user_id}")
 async def get_ai_cognitive_profile(
     user_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(get_current_user_sync),
     db: Session = Depends(get_db)
 ):
     """
@@ -273,14 +351,16 @@ async def get_ai_cognitive_profile(
             responses_by_assessment[assessment_id][response.question_id] = response.selected_answer
         
         # Generate comprehensive cognitive profile
+        # Re-analysis of saved assessments runs as background LLM work
         comprehensive_analysis = {}
-        for assessment_id, responses in responses_by_assessment.items():
-            analysis = assessment_analyzer.analyze_assessment_responses(
-                responses=responses,
-                assessment_type=assessment_id,
-                user_context={"user_id": user_id}
-            )
-            comprehensive_analysis[assessment_id] = analysis
+        with priority(BACKGROUND):
+            for assessment_id, responses in responses_by_assessment.items():
+                analysis = await assessment_analyzer.analyze_assessment_responses(
+                    responses=responses,
+                    assessment_type=assessment_id,
+                    user_context={"user_id": user_id}
+                )
+                comprehensive_analysis[assessment_id] = analysis
         
         return {
             "success": True,
@@ -2,12 +2,15 @@
 Assessment and Self-Discovery API endpoints
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import List, Dict, Any
+import asyncio
 import logging
 
-from server.database import get_db
+from server.database import get_async_db, SessionLocal
 from server.models import User, Assessment, AssessmentResponse, CognitiveProfile
 from server.schemas import (
     AssessmentCreate, 
@@ -18,6 +21,13 @@ from server.schemas import (
 )
 from server.auth import get_current_user
 from server.ai_agent import agent
+from server.match_materializer import materializer
+from server.task_queue import task_queue, task_handler, accepted
+from server.cdc_scoring import TEMPLATE_QUESTIONS, apply_quiz, local_profile, merge_enrichment
+from server.matching import CDC_FIELDS
+from server.config import PROFILE_LLM_ENRICHMENT
+from server.assessment_templates import TEMPLATE_REGISTRY, get_template
+from server.metrics import CACHE_HITS, CACHE_MISSES
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -26,7 +36,7 @@ logger = logging.getLogger(__name__)
 async def create_assessment(
     assessment_data: AssessmentCreate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Create a new assessment (admin only)"""
     if current_user.user_role not in ["ADMIN", "MANAGER"]:
@@ -41,15 +51,15 @@ async def create_assessment(
     )
     
     db.add(new_assessment)
-    db.commit()
-    db.refresh(new_assessment)
+    await db.commit()
+    await db.refresh(new_assessment)
     
     return {"assessment_id": new_assessment.assessment_id, "message": "Assessment created successfully"}
 
 @router.get("/assessments", response_model=List[dict])
 async def get_available_assessments(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get all available assessments (ND Adults only)"""
     if current_user.user_role != "ND_ADULT":
@@ -58,7 +68,7 @@ async def get_available_assessments(
             detail="Self-discovery assessments are only available for ND professionals"
         )
     
-    assessments = db.query(Assessment).filter(Assessment.is_active.is_(True)).all()
+    assessments = (await db.execute(select(Assessment).where(Assessment.is_active.is_(True)))).scalars().all()
     
     return [
         {
@@ -75,7 +85,7 @@ async def get_available_assessments(
 @router.get("/assessments/my-responses", response_model=List[dict])
 async def get_my_assessment_responses(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Return the latest response per assessment for the current ND Adult user"""
     if current_user.user_role != "ND_ADULT":
@@ -84,24 +94,15 @@ async def get_my_assessment_responses(
             detail="Self-discovery assessments are only available for ND professionals"
         )
 
-    # For each assessment_id the user has responded to, return the latest response
-    subq = (
-        db.query(
-            AssessmentResponse.assessment_id,
-        )
-        .filter(AssessmentResponse.user_id == current_user.id)
-        .distinct(AssessmentResponse.assessment_id)
-        .subquery()
-    )
-
     # Fetch latest by completed_at (if available) or response_id DESC as fallback
     latest_map: Dict[str, Dict[str, Any]] = {}
     responses = (
-        db.query(AssessmentResponse)
-        .filter(AssessmentResponse.user_id == current_user.id)
-        .order_by(AssessmentResponse.completed_at.desc().nullslast(), AssessmentResponse.response_id.desc())
-        .all()
-    )
+        await db.execute(
+            select(AssessmentResponse)
+            .where(AssessmentResponse.user_id == current_user.id)
+            .order_by(AssessmentResponse.completed_at.desc().nullslast(), AssessmentResponse.response_id.desc())
+        )
+    ).scalars().all()
     for r in responses:
         aid = str(r.assessment_id)
         if aid not in latest_map:
@@ -119,7 +120,7 @@ async def submit_assessment_response(
     assessment_id: str,
     response_data: AssessmentResponseCreate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Submit responses to an assessment (ND Adults only)"""
     print(f"Submitting assessment response for user {current_user.user_role} to assessment {assessment_id}")
@@ -130,14 +131,14 @@ async def submit_assessment_response(
         )
     
     # Verify assessment exists
-    assessment = db.query(Assessment).filter(Assessment.assessment_id == assessment_id).first()
+    assessment = (
+        await db.execute(select(Assessment).where(Assessment.assessment_id == assessment_id))
+    ).scalars().first()
     if not assessment:
         # Attempt to auto-create from templates for known assessments
         try:
-            from server.assessment_templates import get_comprehensive_assessments
-            templates = {item["quiz_id"]: item for item in get_comprehensive_assessments()}
-            if assessment_id in templates:
-                t = templates[assessment_id]
+            t = get_template(assessment_id)
+            if t is not None:
                 assessment = Assessment(
                     assessment_id=assessment_id,
                     user_id=current_user.id,
@@ -148,8 +149,7 @@ async def submit_assessment_response(
                     is_active=True,
                 )
                 db.add(assessment)
-                db.commit()
-                db.refresh(assessment)
+                await db.commit()
             else:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
@@ -165,22 +165,25 @@ async def submit_assessment_response(
     data = response_data.model_dump(exclude={"assessment_id"})
 
     existing_latest = (
-        db.query(AssessmentResponse)
-        .filter(
-            AssessmentResponse.assessment_id == assessment_id,
-            AssessmentResponse.user_id == current_user.id,
+        await db.execute(
+            select(AssessmentResponse)
+            .where(
+                AssessmentResponse.assessment_id == assessment_id,
+                AssessmentResponse.user_id == current_user.id,
+            )
+            .order_by(AssessmentResponse.completed_at.desc().nullslast(), AssessmentResponse.response_id.desc())
+            .limit(1)
         )
-        .order_by(AssessmentResponse.completed_at.desc().nullslast(), AssessmentResponse.response_id.desc())
-        .first()
-    )
+    ).scalars().first()
 
     if existing_latest:
         # Update existing latest response
         for k, v in data.items():
             setattr(existing_latest, k, v)
         db.add(existing_latest)
-        db.commit()
-        db.refresh(existing_latest)
+        await db.run_sync(update_profile_for_submission, current_user.id, assessment_id, data.get("responses"))
+        await db.commit()
+        materializer.mark_user_dirty(current_user.id)
         return {"message": "Assessment response updated successfully", "response_id": existing_latest.response_id}
 
     # Otherwise create new response record
@@ -191,18 +194,139 @@ async def submit_assessment_response(
     )
     
     db.add(new_response)
-    db.commit()
-    db.refresh(new_response)
+    await db.run_sync(update_profile_for_submission, current_user.id, assessment_id, data.get("responses"))
+    await db.commit()
+    materializer.mark_user_dirty(current_user.id)
     
     return {"message": "Assessment response submitted successfully", "response_id": new_response.response_id}
 
-@router.post("/analyze-profile", response_model=SelfDiscoveryAgentResponse)
+def update_profile_for_submission(db: Session, user_id: str, quiz_id: str, answers: Dict[str, Any]) -> None:
+    """Fold one template submission into the user's cognitive profile (no commit)
+    
+    Sync helper; from an async route use `await db.run_sync(...)`.
+
+    Only the CDCs the quiz targets are recomputed, weighted by per-CDC evidence
+    kept in evidence_sources. Never fails the submission.
+    """
+    if quiz_id not in TEMPLATE_QUESTIONS or not isinstance(answers, dict):
+        return
+    try:
+        profile = db.query(CognitiveProfile).filter(CognitiveProfile.user_id == user_id).first()
+        current = {"strengths": {}, "sensitivities": {}, "preferences": {}, "evidence": {}}
+        if profile:
+            current = {
+                "strengths": {cdc: getattr(profile, cdc) for cdc in CDC_FIELDS},
+                "sensitivities": profile.sensitivities or {},
+                "preferences": profile.preferences or {},
+                "evidence": profile.evidence_sources or {},
+            }
+        updated = apply_quiz(current, quiz_id, answers)
+        if not profile:
+            if not updated["updated"]:
+                return
+            profile = CognitiveProfile(user_id=user_id, embedding_vector=f"vector://ndsp/{user_id}")
+            db.add(profile)
+        for cdc in updated["updated"]:
+            setattr(profile, cdc, updated["strengths"][cdc])
+        profile.sensitivities = updated["sensitivities"]
+        profile.preferences = updated["preferences"]
+        profile.evidence_sources = updated["evidence"]
+        profile.confidence_score = updated["confidence_score"]
+        profile.last_updated = func.now()
+    except Exception as e:
+        logger.error(f"Incremental profile update failed for {user_id} / {quiz_id}: {str(e)}")
+
+def save_cognitive_profile(db: Session, user_id: str, profile_result: Dict[str, Any]) -> None:
+    """Save or update the user's cognitive profile from an agent result. Commits."""
+    existing_profile = db.query(CognitiveProfile).filter(
+        CognitiveProfile.user_id == user_id
+    ).first()
+    
+    if existing_profile:
+        # Update existing profile; None means no evidence this time (e.g. a
+        # local score with the LLM down), so keep the stored value
+        for key, value in profile_result["strengths"].items():
+            if value is not None and hasattr(existing_profile, key):
+                setattr(existing_profile, key, value)
+        
+        existing_profile.sensitivities = profile_result["sensitivities"]
+        existing_profile.preferences = profile_result["preferences"]
+        existing_profile.embedding_vector = profile_result["embedding"]
+        existing_profile.evidence_sources = profile_result["evidence"]
+        existing_profile.confidence_score = profile_result["confidence_score"]
+    else:
+        # Create new profile
+        new_profile = CognitiveProfile(
+            user_id=user_id,
+            sensitivities=profile_result["sensitivities"],
+            preferences=profile_result["preferences"],
+            embedding_vector=profile_result["embedding"],
+            evidence_sources=profile_result["evidence"],
+            confidence_score=profile_result["confidence_score"],
+            **profile_result["strengths"]
+        )
+        db.add(new_profile)
+    
+    db.commit()
+    materializer.mark_user_dirty(user_id)
+
+def template_responses(db: Session, user_id: str, quiz_results: Dict[str, Any] = None) -> Dict[str, Dict[str, Any]]:
+    """Latest saved answers per built-in template, overlaid with template answers in quiz_results"""
+    rows = (
+        db.query(AssessmentResponse.assessment_id, AssessmentResponse.responses)
+        .filter(
+            AssessmentResponse.user_id == user_id,
+            AssessmentResponse.assessment_id.in_(list(TEMPLATE_QUESTIONS)),
+        )
+        .order_by(AssessmentResponse.completed_at.asc().nullsfirst())
+        .all()
+    )
+    by_quiz = {assessment_id: answers or {} for assessment_id, answers in rows}
+    for quiz_id, answers in (quiz_results or {}).items():
+        if quiz_id in TEMPLATE_QUESTIONS and isinstance(answers, dict):
+            by_quiz[quiz_id] = answers
+    return by_quiz
+
+def save_enriched_profile(user_id: str, quiz_results: Dict[str, Any], enriched: Dict[str, Any]) -> Dict[str, Any]:
+    """Re-score locally, merge the LLM enrichment and save; returns the profile result. Own session, blocking."""
+    db = SessionLocal()
+    try:
+        local = local_profile(user_id, template_responses(db, user_id, quiz_results))
+        profile_result = merge_enrichment(local, enriched)
+        save_cognitive_profile(db, user_id, profile_result)
+        return profile_result
+    finally:
+        db.close()
+
+@task_handler("analyze_profile")
+async def run_profile_analysis(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Task queue handler: LLM enrichment of a locally scored profile"""
+    user_id = payload["user_id"]
+    # Run the AI agent analysis
+    enriched = await agent.analyze_cognitive_profile(
+        user_id=user_id,
+        quiz_results=payload["quiz_results"],
+        behavior_data=payload.get("behavior_data"),
+        past_data=payload.get("past_data")
+    )
+    
+    # DB work in a worker thread, like the rest of the task queue
+    profile_result = await asyncio.to_thread(save_enriched_profile, user_id, payload["quiz_results"], enriched)
+    
+    return SelfDiscoveryAgentResponse(**profile_result).model_dump(mode="json")
+
+@router.post("/analyze-profile")
 async def analyze_cognitive_profile(
     request: SelfDiscoveryAgentRequest,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Run AI analysis to generate cognitive profile (ND Adults only)"""
+    """Score and save the cognitive profile from template responses (ND Adults only)
+    
+    Scoring is local and deterministic (server/cdc_scoring.py). When the LLM is
+    configured an enrichment task is also queued; `enrichment` then holds its
+    task id and the saved profile is updated when it finishes.
+    """
     
     # Verify user is ND Adult or admin
     if current_user.user_role not in ["ND_ADULT", "ADMIN", "MANAGER"]:
@@ -219,59 +343,32 @@ async def analyze_cognitive_profile(
         )
     
     try:
-        # Run the AI agent analysis
-        profile_result = await agent.analyze_cognitive_profile(
-            user_id=request.user_id,
-            quiz_results=request.quiz_results,
-            behavior_data=request.behavior_data,
-            past_data=request.past_data
-        )
-        
-        # Save or update cognitive profile in database
-        existing_profile = db.query(CognitiveProfile).filter(
-            CognitiveProfile.user_id == request.user_id
-        ).first()
-        
-        if existing_profile:
-            # Update existing profile
-            for key, value in profile_result["strengths"].items():
-                if hasattr(existing_profile, key):
-                    setattr(existing_profile, key, value)
-            
-            existing_profile.sensitivities = profile_result["sensitivities"]
-            existing_profile.preferences = profile_result["preferences"]
-            existing_profile.embedding_vector = profile_result["embedding"]
-            existing_profile.evidence_sources = profile_result["evidence"]
-            existing_profile.confidence_score = profile_result["confidence_score"]
-        else:
-            # Create new profile
-            new_profile = CognitiveProfile(
-                user_id=request.user_id,
-                sensitivities=profile_result["sensitivities"],
-                preferences=profile_result["preferences"],
-                embedding_vector=profile_result["embedding"],
-                evidence_sources=profile_result["evidence"],
-                confidence_score=profile_result["confidence_score"],
-                **profile_result["strengths"]
-            )
-            db.add(new_profile)
-        
-        db.commit()
-        
-        return SelfDiscoveryAgentResponse(**profile_result)
-        
+        responses = await db.run_sync(template_responses, request.user_id, request.quiz_results)
+        profile_result = local_profile(request.user_id, responses)
+        await db.run_sync(save_cognitive_profile, request.user_id, profile_result)
     except Exception as e:
         logger.error(f"Error analyzing profile: {str(e)}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to analyze cognitive profile: {str(e)}"
         )
+    
+    enrichment = None
+    if PROFILE_LLM_ENRICHMENT and agent.llm_available:
+        task = await db.run_sync(task_queue.enqueue, "analyze_profile", request.model_dump(mode="json"), current_user.id)
+        enrichment = accepted(task)
+    
+    return {
+        **SelfDiscoveryAgentResponse(**profile_result).model_dump(mode="json"),
+        "confidence_score": profile_result["confidence_score"],
+        "enrichment": enrichment,
+    }
 
 @router.get("/profile/{user_id}", response_model=CognitiveProfileResponse)
 async def get_cognitive_profile(
     user_id: str,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get cognitive profile for a user (ND Adults only)"""
     
@@ -289,7 +386,9 @@ async def get_cognitive_profile(
             detail="Can only view your own profile"
         )
     
-    profile = db.query(CognitiveProfile).filter(CognitiveProfile.user_id == user_id).first()
+    profile = (
+        await db.execute(select(CognitiveProfile).where(CognitiveProfile.user_id == user_id))
+    ).scalars().first()
     
     if not profile:
         raise HTTPException(
@@ -318,17 +417,22 @@ async def get_cognitive_profile(
 
 @router.get("/quiz-templates")
 async def get_quiz_templates(
+    request: Request,
     current_user: User = Depends(get_current_user)
 ):
-    """Get comprehensive CDC assessment templates (ND Adults only)"""
+    """Get comprehensive CDC assessment templates (ND Adults only)
+    
+    Served from the pre-serialized registry payload; supports If-None-Match (304).
+    """
     if current_user.user_role != "ND_ADULT":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Self-discovery assessments are only available for ND professionals"
         )
     
-    # Import comprehensive assessment templates
-    from server.assessment_templates import get_comprehensive_assessments
-    comprehensive_assessments = get_comprehensive_assessments()
-    
-    return {"available_quizzes": comprehensive_assessments}
\ No newline at end of file
+    headers = {"ETag": TEMPLATE_REGISTRY.etag, "Cache-Control": "private, no-cache"}
+    if TEMPLATE_REGISTRY.etag_matches(request.headers.get("if-none-match")):
+        CACHE_HITS.labels("quiz_templates_etag").inc()
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    CACHE_MISSES.labels("quiz_templates_etag").inc()
+    return Response(content=TEMPLATE_REGISTRY.payload, media_type="application/json", headers=headers)
\ No newline at end of file
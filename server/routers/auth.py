@@ -3,28 +3,33 @@ Authentication routes
 """
 
 from datetime import timedelta, datetime
+import asyncio
 import uuid
+from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException, status, Request
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from server.database import get_db
+from server.database import get_async_db
 from server.models import User
-from server.schemas import Token, UserLogin, UserCreate, UserResponse
+from server.schemas import Token, UserLogin, UserCreate, UserResponse, RefreshRequest, TokenRefresh
 from server.auth import (
     verify_password, 
     get_password_hash, 
-    create_access_token, 
+    create_user_access_token,
     get_current_user,
-    ACCESS_TOKEN_EXPIRE_MINUTES
+    issue_refresh_token,
+    rotate_refresh_token,
+    revoke_refresh_token,
 )
 
 router = APIRouter()
 
 @router.post("/login", response_model=Token)
-async def login(user_credentials: UserLogin, db: Session = Depends(get_db)):
+async def login(user_credentials: UserLogin, db: AsyncSession = Depends(get_async_db)):
     """Login endpoint"""
-    user = db.query(User).filter(User.email == user_credentials.email).first()
+    user = (await db.execute(select(User).where(User.email == user_credentials.email))).scalars().first()
     
     if not user:
         raise HTTPException(
@@ -32,25 +37,26 @@ async def login(user_credentials: UserLogin, db: Session = Depends(get_db)):
             detail="No account found with this email address. Please check your email or register for a new account.",
         )
     
-    if not verify_password(user_credentials.password, str(user.password)):
+    # bcrypt is deliberately slow: keep it off the event loop
+    if not await asyncio.to_thread(verify_password, user_credentials.password, str(user.password)):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect password. Please check your password and try again.",
         )
     
-    access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = create_access_token(
-        data={"sub": user.email}, expires_delta=access_token_expires
-    )
+    access_token = create_user_access_token(user)
+    refresh_token = await issue_refresh_token(db, user.id)
+    await db.commit()
     
     return {
         "access_token": access_token,
+        "refresh_token": refresh_token,
         "token_type": "bearer",
         "user": UserResponse.model_validate(user)
     }
 
 @router.post("/register", response_model=Token)
-async def register(request: Request, user_data: UserCreate, db: Session = Depends(get_db)):
+async def register(request: Request, user_data: UserCreate, db: AsyncSession = Depends(get_async_db)):
     # Log raw request body to see what FastAPI receives
     body = await request.body()
     print(f"\n=== RAW REQUEST DEBUG ===")
@@ -71,7 +77,7 @@ async def register(request: Request, user_data: UserCreate, db: Session = Depend
     print(f"===================================\n")
     
     # Check if user already exists
-    existing_user = db.query(User).filter(User.email == user_data.email).first()
+    existing_user = (await db.execute(select(User).where(User.email == user_data.email))).scalars().first()
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -86,7 +92,7 @@ async def register(request: Request, user_data: UserCreate, db: Session = Depend
         )
     
     # Create new user
-    hashed_password = get_password_hash(user_data.password)
+    hashed_password = await asyncio.to_thread(get_password_hash, user_data.password)
     db_user = User(
         email=user_data.email,
         first_name=user_data.first_name,
@@ -97,13 +103,13 @@ async def register(request: Request, user_data: UserCreate, db: Session = Depend
     )
     
     db.add(db_user)
-    db.commit()
+    await db.commit()
+    await db.refresh(db_user)
     
     # Return simple success response
-    access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = create_access_token(
-        data={"sub": db_user.email}, expires_delta=access_token_expires
-    )
+    access_token = create_user_access_token(db_user)
+    refresh_token = await issue_refresh_token(db, db_user.id)
+    await db.commit()
     
     # Convert user to response model
     user_response = UserResponse.model_validate(db_user)
@@ -111,6 +117,7 @@ async def register(request: Request, user_data: UserCreate, db: Session = Depend
     # Return response matching Token schema
     return {
         "access_token": access_token,
+        "refresh_token": refresh_token,
         "token_type": "bearer",
         "user": user_response
     }
@@ -120,7 +127,22 @@ async def get_current_user_info(current_user: User = Depends(get_current_user)):
     """Get current user information"""
     return UserResponse.model_validate(current_user)
 
+@router.post("/refresh", response_model=TokenRefresh)
+async def refresh(payload: RefreshRequest, db: AsyncSession = Depends(get_async_db)):
+    """Exchange a refresh token for a new access token and a rotated refresh token (no password check)"""
+    user, refresh_token = await rotate_refresh_token(db, payload.refresh_token)
+    return {
+        "access_token": create_user_access_token(user),
+        "refresh_token": refresh_token,
+        "token_type": "bearer",
+    }
+
 @router.post("/logout")
-async def logout():
-    """Logout endpoint (token invalidation handled client-side)"""
+async def logout(payload: Optional[RefreshRequest] = None, db: AsyncSession = Depends(get_async_db)):
+    """Logout endpoint: revokes the session's refresh tokens when one is sent.
+
+    Access tokens stay valid until they expire; the client discards them.
+    """
+    if payload is not None:
+        await revoke_refresh_token(db, payload.refresh_token)
     return {"message": "Successfully logged out"}
\ No newline at end of file
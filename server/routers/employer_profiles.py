@@ -8,12 +8,12 @@ from sqlalchemy.orm import Session
 from server.database import get_db
 from server.models import User, ProfileEmployer
 from server.schemas import ProfileEmployerResponse, ProfileEmployerCreate, ProfileEmployerUpdate
-from server.auth import get_current_user
+from server.auth import get_current_user_sync
 
 router = APIRouter()
 
 @router.get("/", response_model=ProfileEmployerResponse)
-async def get_employer_profile(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+async def get_employer_profile(current_user: User = Depends(get_current_user_sync), db: Session = Depends(get_db)):
     """Get current user's employer profile"""
     profile = db.query(ProfileEmployer).filter(ProfileEmployer.employer_id == str(current_user.id)).first()
     
@@ -32,7 +32,7 @@ async def get_employer_profile(current_user: User = Depends(get_current_user), d
 @router.post("/", response_model=ProfileEmployerResponse)
 async def create_or_update_employer_profile(
     profile_data: ProfileEmployerUpdate,
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(get_current_user_sync),
     db: Session = Depends(get_db)
 ):
     """Create or update employer profile"""
@@ -9,8 +9,9 @@ from typing import Dict, Any, Optional
 
 from server.database import get_db
 from server.models import User
-from server.auth import get_current_user
+from server.auth import get_current_user, get_current_user_sync
 from server.job_normalization_agent import job_agent
+from server.task_queue import task_queue, task_handler, accepted
 
 router = APIRouter()
 
@@ -25,16 +26,36 @@ class JobNormalizationResponse(BaseModel):
     data: Optional[Dict[str, Any]] = None
     error: Optional[str] = None
 
-@router.post("/normalize", response_model=JobNormalizationResponse)
+@task_handler("normalize_job")
+async def run_job_normalization(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Task queue handler for POST /normalize; result is a JobNormalizationResponse"""
+    normalized_job = await job_agent.normalize_job_description(
+        job_title=payload["job_title"],
+        job_description=payload["job_description"],
+        company_name=payload.get("company_name"),
+        additional_context=payload.get("additional_context")
+    )
+    
+    # Add user context
+    normalized_job["normalized_by"] = payload["normalized_by"]
+    normalized_job["user_id"] = payload["user_id"]
+    
+    return JobNormalizationResponse(
+        success=True,
+        data=normalized_job
+    ).model_dump(mode="json")
+
+@router.post("/normalize", status_code=status.HTTP_202_ACCEPTED)
 async def normalize_job_description(
     request: JobNormalizationRequest,
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(get_current_user_sync),
     db: Session = Depends(get_db)
 ):
     """
-    Normalize a job description using AI analysis
+    Queue normalization of a job description using AI analysis
     
-    This endpoint:
+    Returns 202 with a task id; the task result is a JobNormalizationResponse.
+    The task:
     1. Parses the job description using NLP
     2. Extracts skills, tasks, cognitive demands
     3. Translates to plain, structured language
@@ -63,22 +84,11 @@ async def normalize_job_description(
                 detail="Job description is required"
             )
         
-        # Normalize the job description using AI agent
-        normalized_job = await job_agent.normalize_job_description(
-            job_title=request.job_title,
-            job_description=request.job_description,
-            company_name=request.company_name,
-            additional_context=request.additional_context
-        )
-        
-        # Add user context
-        normalized_job["normalized_by"] = current_user.email
-        normalized_job["user_id"] = str(current_user.id)
-        
-        return JobNormalizationResponse(
-            success=True,
-            data=normalized_job
-        )
+        payload = request.model_dump()
+        payload["normalized_by"] = current_user.email
+        payload["user_id"] = str(current_user.id)
+        task = task_queue.enqueue(db, "normalize_job", payload, user_id=current_user.id)
+        return accepted(task)
         
     except HTTPException:
         raise
@@ -101,7 +111,7 @@ async def get_cdc_categories(
 @router.post("/match-job")
 async def match_job_to_profile(
     normalized_job: Dict[str, Any],
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(get_current_user_sync),
     db: Session = Depends(get_db)
 ):
     """
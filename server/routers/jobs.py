@@ -2,12 +2,14 @@
 Job posting and matching routes
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload, contains_eager, joinedload, load_only
 from typing import List, Dict, Any
 from uuid import UUID
 
-from server.database import get_db
+from server.database import get_db, get_async_db
 from server.models import User, JobPosting, JobMatch, AssessmentResponse, Assessment, CognitiveProfile
 from server.schemas import (
     JobPostingResponse, 
@@ -16,16 +18,45 @@ from server.schemas import (
     JobMatchResponse,
     JobMatchCreate
 )
-from server.auth import get_current_user
-from server.config import JM_THRESHOLD
-from server.matching import compute_match_score
+from server.auth import get_current_user, get_current_user_sync
+from server.config import JM_THRESHOLD, JM_TOP_K
+from server.matching import (
+    build_job_matrix,
+    build_profile_matrix,
+    cascade_match_scores,
+    compute_match_scores,
+    refresh_job_features,
+    top_k_per_job,
+)
+from server.match_materializer import materializer
 
 router = APIRouter()
 
+# Columns a match card (and the LLM cascade prompt) reads from a job posting.
+# Card queries load only these plus the one-to-one features row and the
+# employer's company name in the same statement, so a page of matches costs a
+# fixed number of round trips however many rows it has.
+_CARD_JOB_COLUMNS = (
+    JobPosting.job_id,
+    JobPosting.job_title,
+    JobPosting.employment_type,
+    JobPosting.location,
+    JobPosting.job_description,
+    JobPosting.requirements,
+)
+
+
+def _card_job_options():
+    return (
+        load_only(*_CARD_JOB_COLUMNS),
+        joinedload(JobPosting.employer).load_only(User.company_name),
+        joinedload(JobPosting.features),
+    )
+
 @router.post("", response_model=JobPostingResponse)  # Changed from "/" to ""
 async def create_job_posting(
     job_data: JobPostingCreate,
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(get_current_user_sync),
     db: Session = Depends(get_db)
 ):
     """Create a new job posting (employer only)"""
@@ -41,14 +72,18 @@ async def create_job_posting(
     )
     
     db.add(new_job)
+    db.flush()
+    # Persist parsed matching features so scoring never re-reads the free text
+    refresh_job_features(db, new_job)
     db.commit()
     db.refresh(new_job)
+    materializer.mark_job_dirty(new_job.job_id)
     
     return JobPostingResponse.model_validate(new_job)
 
 @router.get("/employer", response_model=List[JobPostingResponse])
 async def get_employer_jobs(
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(get_current_user_sync),
     db: Session = Depends(get_db)
 ):
     """Get job postings for current employer"""
@@ -78,7 +113,7 @@ async def get_job_by_id(job_id: str, db: Session = Depends(get_db)):
 async def update_job_posting(
     job_id: str,
     job_update: JobPostingUpdate,
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(get_current_user_sync),
     db: Session = Depends(get_db)
 ):
     """Update job posting (employer only)"""
@@ -100,16 +135,18 @@ async def update_job_posting(
     
     for field, value in job_update.model_dump(exclude_unset=True).items():
         setattr(job, field, value)
+    refresh_job_features(db, job)
     
     db.commit()
     db.refresh(job)
+    materializer.mark_job_dirty(job.job_id)
     
     return JobPostingResponse.model_validate(job)
 
 @router.get("/matches/my")
 async def get_my_job_matches(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 )-> List[dict]:
     """Get job matches for current ND Adult"""
     if current_user.user_role != "ND_ADULT":
@@ -119,11 +156,9 @@ async def get_my_job_matches(
         )
     
     # Helper to convert DB objects into the frontend card shape
-    def to_card_shape_from_db_match(m: JobMatch) -> Dict[str, Any]:
+    def to_card_shape_from_db_match(m: JobMatch, score: int) -> Dict[str, Any]:
         job = m.job_posting
         employer = job.employer if job else None
-        # Recompute score using latest profile+job
-        score = compute_match_score(db, str(current_user.id), job) if job else int(m.match_score or 70)
         return {
             "matchId": str(m.match_id),
             "matchScore": int(score),
@@ -141,10 +176,8 @@ async def get_my_job_matches(
             },
         }
 
-    def to_card_shape_preview(job: JobPosting) -> Dict[str, Any]:
+    def to_card_shape_preview(job: JobPosting, score: int) -> Dict[str, Any]:
         employer = job.employer
-        # Compute realistic score for preview mode
-        score = compute_match_score(db, str(current_user.id), job)
         return {
             "matchId": f"preview-{job.job_id}",
             "matchScore": score,
@@ -164,15 +197,16 @@ async def get_my_job_matches(
 
     # Require at least one completed assessment/skills before showing matches
     has_any_assessment = (
-        db.query(AssessmentResponse)
-        .filter(
-            AssessmentResponse.user_id == current_user.id,
-            # consider either explicitly completed or has any responses
-            (AssessmentResponse.completed_at.isnot(None)) | (AssessmentResponse.responses.isnot(None))
+        await db.execute(
+            select(AssessmentResponse.response_id)
+            .where(
+                AssessmentResponse.user_id == current_user.id,
+                # consider either explicitly completed or has any responses
+                (AssessmentResponse.completed_at.isnot(None)) | (AssessmentResponse.responses.isnot(None))
+            )
+            .limit(1)
         )
-        .first()
-        is not None
-    )
+    ).first() is not None
 
     if not has_any_assessment:
         return []
@@ -180,85 +214,137 @@ async def get_my_job_matches(
     # Preview mode: show all active jobs to ND adults as matches
     if JM_THRESHOLD == 0:
         jobs = (
-            db.query(JobPosting)
-            .filter(JobPosting.is_active.is_(True))
-            .order_by(JobPosting.posted_date.desc())
-            .all()
-        )
-        return [to_card_shape_preview(j) for j in jobs]
+            await db.execute(
+                select(JobPosting)
+                .options(*_card_job_options())
+                .where(JobPosting.is_active.is_(True))
+                .order_by(JobPosting.posted_date.desc())
+            )
+        ).scalars().all()
+        # Score the whole catalog for this user in one batch, then let the LLM
+        # refine the top few within the request budget
+        scores = await db.run_sync(compute_match_scores, str(current_user.id), jobs)
+        scores = await cascade_match_scores(db, str(current_user.id), jobs, scores)
+        return [to_card_shape_preview(j, scores[str(j.job_id)]) for j in jobs]
 
-    # Normal mode: return saved/generated matches for this ND user
-    matches = db.query(JobMatch).filter(JobMatch.nd_adult_id == current_user.id).all()
-    return [to_card_shape_from_db_match(m) for m in matches]
+    # Normal mode: read rows kept current by the match materializer
+    matches = list(
+        (
+            await db.execute(
+                select(JobMatch)
+                .join(JobMatch.job_posting)
+                .options(
+                    load_only(JobMatch.job_id, JobMatch.match_score, JobMatch.match_reasoning),
+                    contains_eager(JobMatch.job_posting).options(*_card_job_options()),
+                )
+                .where(
+                    JobMatch.nd_adult_id == current_user.id,
+                    JobMatch.match_score >= JM_THRESHOLD,
+                    JobPosting.is_active.is_(True),
+                )
+                .order_by(JobMatch.match_score.desc())
+            )
+        ).scalars().all()
+    )
+    scores = await cascade_match_scores(
+        db,
+        str(current_user.id),
+        [m.job_posting for m in matches],
+        {str(m.job_id): int(m.match_score or 0) for m in matches},
+    )
+    matches.sort(key=lambda m: scores[str(m.job_id)], reverse=True)
+    return [to_card_shape_from_db_match(m, scores[str(m.job_id)]) for m in matches]
 
 @router.get("/employer/top-matches")
 async def get_employer_top_matches(
+    per_job: int = Query(JM_TOP_K, ge=1, le=100),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> Dict[str, Any]:
-    """Return candidate matches for this employer's jobs.
+    """Return ranked candidate shortlists for this employer's active jobs.
 
-    Behavior:
-    - If JM_THRESHOLD == 0: treat every ND profile as a match against each active job.
-    - Else: placeholder empty list until full matching is implemented.
+    Every ND profile is scored against every active job in one batch and the
+    best `per_job` candidates at or above `JM_THRESHOLD` are kept per job.
+    `matches` is the dashboard list (best 20 across jobs, one entry per
+    candidate); `shortlists` maps job_id to that job's ranked candidates.
     """
     if current_user.user_role not in ["EMPLOYER", "ADMIN", "MANAGER"]:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Only employers can view matches")
 
     # Employer's active jobs
     jobs = (
-        db.query(JobPosting)
-        .filter(JobPosting.employer_id == current_user.id, JobPosting.is_active.is_(True))
-        .order_by(JobPosting.posted_date.desc())
-        .all()
-    )
+        await db.execute(
+            select(JobPosting)
+            .options(selectinload(JobPosting.features))
+            .where(JobPosting.employer_id == current_user.id, JobPosting.is_active.is_(True))
+            .order_by(JobPosting.posted_date.desc())
+        )
+    ).scalars().all()
 
     # If the employer has no active job postings, do not return any matches
     if not jobs:
-        return {"matches": [], "jobs": []}
+        return {"matches": [], "jobs": [], "shortlists": {}}
 
-    if JM_THRESHOLD != 0:
-        return {"matches": [], "jobs": [JobPostingResponse.model_validate(j).model_dump() for j in jobs]}
-
-    # Fetch ND users with cognitive profiles
-    nd_users = (
-        db.query(User)
-        .join(CognitiveProfile, CognitiveProfile.user_id == User.id)
-        .filter(User.user_role == "ND_ADULT")
-        .all()
-    )
+    # All ND users with cognitive profiles, loaded in one query
+    rows = (
+        await db.execute(
+            select(User, CognitiveProfile)
+            .join(CognitiveProfile, CognitiveProfile.user_id == User.id)
+            .options(load_only(User.first_name, User.last_name))
+            .where(User.user_role == "ND_ADULT")
+            .order_by(User.id)
+        )
+    ).all()
 
     def initials(u: User) -> str:
         f = (u.first_name or "").strip()[:1].upper()
         l = (u.last_name or "").strip()[:1].upper()
         return (f + l) or "NN"
 
-    # Build matches: assign each ND to the most recent job for preview
-    matches: List[Dict[str, Any]] = []
-    preview_job = jobs[0] if jobs else None
-    for idx, u in enumerate(nd_users, start=1):
-        cp: CognitiveProfile = db.query(CognitiveProfile).filter(CognitiveProfile.user_id == u.id).first()
-        score = int(round((cp.confidence_score or 0.8) * 100))
-        score = max(50, min(99, score))
-        matches.append({
-            "nd_id": str(u.id),
-            "display_name": f"Anonymous Candidate #{idx}",
-            "initials": initials(u),
-            "match_score": score,
-            "suggested_role": preview_job.job_title if preview_job else "Candidate",
-            "job_id": str(preview_job.job_id) if preview_job else None,
-        })
+    ranked = top_k_per_job(
+        build_profile_matrix([cp for _, cp in rows]),
+        build_job_matrix(jobs),
+        per_job,
+        min_score=JM_THRESHOLD,
+    )
+
+    shortlists: Dict[str, List[Dict[str, Any]]] = {}
+    all_matches: List[Dict[str, Any]] = []
+    for job, top in zip(jobs, ranked):
+        entries = []
+        for row, score in top:
+            u = rows[row][0]
+            entries.append({
+                "nd_id": str(u.id),
+                "display_name": f"Anonymous Candidate #{row + 1}",
+                "initials": initials(u),
+                "match_score": score,
+                "suggested_role": job.job_title,
+                "job_id": str(job.job_id),
+            })
+        shortlists[str(job.job_id)] = entries
+        all_matches.extend(entries)
+
+    # Dashboard list: each candidate once, under their best-scoring job
+    all_matches.sort(key=lambda m: m["match_score"], reverse=True)
+    seen = set()
+    matches = []
+    for m in all_matches:
+        if m["nd_id"] not in seen:
+            seen.add(m["nd_id"])
+            matches.append(m)
 
     return {
         "matches": matches[:20],  # limit for dashboard
-        "jobs": [JobPostingResponse.model_validate(j).model_dump() for j in jobs]
+        "jobs": [JobPostingResponse.model_validate(j).model_dump() for j in jobs],
+        "shortlists": shortlists,
     }
 
 @router.get("/employer/nd/{nd_id}/details")
 async def get_nd_candidate_details(
     nd_id: str,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> Dict[str, Any]:
     """Return ND candidate profile details for employer view.
 
@@ -267,11 +353,19 @@ async def get_nd_candidate_details(
     if current_user.user_role not in ["EMPLOYER", "ADMIN", "MANAGER"]:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Only employers can view candidate details")
 
-    user = db.query(User).filter(User.id == nd_id, User.user_role == "ND_ADULT").first()
+    user = (
+        await db.execute(
+            select(User)
+            .options(load_only(User.first_name, User.last_name))
+            .where(User.id == nd_id, User.user_role == "ND_ADULT")
+        )
+    ).scalars().first()
     if not user:
         raise HTTPException(status_code=404, detail="ND candidate not found")
 
-    profile = db.query(CognitiveProfile).filter(CognitiveProfile.user_id == nd_id).first()
+    profile = (
+        await db.execute(select(CognitiveProfile).where(CognitiveProfile.user_id == nd_id))
+    ).scalars().first()
     strengths = {}
     if profile:
         for cdc in [
@@ -284,12 +378,19 @@ async def get_nd_candidate_details(
 
     # Latest responses per assessment for this user
     responses = (
-        db.query(AssessmentResponse)
-        .join(Assessment, Assessment.assessment_id == AssessmentResponse.assessment_id)
-        .filter(AssessmentResponse.user_id == nd_id)
-        .order_by(AssessmentResponse.completed_at.desc().nullslast(), AssessmentResponse.response_id.desc())
-        .all()
-    )
+        await db.execute(
+            select(AssessmentResponse)
+            .join(AssessmentResponse.assessment)
+            .options(
+                load_only(AssessmentResponse.assessment_id, AssessmentResponse.responses, AssessmentResponse.completed_at),
+                contains_eager(AssessmentResponse.assessment).load_only(
+                    Assessment.title, Assessment.assessment_type, Assessment.questions
+                ),
+            )
+            .where(AssessmentResponse.user_id == nd_id)
+            .order_by(AssessmentResponse.completed_at.desc().nullslast(), AssessmentResponse.response_id.desc())
+        )
+    ).scalars().all()
     latest_map: Dict[str, Any] = {}
     for r in responses:
         aid = str(r.assessment_id)
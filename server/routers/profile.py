@@ -3,13 +3,13 @@ Profile management for BrainBridge
 """
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
 from typing import Optional, List
 
-from server.database import get_db
+from server.database import get_async_db
 from server.models import User
-from server.auth import get_current_user
+from server.auth import get_current_user, user_cache
 
 router = APIRouter()
 
@@ -18,7 +18,7 @@ class ProfileResponse(BaseModel):
     profile: dict
 
 @router.get("/", response_model=ProfileResponse)
-async def get_profile(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+async def get_profile(current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_async_db)):
     """Get current user's profile with all fields"""
     
     user_data = {
@@ -97,7 +97,7 @@ class ProfileUpdateRequest(BaseModel):
 async def update_profile(
     profile_update: ProfileUpdateRequest,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update user profile"""
     
@@ -108,8 +108,9 @@ async def update_profile(
         if hasattr(current_user, field):
             setattr(current_user, field, value)
     
-    db.commit()
-    db.refresh(current_user)
+    await db.commit()
+    await db.refresh(current_user)
+    user_cache.invalidate(current_user.id)
     
     # Return updated profile
     return await get_profile(current_user, db)
\ No newline at end of file
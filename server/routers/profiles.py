@@ -9,12 +9,12 @@ from uuid import UUID
 from server.database import get_db
 from server.models import User
 # Removed old profile schemas - using User model directly
-from server.auth import get_current_user
+from server.auth import get_current_user_sync
 
 router = APIRouter()
 
 @router.get("/", response_model=ProfileNDAdultResponse)
-async def get_profile(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+async def get_profile(current_user: User = Depends(get_current_user_sync), db: Session = Depends(get_db)):
     """Get current user's ND Adult profile"""
     profile = db.query(ProfileNDAdult).filter(ProfileNDAdult.nd_adult_id == str(current_user.id)).first()
     
@@ -34,7 +34,7 @@ async def get_profile(current_user: User = Depends(get_current_user), db: Sessio
 @router.post("/", response_model=ProfileNDAdultResponse)
 async def create_or_update_profile(
     profile_data: ProfileNDAdultUpdate,
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(get_current_user_sync),
     db: Session = Depends(get_db)
 ):
     """Create or update ND Adult profile"""
@@ -0,0 +1,81 @@
+"""
+Background task status endpoints (polling and Server-Sent Events)
+"""
+
+import asyncio
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session
+
+from server.database import get_db, SessionLocal
+from server.models import BackgroundTask
+from server.auth import get_token_user
+from server.schemas import TokenData
+from server.task_queue import task_queue, task_to_dict, FINISHED
+from server.sse import sse_event, sse_response
+
+router = APIRouter()
+
+# Seconds between status checks on the event stream; heartbeats keep proxies from closing it
+EVENT_POLL_SECONDS = 1.0
+HEARTBEAT_SECONDS = 15.0
+
+
+def _get_task(db: Session, task_id: str, caller: TokenData) -> BackgroundTask:
+    task = db.query(BackgroundTask).filter(BackgroundTask.task_id == task_id).first()
+    if not task:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Task not found")
+    if task.user_id != caller.user_id and caller.role not in ["ADMIN", "MANAGER"]:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to view this task")
+    return task
+
+
+@router.get("/{task_id}")
+async def get_task(
+    task_id: str,
+    caller: TokenData = Depends(get_token_user),
+    db: Session = Depends(get_db)
+):
+    """Task status; `result` is set once status is "succeeded", `error` once "failed" """
+    return task_to_dict(_get_task(db, task_id, caller))
+
+
+@router.get("/{task_id}/events")
+async def stream_task_events(
+    task_id: str,
+    caller: TokenData = Depends(get_token_user),
+    db: Session = Depends(get_db)
+):
+    """Server-Sent Events: a `status` event on every change, then one `done` event with the task"""
+    _get_task(db, task_id, caller)
+
+    def load() -> dict:
+        session = SessionLocal()
+        try:
+            task = session.query(BackgroundTask).filter(BackgroundTask.task_id == task_id).first()
+            return task_to_dict(task) if task else {}
+        finally:
+            session.close()
+
+    async def events():
+        last_status = None
+        idle = 0.0
+        while True:
+            task = await asyncio.to_thread(load)
+            if not task:
+                return
+            if task["status"] in FINISHED:
+                yield sse_event("done", task)
+                return
+            if task["status"] != last_status:
+                last_status = task["status"]
+                idle = 0.0
+                yield sse_event("status", {"task_id": task_id, "status": last_status})
+            elif idle >= HEARTBEAT_SECONDS:
+                idle = 0.0
+                yield ": keep-alive\n\n"
+            # Wakes early when a worker in this process finishes the task
+            await task_queue.wait(task_id, EVENT_POLL_SECONDS)
+            idle += EVENT_POLL_SECONDS
+
+    return sse_response(events())
@@ -3,14 +3,16 @@ User management routes
 """
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 from uuid import UUID
 
-from server.database import get_db
+from server.database import get_async_db
 from server.models import User
 from server.schemas import UserResponse, UserUpdate
-from server.auth import get_current_user
+from server.auth import get_current_user, user_cache
+from server.match_materializer import materializer
 
 router = APIRouter()
 
@@ -23,14 +25,16 @@ async def get_my_profile(current_user: User = Depends(get_current_user)):
 async def update_my_profile(
     user_update: UserUpdate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update current user's profile"""
     for field, value in user_update.model_dump(exclude_unset=True).items():
         setattr(current_user, field, value)
     
-    db.commit()
-    db.refresh(current_user)
+    await db.commit()
+    await db.refresh(current_user)
+    user_cache.invalidate(current_user.id)
+    materializer.mark_user_dirty(current_user.id)
     
     return UserResponse.model_validate(current_user)
 
@@ -38,10 +42,10 @@ async def update_my_profile(
 async def get_user_by_id(
     user_id: UUID,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get user by ID (admin only or own profile)"""
-    user = db.query(User).filter(User.id == user_id).first()
+    user = (await db.execute(select(User).where(User.id == str(user_id)))).scalars().first()
     
     if not user:
         raise HTTPException(
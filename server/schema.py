@@ -0,0 +1,121 @@
+"""
+Schema versioning on top of the Alembic migrations in `migrations/`.
+
+- `migrate()` is the one-per-deploy step (`python init_db.py`): it upgrades
+  the database to the head revision. A database created by the old
+  create_all() boot path (tables but no ``alembic_version``) is brought up
+  to ``0001_baseline`` (missing columns, indexes and tables added) and
+  stamped first. On Postgres it holds an advisory lock, so
+  concurrent runs apply the migrations once.
+- `check_schema()` is the app startup check: one read of ``alembic_version``
+  compared with the head revision of the migration scripts. It changes
+  nothing unless `DB_MIGRATE_ON_STARTUP` is set.
+"""
+from __future__ import annotations
+
+import logging
+import os
+from typing import Optional, Tuple
+
+from alembic import command
+from alembic.config import Config
+from alembic.operations import Operations
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection
+
+from server.database import engine, DATABASE_URL
+
+logger = logging.getLogger(__name__)
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE_REVISION = "0001_baseline"
+# Arbitrary key for pg_advisory_lock, shared by every process running migrate()
+_MIGRATION_LOCK_KEY = 0x42524944
+
+
+class SchemaOutOfDate(RuntimeError):
+    pass
+
+
+def alembic_config(url: Optional[str] = None) -> Config:
+    cfg = Config(os.path.join(ROOT, "alembic.ini"))
+    cfg.set_main_option("script_location", os.path.join(ROOT, "migrations"))
+    cfg.set_main_option("sqlalchemy.url", (url or DATABASE_URL).replace("%", "%%"))
+    cfg.attributes["configure_logger"] = False
+    return cfg
+
+
+def head_revision() -> str:
+    """Latest revision in migrations/versions (reads the scripts, no DB access)."""
+    return ScriptDirectory.from_config(alembic_config()).get_current_head()
+
+
+def current_revision(conn: Connection) -> Optional[str]:
+    return MigrationContext.configure(conn).get_current_revision()
+
+
+def check_schema(migrate_if_behind: bool = False) -> Tuple[Optional[str], str]:
+    """Compare the database revision with head; returns (current, head).
+
+    Raises `SchemaOutOfDate` when they differ, unless ``migrate_if_behind``
+    (then `migrate()` runs instead).
+    """
+    head = head_revision()
+    with engine.connect() as conn:
+        current = current_revision(conn)
+    if current == head:
+        return current, head
+    if migrate_if_behind:
+        logger.warning(f"Database schema at {current}, head is {head}: migrating")
+        migrate()
+        return head, head
+    raise SchemaOutOfDate(
+        f"Database schema is at revision {current}, code expects {head}. Run `python init_db.py` (alembic upgrade head)."
+    )
+
+
+def _adopt_legacy_schema(conn: Connection, cfg: Config) -> None:
+    """Apply what the old init_db() added at every boot, so the database matches the baseline.
+
+    Databases older than the newest baseline tables also get those created,
+    from the definitions in the baseline revision itself.
+    """
+    columns = {c["name"] for c in inspect(conn).get_columns("users")}
+    for column in ("location", "availability_status"):
+        if column not in columns:
+            conn.execute(text(f"ALTER TABLE users ADD COLUMN {column} VARCHAR"))
+    if inspect(conn).has_table("job_matches"):
+        conn.execute(text("CREATE UNIQUE INDEX IF NOT EXISTS ux_job_matches_nd_adult_job ON job_matches (nd_adult_id, job_id)"))
+        conn.execute(text("CREATE INDEX IF NOT EXISTS ix_job_matches_nd_adult_score ON job_matches (nd_adult_id, match_score)"))
+    baseline = ScriptDirectory.from_config(cfg).get_revision(BASELINE_REVISION).module
+    missing = [name for name in baseline.ADOPTION_TABLES if not inspect(conn).has_table(name)]
+    if missing:
+        logger.info(f"Creating baseline tables missing from the existing schema: {', '.join(missing)}")
+        with Operations.context(MigrationContext.configure(conn)):
+            for name in missing:
+                baseline.ADOPTION_TABLES[name]()
+    conn.commit()
+
+
+def migrate() -> str:
+    """Upgrade the database to head (stamping pre-migration databases first). Returns the head revision."""
+    cfg = alembic_config()
+    with engine.connect() as conn:
+        postgres = conn.dialect.name == "postgresql"
+        if postgres:
+            conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": _MIGRATION_LOCK_KEY})
+            conn.commit()
+        try:
+            if current_revision(conn) is None and inspect(conn).has_table("users"):
+                # Built by create_all() before migrations existed
+                logger.info(f"Existing schema without a revision: stamping {BASELINE_REVISION}")
+                _adopt_legacy_schema(conn, cfg)
+                command.stamp(cfg, BASELINE_REVISION)
+            command.upgrade(cfg, "head")
+        finally:
+            if postgres:
+                conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": _MIGRATION_LOCK_KEY})
+                conn.commit()
+    return head_revision()
@@ -47,9 +47,20 @@ class Token(BaseModel):
     access_token: str
     token_type: str
     user: UserResponse
+    refresh_token: Optional[str] = None
+
+class RefreshRequest(BaseModel):
+    refresh_token: str
+
+class TokenRefresh(BaseModel):
+    access_token: str
+    refresh_token: str
+    token_type: str
 
 class TokenData(BaseModel):
     email: Optional[str] = None
+    user_id: Optional[str] = None
+    role: Optional[str] = None
 
 class UserLogin(BaseModel):
     email: EmailStr
@@ -0,0 +1,178 @@
+"""
+Skill/risk taxonomy and multi-phrase matcher for job text.
+
+The taxonomy (``server/data/skill_taxonomy.json`` by default, override with
+``SKILL_TAXONOMY_PATH``) maps phrases to CDCs, sensory-risk keys, remote/onsite
+signals and the keyword groups used by fallback job normalization. All phrases
+are compiled once into an Aho-Corasick automaton so a job text is scanned in a
+single linear pass no matter how many phrases the taxonomy holds.
+
+The bundled taxonomy is a hand-curated starting set of ~450 skill and risk
+phrases, not the thousands the matcher is built for; extend the JSON file (or
+point ``SKILL_TAXONOMY_PATH`` at a larger one) to grow it without code changes.
+"""
+from __future__ import annotations
+
+import json
+import os
+from collections import deque
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+DEFAULT_TAXONOMY_PATH = os.path.join(os.path.dirname(__file__), "data", "skill_taxonomy.json")
+
+
+class PhraseMatcher:
+    """Aho-Corasick automaton over lower-cased phrases."""
+
+    def __init__(self, phrases: Iterable[str]):
+        self.phrases: List[str] = []
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[int]] = [[]]
+        for phrase in phrases:
+            self._add(phrase)
+        self._build()
+
+    def _add(self, phrase: str) -> None:
+        state = 0
+        for ch in phrase:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+                self._goto[state][ch] = nxt
+            state = nxt
+        self._out[state].append(len(self.phrases))
+        self.phrases.append(phrase)
+
+    def _build(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                f = self._fail[state]
+                while f and ch not in self._goto[f]:
+                    f = self._fail[f]
+                target = self._goto[f].get(ch, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int, int]]:
+        """Yield ``(start, end, phrase_index)`` for every occurrence in ``text``."""
+        goto, fail, out, phrases = self._goto, self._fail, self._out, self.phrases
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for idx in out[state]:
+                yield i + 1 - len(phrases[idx]), i + 1, idx
+
+
+def _leftmost_longest(spans: List[Tuple[int, int, str, Any]]) -> List[Tuple[int, int, str, Any]]:
+    """Drop spans overlapping an earlier-starting (or equal-start, longer) span."""
+    kept: List[Tuple[int, int, str, Any]] = []
+    last_end = 0
+    for span in sorted(spans, key=lambda s: (s[0], -s[1])):
+        if span[0] >= last_end:
+            kept.append(span)
+            last_end = span[1]
+    return kept
+
+
+def _normalize(text: str) -> str:
+    return " ".join((text or "").lower().split())
+
+
+class SkillTaxonomy:
+    """Compiled taxonomy; use `scan` to extract every signal from a text."""
+
+    def __init__(self, data: Dict[str, Any]):
+        self.version = int(data.get("version", 1))
+        self.skills: Dict[str, str] = {_normalize(k): v for k, v in (data.get("skills") or {}).items()}
+        self.sensory_risks: Dict[str, str] = {_normalize(k): v for k, v in (data.get("sensory_risks") or {}).items()}
+        self.remote_words: List[str] = [_normalize(w) for w in data.get("remote") or []]
+        self.onsite_words: List[str] = [_normalize(w) for w in data.get("onsite") or []]
+        self.keyword_groups: Dict[str, List[str]] = {
+            group: [_normalize(w) for w in words]
+            for group, words in (data.get("normalization_keywords") or {}).items()
+        }
+
+        # phrase -> [(category, value)]; one phrase may carry several meanings
+        payloads: Dict[str, List[Tuple[str, Any]]] = {}
+        for phrase, cdc in self.skills.items():
+            payloads.setdefault(phrase, []).append(("skill", cdc))
+        for phrase, key in self.sensory_risks.items():
+            payloads.setdefault(phrase, []).append(("risk", key))
+        for phrase in self.remote_words:
+            payloads.setdefault(phrase, []).append(("remote", None))
+        for phrase in self.onsite_words:
+            payloads.setdefault(phrase, []).append(("onsite", None))
+        for group, words in self.keyword_groups.items():
+            for phrase in words:
+                payloads.setdefault(phrase, []).append(("keyword", group))
+        self._matcher = PhraseMatcher(p for p in payloads if p)
+        self._payloads = [payloads[p] for p in self._matcher.phrases]
+
+    @classmethod
+    def load(cls, path: str) -> "SkillTaxonomy":
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def scan(self, text: str) -> Dict[str, Any]:
+        """Find all taxonomy phrases in ``text`` in one pass.
+
+        Every phrase must start on a word boundary. Skill phrases must also end
+        on one; risk, remote/onsite and keyword phrases may match as prefixes.
+        Overlapping skill or risk phrases count once: the leftmost-longest
+        match wins ("3d modeling" hides "3d" and "modeling").
+        """
+        text = _normalize(text)
+        n = len(text)
+        skill_spans: List[Tuple[int, int, str, Any]] = []
+        risk_spans: List[Tuple[int, int, str, Any]] = []
+        keywords: Dict[str, List[str]] = {}
+        is_remote = is_onsite = False
+        for start, end, idx in self._matcher.iter_matches(text):
+            if start > 0 and text[start - 1].isalnum():
+                continue
+            whole_word = end == n or not text[end].isalnum()
+            phrase = self._matcher.phrases[idx]
+            for category, value in self._payloads[idx]:
+                if category == "skill":
+                    if whole_word:
+                        skill_spans.append((start, end, phrase, value))
+                elif category == "risk":
+                    risk_spans.append((start, end, phrase, value))
+                elif category == "remote":
+                    is_remote = True
+                elif category == "onsite":
+                    is_onsite = True
+                elif category == "keyword":
+                    group = keywords.setdefault(value, [])
+                    if phrase not in group:
+                        group.append(phrase)
+
+        skills = {phrase: cdc for _, _, phrase, cdc in _leftmost_longest(skill_spans)}
+        risks = {phrase: key for _, _, phrase, key in _leftmost_longest(risk_spans)}
+        cdc_hits: Dict[str, int] = {}
+        for cdc in skills.values():
+            cdc_hits[cdc] = cdc_hits.get(cdc, 0) + 1
+        return {
+            "skills": skills,
+            "cdc_hits": cdc_hits,
+            "sensory_risks": risks,
+            "is_remote": is_remote,
+            "is_onsite": is_onsite,
+            "keywords": keywords,
+        }
+
+
+@lru_cache(maxsize=1)
+def get_taxonomy() -> SkillTaxonomy:
+    """Load and compile the taxonomy once per process."""
+    return SkillTaxonomy.load(os.getenv("SKILL_TAXONOMY_PATH") or DEFAULT_TAXONOMY_PATH)
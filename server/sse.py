@@ -0,0 +1,21 @@
+"""
+Server-Sent Events helpers shared by the streaming endpoints.
+"""
+import json
+from typing import Any, AsyncIterator
+
+from fastapi.responses import StreamingResponse
+
+
+def sse_event(name: str, data: Any) -> str:
+    """One SSE frame: `event: <name>` with JSON `data`."""
+    return f"event: {name}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+def sse_response(events: AsyncIterator[str]) -> StreamingResponse:
+    """Stream pre-formatted SSE frames, unbuffered by proxies."""
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,270 @@
+"""
+Database-backed task queue for slow (LLM) work.
+
+Endpoints enqueue a `BackgroundTask` row and return its id straight away;
+worker coroutines started from the app lifespan claim queued rows, run the
+registered async handler and store the result. Clients poll
+`GET /api/tasks/{task_id}` or follow `GET /api/tasks/{task_id}/events` (SSE).
+
+The queue lives in the application database (SQLite or Postgres), so tasks
+survive restarts and several app processes can share it: a row is claimed
+with a conditional ``UPDATE ... WHERE status = 'queued'``, which only one
+worker can win. Every `TASK_SWEEP_SECONDS` a worker re-queues tasks left
+running longer than `TASK_STALE_SECONDS` (their worker died), or fails them
+once they have been started `TASK_MAX_ATTEMPTS` times.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from server.config import (
+    TASK_WORKERS,
+    TASK_POLL_SECONDS,
+    TASK_STALE_SECONDS,
+    TASK_SWEEP_SECONDS,
+    TASK_MAX_ATTEMPTS,
+)
+from server.database import SessionLocal
+from server.models import BackgroundTask
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+FINISHED = (SUCCEEDED, FAILED)
+
+Handler = Callable[[Dict[str, Any]], Awaitable[Any]]
+_handlers: Dict[str, Handler] = {}
+
+
+def task_handler(kind: str) -> Callable[[Handler], Handler]:
+    """Register an async ``handler(payload) -> result`` for tasks of ``kind``."""
+    def register(fn: Handler) -> Handler:
+        _handlers[kind] = fn
+        return fn
+    return register
+
+
+def _jsonable(value: Any) -> Any:
+    # NumPy scalars and datetimes show up in agent results
+    def default(obj: Any) -> Any:
+        if hasattr(obj, "item"):
+            return obj.item()
+        if isinstance(obj, datetime):
+            return obj.isoformat()
+        return str(obj)
+    return json.loads(json.dumps(value, default=default))
+
+
+def task_to_dict(task: BackgroundTask) -> Dict[str, Any]:
+    return {
+        "task_id": task.task_id,
+        "kind": task.kind,
+        "status": task.status,
+        "result": task.result,
+        "error": task.error,
+        "created_at": task.created_at.isoformat() if task.created_at else None,
+        "started_at": task.started_at.isoformat() if task.started_at else None,
+        "finished_at": task.finished_at.isoformat() if task.finished_at else None,
+    }
+
+
+def accepted(task: BackgroundTask) -> Dict[str, Any]:
+    """202 response body for a freshly enqueued task."""
+    return {
+        "task_id": task.task_id,
+        "status": task.status,
+        "status_url": f"/api/tasks/{task.task_id}",
+        "events_url": f"/api/tasks/{task.task_id}/events",
+    }
+
+
+class TaskQueue:
+    """Worker pool over the background_tasks table."""
+
+    def __init__(
+        self,
+        workers: int = TASK_WORKERS,
+        poll_seconds: float = TASK_POLL_SECONDS,
+        stale_seconds: float = TASK_STALE_SECONDS,
+        sweep_seconds: float = TASK_SWEEP_SECONDS,
+        max_attempts: int = TASK_MAX_ATTEMPTS,
+    ):
+        self.workers = workers
+        self.poll_seconds = poll_seconds
+        self.stale_seconds = stale_seconds
+        self.sweep_seconds = sweep_seconds
+        self.max_attempts = max_attempts
+        self._next_sweep = 0.0
+        self._wake: Optional[asyncio.Event] = None
+        self._workers: List[asyncio.Task] = []
+        self._done: Dict[str, asyncio.Event] = {}
+
+    def enqueue(self, db: Session, kind: str, payload: Dict[str, Any], user_id: Optional[str] = None) -> BackgroundTask:
+        """Insert a queued task and nudge the workers. Commits."""
+        if kind not in _handlers:
+            raise ValueError(f"No handler registered for task kind '{kind}'")
+        task = BackgroundTask(kind=kind, user_id=user_id, payload=_jsonable(payload), status=QUEUED)
+        db.add(task)
+        db.commit()
+        db.refresh(task)
+        if self._wake is not None:
+            self._wake.set()
+        return task
+
+    async def start(self) -> None:
+        if self._workers:
+            return
+        self._wake = asyncio.Event()
+        await self._sweep()
+        self._workers = [asyncio.create_task(self._worker(i)) for i in range(self.workers)]
+        logger.info(f"Task queue started with {self.workers} workers")
+
+    async def stop(self) -> None:
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    async def wait(self, task_id: str, timeout: float) -> None:
+        """Wait until this process finishes ``task_id`` or ``timeout`` passes."""
+        event = self._done.setdefault(task_id, asyncio.Event())
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+        except asyncio.TimeoutError:
+            # Finished elsewhere (or still running): don't keep the event around
+            if self._done.get(task_id) is event:
+                del self._done[task_id]
+
+    async def _sweep(self) -> None:
+        """Run `_requeue_stale` if it is due; one worker per interval in this process."""
+        now = time.monotonic()
+        if now < self._next_sweep:
+            return
+        self._next_sweep = now + self.sweep_seconds
+        try:
+            failed, requeued = await asyncio.to_thread(self._requeue_stale)
+        except Exception as e:
+            logger.error(f"Task queue stale sweep failed: {str(e)}")
+            return
+        if failed or requeued:
+            logger.warning(f"Task queue stale sweep: {requeued} re-queued, {failed} failed after {self.max_attempts} attempts")
+
+    def _requeue_stale(self) -> tuple[int, int]:
+        """Tasks left running by a crashed/restarted worker go back to the queue,
+        unless they already used up their attempts. Returns (failed, requeued)."""
+        now = datetime.now(timezone.utc)
+        stale = (BackgroundTask.status == RUNNING, BackgroundTask.started_at < now - timedelta(seconds=self.stale_seconds))
+        db = SessionLocal()
+        try:
+            failed = db.execute(
+                update(BackgroundTask)
+                .where(*stale, BackgroundTask.attempts >= self.max_attempts)
+                .values(
+                    status=FAILED,
+                    error=f"Task did not finish after {self.max_attempts} attempts (worker stopped while running it)",
+                    finished_at=now,
+                )
+            ).rowcount
+            requeued = db.execute(
+                update(BackgroundTask)
+                .where(*stale)
+                .values(status=QUEUED)
+            ).rowcount
+            db.commit()
+            return failed, requeued
+        finally:
+            db.close()
+
+    def _claim(self) -> Optional[Dict[str, Any]]:
+        db = SessionLocal()
+        try:
+            candidates = (
+                db.query(BackgroundTask.task_id)
+                .filter(BackgroundTask.status == QUEUED)
+                .order_by(BackgroundTask.created_at)
+                .limit(self.workers)
+                .all()
+            )
+            for (task_id,) in candidates:
+                claimed = db.execute(
+                    update(BackgroundTask)
+                    .where(BackgroundTask.task_id == task_id, BackgroundTask.status == QUEUED)
+                    .values(
+                        status=RUNNING,
+                        started_at=datetime.now(timezone.utc),
+                        attempts=BackgroundTask.attempts + 1,
+                    )
+                ).rowcount
+                db.commit()
+                if claimed:
+                    task = db.query(BackgroundTask).filter(BackgroundTask.task_id == task_id).first()
+                    return {"task_id": task.task_id, "kind": task.kind, "payload": task.payload or {}}
+            return None
+        finally:
+            db.close()
+
+    def _finish(self, task_id: str, status: str, result: Any = None, error: Optional[str] = None) -> None:
+        db = SessionLocal()
+        try:
+            db.execute(
+                update(BackgroundTask)
+                .where(BackgroundTask.task_id == task_id)
+                .values(
+                    status=status,
+                    result=_jsonable(result) if result is not None else None,
+                    error=error,
+                    finished_at=datetime.now(timezone.utc),
+                )
+            )
+            db.commit()
+        finally:
+            db.close()
+
+    async def _worker(self, index: int) -> None:
+        while True:
+            await self._sweep()
+            try:
+                claimed = await asyncio.to_thread(self._claim)
+            except Exception as e:
+                logger.error(f"Task worker {index} failed to claim: {str(e)}")
+                claimed = None
+            if claimed is None:
+                self._wake.clear()
+                try:
+                    await asyncio.wait_for(self._wake.wait(), self.poll_seconds)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            await self._run(claimed)
+
+    async def _run(self, claimed: Dict[str, Any]) -> None:
+        task_id, kind = claimed["task_id"], claimed["kind"]
+        handler = _handlers.get(kind)
+        try:
+            if handler is None:
+                raise ValueError(f"No handler registered for task kind '{kind}'")
+            result = await handler(claimed["payload"])
+            await asyncio.to_thread(self._finish, task_id, SUCCEEDED, result)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Task {task_id} ({kind}) failed: {str(e)}")
+            await asyncio.to_thread(self._finish, task_id, FAILED, None, str(e))
+        event = self._done.pop(task_id, None)
+        if event is not None:
+            event.set()
+
+
+# Global task queue
+task_queue = TaskQueue()
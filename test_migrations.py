@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+Migration test for fresh and pre-migration databases
+
+Runs `server.schema.migrate()` on an empty database and on one built the way
+the old boot path built it (`create_all()` of the models as they were before
+the Alembic migrations, snapshot below). Both must reach head with a schema
+that matches the current models, so tables added to the baseline revision
+(`job_features`, `background_tasks`) exist on adopted databases too.
+"""
+
+import os
+import sqlite3
+import sys
+import tempfile
+
+# server.database needs a DATABASE_URL at import time
+_tmpdir = tempfile.mkdtemp(prefix="brainbridge-migrations-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_tmpdir}/migrations.db"
+
+from alembic.autogenerate import compare_metadata
+from alembic.runtime.migration import MigrationContext
+from sqlalchemy import create_engine, inspect
+
+import server.models  # noqa: F401  (registers the models on Base.metadata)
+from server.database import Base
+from server import schema
+
+# SQLite DDL from create_all() of server/models.py before migrations existed
+LEGACY_SCHEMA = """
+CREATE TABLE strengths (
+    strength_id VARCHAR NOT NULL,
+    strength_name VARCHAR NOT NULL,
+    strength_description TEXT,
+    PRIMARY KEY (strength_id),
+    UNIQUE (strength_name)
+);
+CREATE TABLE traits (
+    trait_id VARCHAR NOT NULL,
+    trait_name VARCHAR NOT NULL,
+    trait_description TEXT,
+    PRIMARY KEY (trait_id),
+    UNIQUE (trait_name)
+);
+CREATE TABLE users (
+    id VARCHAR NOT NULL,
+    email VARCHAR,
+    first_name VARCHAR,
+    last_name VARCHAR,
+    profile_image_url VARCHAR,
+    password TEXT,
+    user_role VARCHAR(50) NOT NULL,
+    phone VARCHAR,
+    company_name VARCHAR,
+    job_title VARCHAR,
+    company_size VARCHAR,
+    industry VARCHAR,
+    date_of_birth DATE,
+    guardian_email VARCHAR,
+    accommodation_needs TEXT,
+    relationship VARCHAR,
+    nd_adult_email VARCHAR,
+    identity_verification_doc VARCHAR,
+    has_neuro_condition_recognized BOOLEAN,
+    recognized_neuro_condition VARCHAR,
+    nd_condition_proof_docs JSON,
+    medical_conditions TEXT,
+    location VARCHAR,
+    preferred_work_environment TEXT,
+    preferred_work_setup VARCHAR,
+    availability_status VARCHAR,
+    notes TEXT,
+    public_profile_consent BOOLEAN,
+    privacy_agreed BOOLEAN,
+    company_website VARCHAR,
+    contact_person VARCHAR,
+    contact_person_designation VARCHAR,
+    company_email VARCHAR,
+    company_verification_docs JSON,
+    is_dei_compliant BOOLEAN,
+    dei_compliance_provider VARCHAR,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    updated_at DATETIME,
+    is_active BOOLEAN,
+    PRIMARY KEY (id)
+);
+CREATE UNIQUE INDEX ix_users_email ON users (email);
+CREATE TABLE assessments (
+    assessment_id VARCHAR NOT NULL,
+    user_id VARCHAR NOT NULL,
+    assessment_type VARCHAR NOT NULL,
+    title VARCHAR NOT NULL,
+    description TEXT,
+    questions JSON,
+    scoring_config JSON,
+    cdc_mapping JSON,
+    is_active BOOLEAN,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    updated_at DATETIME,
+    PRIMARY KEY (assessment_id),
+    FOREIGN KEY(user_id) REFERENCES users (id)
+);
+CREATE TABLE audit_logs (
+    audit_id VARCHAR NOT NULL,
+    user_id VARCHAR,
+    table_name VARCHAR NOT NULL,
+    operation VARCHAR NOT NULL,
+    old_values JSON,
+    new_values JSON,
+    timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (audit_id),
+    FOREIGN KEY(user_id) REFERENCES users (id)
+);
+CREATE TABLE cognitive_profiles (
+    profile_id VARCHAR NOT NULL,
+    user_id VARCHAR NOT NULL,
+    focus_sustained_attention FLOAT,
+    pattern_recognition FLOAT,
+    verbal_communication FLOAT,
+    spatial_reasoning FLOAT,
+    creative_ideation FLOAT,
+    multitasking_context_switching FLOAT,
+    processing_speed FLOAT,
+    executive_function FLOAT,
+    fine_motor_input FLOAT,
+    sensory_processing FLOAT,
+    communication_interpretation FLOAT,
+    attention_filtering FLOAT,
+    sensitivities JSON,
+    preferences JSON,
+    embedding_vector VARCHAR,
+    evidence_sources JSON,
+    confidence_score FLOAT,
+    last_updated DATETIME DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (profile_id),
+    UNIQUE (user_id),
+    FOREIGN KEY(user_id) REFERENCES users (id)
+);
+CREATE TABLE individual_strengths (
+    individual_strength_id VARCHAR NOT NULL,
+    nd_adult_id VARCHAR NOT NULL,
+    strength_id VARCHAR NOT NULL,
+    notes TEXT,
+    PRIMARY KEY (individual_strength_id),
+    FOREIGN KEY(nd_adult_id) REFERENCES users (id),
+    FOREIGN KEY(strength_id) REFERENCES strengths (strength_id)
+);
+CREATE TABLE individual_traits (
+    individual_trait_id VARCHAR NOT NULL,
+    nd_adult_id VARCHAR NOT NULL,
+    trait_id VARCHAR NOT NULL,
+    notes TEXT,
+    PRIMARY KEY (individual_trait_id),
+    FOREIGN KEY(nd_adult_id) REFERENCES users (id),
+    FOREIGN KEY(trait_id) REFERENCES traits (trait_id)
+);
+CREATE TABLE job_postings (
+    job_id VARCHAR NOT NULL,
+    employer_id VARCHAR NOT NULL,
+    job_title VARCHAR NOT NULL,
+    job_description TEXT,
+    employment_type VARCHAR(10),
+    location VARCHAR,
+    work_setup VARCHAR(7),
+    salary_range_min INTEGER,
+    salary_range_max INTEGER,
+    requirements TEXT,
+    benefits TEXT,
+    posted_date DATETIME DEFAULT CURRENT_TIMESTAMP,
+    application_deadline DATE,
+    is_active BOOLEAN,
+    PRIMARY KEY (job_id),
+    FOREIGN KEY(employer_id) REFERENCES users (id)
+);
+CREATE TABLE support_relationships (
+    relationship_id VARCHAR NOT NULL,
+    nd_adult_id VARCHAR NOT NULL,
+    mentor_id VARCHAR,
+    guardian_id VARCHAR,
+    relationship_type VARCHAR,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    is_active BOOLEAN,
+    PRIMARY KEY (relationship_id),
+    FOREIGN KEY(nd_adult_id) REFERENCES users (id),
+    FOREIGN KEY(mentor_id) REFERENCES users (id),
+    FOREIGN KEY(guardian_id) REFERENCES users (id)
+);
+CREATE TABLE assessment_responses (
+    response_id VARCHAR NOT NULL,
+    assessment_id VARCHAR NOT NULL,
+    user_id VARCHAR NOT NULL,
+    responses JSON NOT NULL,
+    completion_time_seconds INTEGER,
+    completed_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (response_id),
+    FOREIGN KEY(assessment_id) REFERENCES assessments (assessment_id),
+    FOREIGN KEY(user_id) REFERENCES users (id)
+);
+CREATE TABLE job_matches (
+    match_id VARCHAR NOT NULL,
+    nd_adult_id VARCHAR NOT NULL,
+    job_id VARCHAR NOT NULL,
+    match_score INTEGER,
+    match_reasoning TEXT,
+    match_date DATETIME DEFAULT CURRENT_TIMESTAMP,
+    is_recommended_to_adult BOOLEAN,
+    is_viewed_by_adult BOOLEAN,
+    is_liked_by_adult BOOLEAN,
+    is_liked_by_employer BOOLEAN,
+    PRIMARY KEY (match_id),
+    FOREIGN KEY(nd_adult_id) REFERENCES users (id),
+    FOREIGN KEY(job_id) REFERENCES job_postings (job_id)
+);
+"""
+
+
+def _migrate(path):
+    """Point server.schema at ``path``, migrate it and return (revision, schema diffs, tables)."""
+    url = f"sqlite:///{path}"
+    engine = create_engine(url)
+    original_engine, original_url = schema.engine, schema.DATABASE_URL
+    schema.engine, schema.DATABASE_URL = engine, url
+    try:
+        revision = schema.migrate()
+    finally:
+        schema.engine, schema.DATABASE_URL = original_engine, original_url
+    with engine.connect() as conn:
+        current = schema.current_revision(conn)
+        diffs = compare_metadata(MigrationContext.configure(conn), Base.metadata)
+        tables = set(inspect(conn).get_table_names())
+    engine.dispose()
+    assert current == revision, f"at {current}, head is {revision}"
+    return diffs, tables
+
+
+def test_migrations():
+    """Fresh and legacy databases both migrate to a schema matching the models"""
+    failures = []
+    legacy_path = os.path.join(_tmpdir, "legacy.db")
+    with sqlite3.connect(legacy_path) as conn:
+        conn.executescript(LEGACY_SCHEMA)
+
+    for name, path in (("fresh", os.path.join(_tmpdir, "fresh.db")), ("legacy", legacy_path)):
+        diffs, tables = _migrate(path)
+        missing = sorted(set(Base.metadata.tables) - tables)
+        ok = not diffs and not missing
+        print(f"{'✓' if ok else '❌'} {name}: {len(diffs)} schema differences, missing tables {missing or 'none'}")
+        if not ok:
+            failures.append(f"{name}: missing {missing}, diffs {diffs}")
+    assert not failures, "Migrated schema does not match the models:\n" + "\n".join(failures)
+
+
+if __name__ == "__main__":
+    try:
+        test_migrations()
+    except AssertionError as e:
+        print(e)
+        sys.exit(1)
+    sys.exit(0)
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Query count test for the match and candidate endpoints
+
+Seeds a scratch SQLite database with a small and a large page of matches
+(and assessment responses) and calls each endpoint for both under
+`server.database.query_budget`. Each request must stay within its budget, run
+no statement twice, and issue the same number of statements for both sizes -
+a lazy load per row would make it grow with the page.
+"""
+
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+
+# server.database needs a DATABASE_URL at import time
+_tmpdir = tempfile.mkdtemp(prefix="brainbridge-queries-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_tmpdir}/queries.db"
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from server.auth import get_current_user
+from server.database import engine, query_budget
+from server.models import (
+    User, Assessment, AssessmentResponse, CognitiveProfile, JobPosting, JobFeatures, JobMatch, EmploymentType
+)
+from server.routers import jobs
+from server.matching import FEATURE_VERSION
+from server.schema import migrate
+
+SMALL, LARGE = 3, 40
+# Statements per request: the has-any-assessment check, the page query, and
+# for preview the scoring inputs (profile, assessment count)
+BUDGETS = {"matches": 2, "preview": 3, "candidate": 3}
+
+
+def seed(n):
+    """Employer with n jobs, ND adult with n matches and n assessment responses"""
+    now = datetime.now(timezone.utc)
+    employer = User(id=f"e{n}", email=f"e{n}@example.com", user_role="EMPLOYER", company_name=f"Co {n}")
+    nd = User(id=f"nd{n}", email=f"nd{n}@example.com", user_role="ND_ADULT", first_name="Ada", last_name="Lee")
+    with Session(engine, expire_on_commit=False) as db:
+        db.add_all([employer, nd, CognitiveProfile(user_id=nd.id, pattern_recognition=0.8)])
+        for i in range(n):
+            job_id, assessment_id = f"j{n}-{i}", f"a{n}-{i}"
+            db.add_all([
+                JobPosting(
+                    job_id=job_id,
+                    employer_id=employer.id,
+                    job_title=f"Job {i}",
+                    employment_type=EmploymentType.FULL_TIME,
+                    location="Remote",
+                    job_description="Quiet, pattern recognition heavy analysis",
+                    requirements="SQL",
+                    posted_date=now - timedelta(hours=i),
+                    is_active=True,
+                ),
+                JobFeatures(job_id=job_id, tokens=["sql"], cdc_hits={}, sensory_risks={}, is_remote=True,
+                            feature_version=FEATURE_VERSION),
+                JobMatch(nd_adult_id=nd.id, job_id=job_id, match_score=60 + i % 30, match_reasoning="Fits"),
+                Assessment(assessment_id=assessment_id, user_id=employer.id, assessment_type="quiz", title=f"A{i}", questions=[]),
+                AssessmentResponse(user_id=nd.id, assessment_id=assessment_id, responses={"q": i}, completed_at=now),
+            ])
+        db.commit()
+        db.expunge_all()
+    return employer, nd
+
+
+def test_query_counts():
+    """Match and candidate endpoints issue a constant number of queries per page"""
+    migrate()
+    app = FastAPI()
+    app.include_router(jobs.router, prefix="/api/jobs")
+    client = TestClient(app)
+
+    def request(user, path, expect_rows):
+        app.dependency_overrides[get_current_user] = lambda: user
+        r = client.get(path)
+        assert r.status_code == 200, f"{path}: {r.status_code} {r.text[:200]}"
+        body = r.json()
+        rows = body if isinstance(body, list) else body["assessments"]
+        assert len(rows) == expect_rows, f"{path}: {len(rows)} rows, expected {expect_rows}"
+
+    cases, failures = {}, []
+
+    def measure(name, fn):
+        try:
+            with query_budget(BUDGETS[name], max_repeats=1) as stats:
+                fn()
+        except AssertionError as e:
+            failures.append(f"{name}: {e}")
+        return stats.count
+
+    # The materializer only runs in the full app
+    with mock.patch.object(jobs.materializer, "mark_job_dirty", lambda job_id: None):
+        for n in (SMALL, LARGE):
+            employer, nd = seed(n)
+
+            def matches():
+                with mock.patch.object(jobs, "JM_THRESHOLD", 50):
+                    request(nd, "/api/jobs/matches/my", n)
+
+            def preview():
+                # Preview lists the whole active catalog
+                with mock.patch.object(jobs, "JM_THRESHOLD", 0):
+                    request(nd, "/api/jobs/matches/my", SMALL + (n if n == LARGE else 0))
+
+            cases[n] = {
+                "matches": measure("matches", matches),
+                "preview": measure("preview", preview),
+                "candidate": measure("candidate", lambda: request(employer, f"/api/jobs/employer/nd/{nd.id}/details", n)),
+            }
+
+    for name, budget in BUDGETS.items():
+        small, large = cases[SMALL][name], cases[LARGE][name]
+        ok = small == large and not any(f.startswith(f"{name}:") for f in failures)
+        print(f"{'✓' if ok else '❌'} {name}: {small} queries for {SMALL} rows, {large} for {LARGE} (budget {budget})")
+        if small != large:
+            failures.append(f"{name}: {small} -> {large} queries")
+    assert not failures, "Query count regressions:\n" + "\n".join(failures)
+
+
+if __name__ == "__main__":
+    try:
+        test_query_counts()
+    except AssertionError as e:
+        print(e)
+        sys.exit(1)
+    sys.exit(0)
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Query plan test for the hot request-path queries
+
+Builds a scratch database with the Alembic migrations, seeds it, and runs
+EXPLAIN on each hot query. Fails if any of them falls back to a sequential
+scan of a table.
+
+Uses a temporary SQLite file by default. Set QUERY_PLAN_DATABASE_URL to a
+*throwaway* Postgres database to check Postgres plans (sequential scans are
+disabled for the session, so a Seq Scan there means no usable index).
+"""
+
+import os
+import sys
+import json
+import random
+import tempfile
+from datetime import datetime, timedelta, timezone
+
+# server.database needs a DATABASE_URL at import time
+_tmpdir = tempfile.mkdtemp(prefix="brainbridge-plans-")
+PLAN_DATABASE_URL = os.getenv("QUERY_PLAN_DATABASE_URL") or f"sqlite:///{_tmpdir}/plans.db"
+os.environ.setdefault("DATABASE_URL", PLAN_DATABASE_URL)
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import create_engine, select, text
+from sqlalchemy.orm import Session
+
+from server.models import User, Assessment, AssessmentResponse, JobPosting, JobMatch, EmploymentType
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+N_USERS, N_EMPLOYERS, N_JOBS, N_ASSESSMENTS = 300, 30, 1500, 8
+
+
+def migrate(url):
+    cfg = Config(os.path.join(ROOT, "alembic.ini"))
+    cfg.set_main_option("script_location", os.path.join(ROOT, "migrations"))
+    cfg.set_main_option("sqlalchemy.url", url.replace("%", "%%"))
+    cfg.attributes["configure_logger"] = False
+    command.upgrade(cfg, "head")
+
+
+def seed(engine):
+    rnd = random.Random(7)
+    now = datetime.now(timezone.utc)
+    with Session(engine) as db:
+        users = [User(id=f"u{i}", email=f"u{i}@example.com", user_role="ND_ADULT") for i in range(N_USERS)]
+        employers = [User(id=f"e{i}", email=f"e{i}@example.com", user_role="EMPLOYER") for i in range(N_EMPLOYERS)]
+        db.add_all(users + employers)
+        db.add_all([
+            Assessment(assessment_id=f"a{i}", user_id="e0", assessment_type="quiz", title=f"A{i}", questions=[])
+            for i in range(N_ASSESSMENTS)
+        ])
+        db.add_all([
+            JobPosting(
+                job_id=f"j{i}",
+                employer_id=f"e{i % N_EMPLOYERS}",
+                job_title=f"Job {i}",
+                employment_type=EmploymentType.FULL_TIME,
+                posted_date=now - timedelta(hours=i),
+                is_active=rnd.random() < 0.8,
+            )
+            for i in range(N_JOBS)
+        ])
+        db.flush()
+        db.add_all([
+            AssessmentResponse(
+                user_id=u.id,
+                assessment_id=f"a{a}",
+                responses={"q": a},
+                completed_at=now - timedelta(minutes=rnd.randint(0, 10000)),
+            )
+            for u in users for a in range(N_ASSESSMENTS) if rnd.random() < 0.7
+        ])
+        db.add_all([
+            JobMatch(nd_adult_id=u.id, job_id=f"j{j}", match_score=rnd.randint(40, 95))
+            for u in users for j in rnd.sample(range(N_JOBS), 20)
+        ])
+        db.commit()
+    with engine.begin() as conn:
+        conn.execute(text("ANALYZE"))
+
+
+def hot_queries():
+    """(name, statement) for the query shapes used by the API routes and workers"""
+    latest_first = (AssessmentResponse.completed_at.desc().nullslast(), AssessmentResponse.response_id.desc())
+    return [
+        ("latest response for (user, assessment)",
+         select(AssessmentResponse)
+         .where(AssessmentResponse.user_id == "u1", AssessmentResponse.assessment_id == "a1")
+         .order_by(*latest_first).limit(1)),
+        ("my responses",
+         select(AssessmentResponse).where(AssessmentResponse.user_id == "u1").order_by(*latest_first)),
+        ("template responses",
+         select(AssessmentResponse.assessment_id, AssessmentResponse.responses)
+         .where(AssessmentResponse.user_id == "u1", AssessmentResponse.assessment_id.in_(["a1", "a2", "a3"]))
+         .order_by(AssessmentResponse.completed_at.asc().nullsfirst())),
+        ("my matches",
+         select(JobMatch).join(JobMatch.job_posting)
+         .where(JobMatch.nd_adult_id == "u1", JobMatch.match_score >= 60, JobPosting.is_active.is_(True))
+         .order_by(JobMatch.match_score.desc())),
+        ("active job catalog",
+         select(JobPosting).where(JobPosting.is_active.is_(True)).order_by(JobPosting.posted_date.desc())),
+        ("employer active jobs",
+         select(JobPosting)
+         .where(JobPosting.employer_id == "e1", JobPosting.is_active.is_(True))
+         .order_by(JobPosting.posted_date.desc())),
+        ("employer jobs",
+         select(JobPosting).where(JobPosting.employer_id == "e1")),
+        ("matches for jobs",
+         select(JobMatch.match_id).where(JobMatch.job_id.in_(["j1", "j2"]))),
+    ]
+
+
+def _sqlite_seq_scans(conn, sql):
+    rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}").all()
+    # "SCAN t" walks the table; "SCAN t USING [COVERING] INDEX ..." walks an index
+    return [r[-1] for r in rows if r[-1].startswith("SCAN ") and "INDEX" not in r[-1]]
+
+
+def _postgres_seq_scans(conn, sql):
+    plan = conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {sql}").scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    found, stack = [], [plan[0]["Plan"]]
+    while stack:
+        node = stack.pop()
+        if node["Node Type"] == "Seq Scan":
+            found.append(f"Seq Scan on {node.get('Relation Name')}")
+        stack.extend(node.get("Plans", []))
+    return found
+
+
+def test_query_plans():
+    """Every hot query is served by an index on the seeded dataset"""
+    migrate(PLAN_DATABASE_URL)
+    engine = create_engine(PLAN_DATABASE_URL)
+    seed(engine)
+    is_sqlite = engine.dialect.name == "sqlite"
+
+    failures = []
+    with engine.connect() as conn:
+        if not is_sqlite:
+            conn.exec_driver_sql("SET enable_seqscan = off")
+        for name, stmt in hot_queries():
+            sql = str(stmt.compile(dialect=engine.dialect, compile_kwargs={"literal_binds": True}))
+            scans = (_sqlite_seq_scans if is_sqlite else _postgres_seq_scans)(conn, sql)
+            print(f"{'❌' if scans else '✓'} {name}{': ' + ', '.join(scans) if scans else ''}")
+            if scans:
+                failures.append(f"{name}: {', '.join(scans)}")
+    engine.dispose()
+    assert not failures, "Sequential scans in hot queries:\n" + "\n".join(failures)
+
+
+if __name__ == "__main__":
+    try:
+        test_query_plans()
+    except AssertionError as e:
+        print(e)
+        sys.exit(1)
+    sys.exit(0)
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Skill taxonomy matching test
+
+Scans short job texts with overlapping taxonomy phrases ("3d" inside
+"3d modeling", "analysis" inside "data analysis") and checks each span of
+text is counted once, by its leftmost-longest phrase, so `cdc_hits` is not
+inflated for multi-word skills, and that a 10k-phrase taxonomy still finds
+every phrase in the text.
+"""
+
+import sys
+
+from server.skill_taxonomy import SkillTaxonomy
+
+TAXONOMY = SkillTaxonomy({
+    "skills": {
+        "3d": "spatial_reasoning",
+        "3d modeling": "spatial_reasoning",
+        "modeling": "pattern_recognition",
+        "data": "pattern_recognition",
+        "data analysis": "pattern_recognition",
+        "analysis": "pattern_recognition",
+        "java": "processing_speed",
+    },
+    "sensory_risks": {
+        "interruptions": "attention_filtering",
+        "frequent interruptions": "attention_filtering",
+    },
+})
+
+# text -> (expected skill phrases, expected cdc_hits, expected risk phrases)
+CASES = {
+    "3D modeling": ({"3d modeling"}, {"spatial_reasoning": 1}, set()),
+    "3D modeling and 3D printers": ({"3d modeling", "3d"}, {"spatial_reasoning": 2}, set()),
+    "Data analysis of raw data": ({"data analysis", "data"}, {"pattern_recognition": 2}, set()),
+    "JavaScript": (set(), {}, set()),
+    "Frequent interruptions": (set(), {}, {"frequent interruptions"}),
+}
+
+
+def test_overlapping_phrases():
+    """Overlapping skill and risk phrases count once, longest match first"""
+    failures = []
+    for text, (skills, cdc_hits, risks) in CASES.items():
+        found = TAXONOMY.scan(text)
+        got = (set(found["skills"]), found["cdc_hits"], set(found["sensory_risks"]))
+        ok = got == (skills, cdc_hits, risks)
+        print(f"{'✓' if ok else '❌'} {text!r}: {sorted(got[0])} {got[1]} {sorted(got[2])}")
+        if not ok:
+            failures.append(f"{text!r}: got {got}, expected {(skills, cdc_hits, risks)}")
+    assert not failures, "Taxonomy matches:\n" + "\n".join(failures)
+
+
+def test_large_taxonomy():
+    """A 10k-phrase taxonomy compiles and matches the phrases in the text"""
+    skills = {f"skill{i} tooling": "pattern_recognition" for i in range(10000)}
+    taxonomy = SkillTaxonomy({"skills": skills, "sensory_risks": {}})
+    text = " ".join(f"Uses skill{i} tooling daily." for i in range(0, 10000, 97))
+    found = taxonomy.scan(text)
+    expected = {f"skill{i} tooling" for i in range(0, 10000, 97)}
+    print(f"{len(skills)} phrases, {len(found['skills'])} matched")
+    assert set(found["skills"]) == expected
+    assert found["cdc_hits"] == {"pattern_recognition": len(expected)}
+
+
+if __name__ == "__main__":
+    try:
+        test_overlapping_phrases()
+        test_large_taxonomy()
+    except AssertionError as e:
+        print(e)
+        sys.exit(1)
+    sys.exit(0)
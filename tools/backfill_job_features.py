@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Backfill the job_features table for existing job postings.
+Only missing or stale rows are recomputed unless --all is given.
+"""
+import argparse
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--all", action="store_true", help="recompute every job, not just missing/stale rows")
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+
+    from sqlalchemy.orm import selectinload
+    from server.database import SessionLocal, engine
+    from server.models import JobPosting, JobFeatures
+    from server.matching import FEATURE_VERSION, refresh_job_features
+
+    JobFeatures.__table__.create(bind=engine, checkfirst=True)
+    db = SessionLocal()
+    try:
+        jobs = db.query(JobPosting).options(selectinload(JobPosting.features)).all()
+        updated = 0
+        for job in jobs:
+            if not args.all and job.features is not None and job.features.feature_version == FEATURE_VERSION:
+                continue
+            refresh_job_features(db, job)
+            updated += 1
+            if updated % args.batch_size == 0:
+                db.commit()
+        db.commit()
+        print(f"Backfilled features for {updated} of {len(jobs)} jobs")
+        return 0
+    finally:
+        db.close()
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())